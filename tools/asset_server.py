@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — On-Demand Asset Server
+
+Serves assets/ over HTTP for design review and dev builds, transforming each
+image on request with the same resize/encode path optimize_assets.py uses:
+
+    http://localhost:8089/coloring/usa/nature/usa_01_map.png?w=512&fmt=webp&q=80
+
+Query parameters (all optional; defaults come from the file's format_rules
+entry in asset_config.yaml, so a bare URL returns what optimize_assets.py
+would ship):
+
+    w, h   bounding box in pixels (aspect ratio is kept, never upscaled)
+    fmt    webp, png or auto (pick by image content, as `format: auto` rules do)
+    q      WebP quality 1-100
+
+Files whose rule says `skip` (masks, app icon) and non-image files are
+served unchanged.
+
+Results are cached on disk under .asset_cache/transforms/, keyed by the
+source file's content hash plus the transform parameters, and evicted least
+recently used once the cache exceeds --cache-mb. Concurrent requests for the
+same transform share one encode. GET /_stats returns hit/miss/dedupe counts
+and latency percentiles as JSON.
+
+Usage:
+    python3 tools/asset_server.py                        # http://127.0.0.1:8089
+    python3 tools/asset_server.py --port 9000 --cache-mb 512
+
+Requirements:
+    pip install Pillow numpy pyyaml
+    cwebp (libwebp), pngquant
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from PIL import Image
+
+from optimize_assets import (
+    ASSETS_DIR, AUTO_ROUTES, CONFIG_PATH, IMAGE_EXTENSIONS, bilevel_pixels,
+    classify_image, encode_bilevel_png, encode_image, load_config, match_rule,
+    resize_image,
+)
+
+CACHE_DIR = Path(__file__).parent.parent / ".asset_cache" / "transforms"
+
+# Bump when the transform output changes for the same inputs.
+CACHE_VERSION = 1
+
+# Latency samples kept per outcome for the /_stats percentiles
+LATENCY_WINDOW = 1000
+
+CONTENT_TYPES = {".webp": "image/webp", ".png": "image/png"}
+
+
+class DiskLRUCache:
+    """Content-addressed files under `root`, evicted least recently used.
+
+    Recency survives restarts via file mtimes, which are bumped on every hit.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        root.mkdir(parents=True, exist_ok=True)
+        existing = sorted((p for p in root.glob("*/*") if p.is_file()),
+                          key=lambda p: p.stat().st_mtime)
+        for path in existing:
+            size = path.stat().st_size
+            self._index[path.name] = size
+            self._bytes += size
+        self._evict()
+
+    def _path(self, name: str) -> Path:
+        return self.root / name[:2] / name
+
+    def get(self, name: str) -> bytes | None:
+        with self._lock:
+            if name not in self._index:
+                return None
+            self._index.move_to_end(name)
+        path = self._path(name)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._bytes -= self._index.pop(name, 0)
+            return None
+        return data
+
+    def put(self, name: str, data: bytes) -> None:
+        path = self._path(name)
+        path.parent.mkdir(exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(name, 0)
+            self._index[name] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            self._path(name).unlink(missing_ok=True)
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._index), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class TransformService:
+    """Resolves requests to transformed bytes, with caching, dedupe and counters."""
+
+    def __init__(self, assets_dir: Path, rules: list[dict], cache: DiskLRUCache):
+        self.assets_dir = assets_dir.resolve()
+        self.rules = rules
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._source_hashes: dict[Path, tuple[tuple[int, int], str]] = {}
+        self._classes: dict[str, str] = {}
+        self.counters = {"requests": 0, "hits": 0, "misses": 0, "deduped": 0,
+                         "passthrough": 0, "errors": 0, "bytes_served": 0}
+        self.latencies = {"hit": deque(maxlen=LATENCY_WINDOW),
+                          "miss": deque(maxlen=LATENCY_WINDOW)}
+
+    def resolve(self, url_path: str) -> Path | None:
+        """Map a URL path to a file inside assets/, or None."""
+        path = (self.assets_dir / unquote(url_path).lstrip("/")).resolve()
+        if not path.is_relative_to(self.assets_dir) or not path.is_file():
+            return None
+        return path
+
+    def _source_hash(self, path: Path) -> str:
+        st = path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._source_hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        self._source_hashes[path] = (signature, digest)
+        return digest
+
+    def params_for(self, path: Path, query: dict[str, list[str]]) -> dict | None:
+        """Transform parameters for a request, or None to serve the file as-is."""
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            return None
+        rel = path.relative_to(self.assets_dir).as_posix()
+        rule = match_rule(rel.lower(), self.rules) or match_rule(rel, self.rules)
+        if rule is None or rule.get("skip"):
+            return None
+
+        def arg(name: str, default):
+            if name not in query:
+                return default
+            try:
+                value = int(query[name][0])
+            except ValueError:
+                raise ValueError(f"{name} must be an integer") from None
+            if name in ("w", "h") and value < 1:
+                raise ValueError(f"{name} must be a positive integer")
+            return value
+
+        fmt = query.get("fmt", [rule["format"]])[0].lower()
+        compression = rule.get("compression")
+        lossless = False
+        if fmt == "auto":
+            route = AUTO_ROUTES[self._content_class(path)]
+            fmt = route["format"]
+            compression = route.get("compression")
+            lossless = route.get("lossless", False)
+        if fmt not in ("webp", "png"):
+            raise ValueError(f"unsupported fmt '{fmt}'")
+        q = max(1, min(100, arg("q", rule.get("quality", 85))))
+        return {
+            "w": arg("w", rule.get("max_width", 99999)),
+            "h": arg("h", rule.get("max_height", 99999)),
+            "fmt": fmt,
+            # Quality only affects lossy WebP; keep it out of the cache key otherwise.
+            "q": q if fmt == "webp" and not lossless else None,
+            "compression": compression if fmt == "png" else None,
+            "lossless": lossless,
+            "bilevel": bool(rule.get("bilevel")) and fmt == "png",
+        }
+
+    def _content_class(self, path: Path) -> str:
+        """classify_image() result for a source, memoized by content hash."""
+        digest = self._source_hash(path)
+        if digest not in self._classes:
+            with Image.open(path) as img:
+                self._classes[digest] = classify_image(img)["class"]
+        return self._classes[digest]
+
+    def transform(self, path: Path, params: dict) -> bytes:
+        """Resize and encode one image with the optimize_assets pipeline."""
+        with Image.open(path) as img:
+            source_size = img.size
+            resized = resize_image(img, params["w"], params["h"])
+            if params["bilevel"] and resized.size == source_size:
+                white = bilevel_pixels(img)
+                if white is not None:
+                    return encode_bilevel_png(white)[0]
+            suffix = "." + params["fmt"]
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+                out_path = Path(tmp.name)
+            try:
+                if not encode_image(resized, out_path, params["fmt"], params["q"],
+                                    params["compression"], lossless=params["lossless"]):
+                    raise RuntimeError(f"{params['fmt']} encode failed")
+                return out_path.read_bytes()
+            finally:
+                out_path.unlink(missing_ok=True)
+
+    def get(self, path: Path, params: dict) -> tuple[bytes, str]:
+        """Return (bytes, outcome) where outcome is "hit", "miss" or "deduped"."""
+        key_src = json.dumps([CACHE_VERSION, self._source_hash(path), params], sort_keys=True)
+        name = hashlib.sha256(key_src.encode()).hexdigest() + "." + params["fmt"]
+
+        data = self.cache.get(name)
+        if data is not None:
+            return data, "hit"
+
+        with self._lock:
+            future = self._inflight.get(name)
+            owner = future is None
+            if owner:
+                future = self._inflight[name] = Future()
+        if not owner:
+            return future.result(), "deduped"
+
+        try:
+            data = self.transform(path, params)
+            self.cache.put(name, data)
+            future.set_result(data)
+            return data, "miss"
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(name, None)
+
+    def record(self, outcome: str, seconds: float, size: int) -> None:
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["bytes_served"] += size
+            key = {"hit": "hits", "miss": "misses", "deduped": "deduped",
+                   "passthrough": "passthrough", "error": "errors"}[outcome]
+            self.counters[key] += 1
+            if outcome in self.latencies:
+                self.latencies[outcome].append(seconds * 1000)
+
+    def stats(self) -> dict:
+        def summary(samples) -> dict:
+            if not samples:
+                return {"count": 0}
+            ordered = sorted(samples)
+            return {"count": len(ordered),
+                    "mean_ms": round(sum(ordered) / len(ordered), 2),
+                    "p50_ms": round(ordered[len(ordered) // 2], 2),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                    "max_ms": round(ordered[-1], 2)}
+
+        with self._lock:
+            counters = dict(self.counters)
+            latency = {k: summary(list(v)) for k, v in self.latencies.items()}
+        lookups = counters["hits"] + counters["misses"] + counters["deduped"]
+        return {**counters,
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else None,
+                "latency": latency, "cache": self.cache.stats()}
+
+
+class AssetRequestHandler(BaseHTTPRequestHandler):
+    service: TransformService
+
+    def _send(self, status: int, body: bytes, content_type: str, extra: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            body = json.dumps(self.service.stats(), indent=2).encode()
+            self._send(200, body, "application/json")
+            return
+
+        path = self.service.resolve(url.path)
+        if path is None:
+            self._send(404, b"Not found\n", "text/plain")
+            return
+        try:
+            params = self.service.params_for(path, parse_qs(url.query))
+            if params is None:
+                data, outcome = path.read_bytes(), "passthrough"
+                content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            else:
+                data, outcome = self.service.get(path, params)
+                content_type = CONTENT_TYPES["." + params["fmt"]]
+        except ValueError as e:
+            self.service.record("error", time.perf_counter() - start, 0)
+            self._send(400, f"{e}\n".encode(), "text/plain")
+            return
+        except Exception as e:
+            self.service.record("error", time.perf_counter() - start, 0)
+            self._send(500, f"{e}\n".encode(), "text/plain")
+            return
+
+        self.service.record(outcome, time.perf_counter() - start, len(data))
+        self._send(200, data, content_type, {"X-Cache": outcome})
+
+    def log_message(self, fmt, *args):
+        print(f"{self.address_string()} {fmt % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Planet Wonders assets with on-demand transforms")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8089,
+                        help="Port to listen on (default: 8089)")
+    parser.add_argument("--cache-mb", type=int, default=256,
+                        help="Disk cache size limit in MB (default: 256)")
+    parser.add_argument("--cache-dir", type=str, default=str(CACHE_DIR),
+                        help="Disk cache directory")
+    parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
+                        help="Path to config YAML")
+    args = parser.parse_args()
+
+    cache = DiskLRUCache(Path(args.cache_dir), args.cache_mb * 1024 * 1024)
+    AssetRequestHandler.service = TransformService(ASSETS_DIR, load_config(Path(args.config)),
+                                                   cache)
+    server = ThreadingHTTPServer((args.host, args.port), AssetRequestHandler)
+    print(f"Serving {ASSETS_DIR} on http://{args.host}:{args.port}/ "
+          f"(cache: {args.cache_dir}, {args.cache_mb} MB)")
+    print(f"Stats at http://{args.host}:{args.port}/_stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
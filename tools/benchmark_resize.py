@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Resize Benchmark
+
+Compares the shrink-on-load path in optimize_assets.resize_image (JPEG
+draft() + reducing_gap) against a plain full-resolution decode followed by
+a single LANCZOS resize, on the largest image assets. Each measurement runs
+in a fresh subprocess so peak RSS is per method, not cumulative.
+
+Reports wall time, peak RSS and PSNR between the two outputs, and exits
+non-zero if any image falls below --min-psnr.
+
+Usage:
+    python3 tools/benchmark_resize.py                  # 8 largest assets, 256 px target
+    python3 tools/benchmark_resize.py --count 4 --size 1024
+    python3 tools/benchmark_resize.py --min-psnr 45
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from optimize_assets import ASSETS_DIR, get_image_files, resize_image
+
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+RSS_UNITS_PER_MB = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+
+def _measure(method: str, path: str, size: int, out_path: str) -> None:
+    """Child-process entry: resize one image and print timing/RSS as JSON."""
+    start = time.perf_counter()
+    img = Image.open(path)
+    if method == "baseline":
+        w, h = img.size
+        ratio = min(size / w, size / h, 1.0)
+        if img.mode in ("P", "1"):
+            img = img.convert("RGBA" if "transparency" in img.info else
+                              "RGB" if img.mode == "P" else "L")
+        resized = img.resize((int(w * ratio), int(h * ratio)), Image.LANCZOS)
+    else:
+        resized = resize_image(img, size, size)
+        resized.load()
+    elapsed = time.perf_counter() - start
+    resized.convert("RGBA").save(out_path, "PNG", compress_level=0)
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_UNITS_PER_MB,
+    }))
+
+
+def run_method(method: str, path: Path, size: int, out_path: Path) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", method, str(path), str(size), str(out_path)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def psnr(a: Path, b: Path) -> float:
+    x = np.asarray(Image.open(a), dtype=np.float64)
+    y = np.asarray(Image.open(b), dtype=np.float64)
+    if x.shape != y.shape:
+        return 0.0
+    mse = np.mean((x - y) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _measure(sys.argv[2], sys.argv[3], int(sys.argv[4]), sys.argv[5])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark shrink-on-load resizing")
+    parser.add_argument("--count", type=int, default=8,
+                        help="Number of largest assets to benchmark (default: 8)")
+    # At 512 px the 2048 px assets have reduction factor 1, so nothing changes.
+    parser.add_argument("--size", type=int, default=256,
+                        help="Target bounding box in pixels (default: 256)")
+    parser.add_argument("--min-psnr", type=float, default=40.0,
+                        help="Minimum PSNR (dB) vs. baseline (default: 40)")
+    args = parser.parse_args()
+
+    def pixel_count(p: Path) -> int:
+        with Image.open(p) as im:
+            return im.size[0] * im.size[1]
+
+    files = sorted(get_image_files(ASSETS_DIR), key=lambda p: (pixel_count(p), p.stat().st_size),
+                   reverse=True)[:args.count]
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="benchmark_resize_"))
+    failures = 0
+    totals = {"baseline": 0.0, "shrink": 0.0}
+    print(f"{'asset':<48} {'base s':>7} {'new s':>7} {'base MB':>8} {'new MB':>7} {'PSNR':>6}")
+    try:
+        for path in files:
+            base_out = tmp_dir / "baseline.png"
+            new_out = tmp_dir / "shrink.png"
+            base = run_method("baseline", path, args.size, base_out)
+            new = run_method("shrink", path, args.size, new_out)
+            quality = psnr(base_out, new_out)
+            totals["baseline"] += base["seconds"]
+            totals["shrink"] += new["seconds"]
+            flag = ""
+            if quality < args.min_psnr:
+                failures += 1
+                flag = "  BELOW TOLERANCE"
+            rel = str(path.relative_to(ASSETS_DIR))
+            print(f"{rel[-48:]:<48} {base['seconds']:>7.3f} {new['seconds']:>7.3f} "
+                  f"{base['peak_rss_mb']:>8.1f} {new['peak_rss_mb']:>7.1f} {quality:>6.1f}{flag}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\nTotal: {totals['baseline']:.2f}s baseline, {totals['shrink']:.2f}s shrink-on-load")
+    if failures:
+        print(f"{failures} image(s) below {args.min_psnr} dB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Asset Pack Builder
+
+Partitions the bundled assets (everything pubspec.yaml lists) into a small
+core pack plus one deferred pack per country, so the app can ship the core
+and fetch a country's content the first time a child opens it.
+
+A file belongs to a country pack when one of its directories names that
+country (`coloring/ghana/...`, `audio/stories/uk/...`, `v2/nigreia/...`);
+everything else, and anything matching the `core` patterns in the `packs:`
+section of asset_config.yaml, stays in core. Country names in file names
+(flags/ghana.webp, backgrounds/country/ghana.webp) do not count — those are
+shown before any pack is installed.
+
+`build` copies each pack to <output_dir>/<pack>/<asset path> and writes
+<output_dir>/manifest.json with per-pack file lists, sizes and SHA-256
+hashes, plus core_assets.yaml, the flutter.assets list for the core build.
+
+`install` fetches a pack into a destination directory from a source that is
+either a local directory (a build output dir standing in for the CDN) or an
+http(s) base URL, verifying every hash and skipping files already present.
+
+Usage:
+    python3 tools/build_asset_packs.py build
+    python3 tools/build_asset_packs.py build --dry-run
+    python3 tools/build_asset_packs.py install ghana --source build/asset_packs --dest /tmp/device
+
+Requirements:
+    pip install pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import yaml
+
+from find_unused_assets import bundled_files, load_pubspec_assets
+
+REPO_DIR = Path(__file__).parent.parent
+PUBSPEC_PATH = REPO_DIR / "pubspec.yaml"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+
+CORE_PACK = "core"
+MANIFEST_NAME = "manifest.json"
+
+
+def load_pack_config(config_path: Path) -> dict:
+    """Load the packs section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    packs = cfg.get("packs") or {}
+    if not packs.get("countries"):
+        raise ValueError(f"No packs.countries configured in {config_path}")
+    packs.setdefault("output_dir", "build/asset_packs")
+    packs.setdefault("core", [])
+    packs.setdefault("exclude", [])
+    return packs
+
+
+def pack_for(rel_path: str, cfg: dict) -> str:
+    """Name of the pack a repo-relative asset path belongs to."""
+    if any(fnmatch.fnmatch(rel_path, pat) for pat in cfg["core"]):
+        return CORE_PACK
+    dirs = [part.lower() for part in rel_path.split("/")[:-1]]
+    for country, aliases in cfg["countries"].items():
+        names = {country.lower(), *(a.lower() for a in aliases or [])}
+        if names.intersection(dirs):
+            return country
+    return CORE_PACK
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def partition(repo_dir: Path, pubspec_path: Path, cfg: dict) -> dict[str, list[dict]]:
+    """Map pack name -> [{path, size, sha256}] for every bundled file."""
+    packs: dict[str, list[dict]] = {CORE_PACK: []}
+    packs.update({country: [] for country in cfg["countries"]})
+    for rel, size in sorted(bundled_files(repo_dir, load_pubspec_assets(pubspec_path)).items()):
+        if any(fnmatch.fnmatch(rel, pat) for pat in cfg["exclude"]):
+            continue
+        packs[pack_for(rel, cfg)].append(
+            {"path": rel, "size": size, "sha256": file_sha256(repo_dir / rel)})
+    return packs
+
+
+def pack_digest(files: list[dict]) -> str:
+    """Hash over a pack's sorted (path, sha256) pairs; changes when any file does."""
+    h = hashlib.sha256()
+    for entry in files:
+        h.update(f"{entry['path']}\0{entry['sha256']}\n".encode())
+    return h.hexdigest()
+
+
+def build_packs(repo_dir: Path, out_dir: Path, packs: dict[str, list[dict]]) -> dict:
+    """Copy pack contents under out_dir and write the manifest. Returns the manifest."""
+    manifest = {"version": 1, "core": CORE_PACK, "packs": {}}
+    for name, files in packs.items():
+        pack_dir = out_dir / name
+        if pack_dir.exists():
+            shutil.rmtree(pack_dir)
+        for entry in files:
+            dest = pack_dir / entry["path"]
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(repo_dir / entry["path"], dest)
+        manifest["packs"][name] = {
+            "files": files,
+            "file_count": len(files),
+            "total_bytes": sum(e["size"] for e in files),
+            "sha256": pack_digest(files),
+        }
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n",
+                                         encoding="utf-8")
+    return manifest
+
+
+def write_core_asset_list(packs: dict[str, list[dict]], out_path: Path) -> None:
+    """Write the flutter.assets list that bundles only the core pack.
+
+    Directories whose files are all core are listed as directories; a
+    directory shared with a country pack lists its core files one by one.
+    """
+    def parent(entry: dict) -> str:
+        return entry["path"].rsplit("/", 1)[0] + "/"
+
+    mixed = {parent(e) for name, files in packs.items() if name != CORE_PACK for e in files}
+    entries = set()
+    for entry in packs[CORE_PACK]:
+        entries.add(entry["path"] if parent(entry) in mixed else parent(entry))
+    lines = ["# Generated by tools/build_asset_packs.py -- core pack only",
+             "assets:"]
+    lines += [f"  - {json.dumps(e)}" if " " in e else f"  - {e}" for e in sorted(entries)]
+    out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _open_source(source: str, rel: str):
+    if source.startswith(("http://", "https://")):
+        url = f"{source.rstrip('/')}/{urllib.parse.quote(rel)}"
+        return urllib.request.urlopen(url, timeout=60)
+    return open(Path(source) / rel, "rb")
+
+
+def install_pack(name: str, source: str, dest: Path) -> dict:
+    """Fetch pack `name` from `source` into `dest`, verifying hashes.
+
+    Files already present with the right hash are skipped; each download is
+    written to a temp file and renamed only after its hash checks out.
+    """
+    with _open_source(source, MANIFEST_NAME) as f:
+        manifest = json.loads(f.read().decode("utf-8"))
+    if name not in manifest["packs"]:
+        raise ValueError(f"Unknown pack '{name}' (have: {', '.join(manifest['packs'])})")
+
+    stats = {"fetched": 0, "present": 0, "bytes": 0}
+    for entry in manifest["packs"][name]["files"]:
+        target = dest / entry["path"]
+        if target.exists() and file_sha256(target) == entry["sha256"]:
+            stats["present"] += 1
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=target.parent, delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            h = hashlib.sha256()
+            with _open_source(source, f"{name}/{entry['path']}") as src, \
+                    open(tmp_path, "wb") as out:
+                for chunk in iter(lambda: src.read(1 << 20), b""):
+                    h.update(chunk)
+                    out.write(chunk)
+            if h.hexdigest() != entry["sha256"]:
+                raise ValueError(f"Hash mismatch for {entry['path']}")
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        stats["fetched"] += 1
+        stats["bytes"] += entry["size"]
+    return stats
+
+
+def cmd_build(args: argparse.Namespace, cfg: dict) -> None:
+    packs = partition(REPO_DIR, Path(args.pubspec), cfg)
+    out_dir = REPO_DIR / cfg["output_dir"]
+
+    if not args.dry_run:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        build_packs(REPO_DIR, out_dir, packs)
+        write_core_asset_list(packs, out_dir / "core_assets.yaml")
+        print(f"Packs written to: {out_dir.relative_to(REPO_DIR)}")
+
+    total = sum(e["size"] for files in packs.values() for e in files)
+    print(f"\n{'='*60}")
+    print("ASSET PACK SUMMARY")
+    print(f"{'='*60}")
+    for name, files in packs.items():
+        size = sum(e["size"] for e in files)
+        print(f"{name + ':':<18}{len(files):>5} files  {size / (1024*1024):>7.1f} MB")
+    print(f"{'Total:':<18}{sum(len(f) for f in packs.values()):>5} files  "
+          f"{total / (1024*1024):>7.1f} MB")
+
+
+def cmd_install(args: argparse.Namespace) -> None:
+    try:
+        stats = install_pack(args.pack, args.source, Path(args.dest))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Installed pack '{args.pack}' into {args.dest}: {stats['fetched']} fetched "
+          f"({stats['bytes'] / (1024*1024):.1f} MB), {stats['present']} already present")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and install Planet Wonders asset packs")
+    parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
+                        help="Path to config YAML")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Partition bundled assets into packs")
+    build.add_argument("--pubspec", type=str, default=str(PUBSPEC_PATH),
+                       help="Path to pubspec.yaml")
+    build.add_argument("--dry-run", action="store_true",
+                       help="Report pack sizes without writing anything")
+
+    install = sub.add_parser("install", help="Fetch a pack into a directory")
+    install.add_argument("pack", help="Pack name, e.g. ghana")
+    install.add_argument("--source", required=True,
+                         help="Build output directory or http(s) base URL")
+    install.add_argument("--dest", required=True,
+                         help="Directory to install the pack into")
+    args = parser.parse_args()
+
+    if args.command == "install":
+        cmd_install(args)
+        return
+
+    try:
+        cfg = load_pack_config(Path(args.config))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    cmd_build(args, cfg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Asset Build Graph
+
+Runs the asset pipeline as one dependency graph instead of tool by tool:
+
+    story:<config>      story_data.dart -> story_text_export.py -> story_audio_config.json
+    audio:<mp3>         one story page -> generate_story_audio.py
+    outline:<png>       one scene of a generate_*_pack.py generator
+    optimize:<png>      outline -> optimize_assets.py (rewrites it in place)
+    mask:<png>          optimized outline -> generate_masks.py
+
+Masks are cut from the optimized outline, the file the app actually loads.
+Packs, their output directories and the mask settings come from the
+`build:` section of asset_config.yaml.
+
+Every target is fingerprinted by its source files (by content), the code
+that builds it and its parameters. Scene code is fingerprinted per scene:
+the scene function, render_scene() and every module-level helper and
+constant they reach, compared as ASTs so comments and formatting don't
+count. A target is rebuilt when its fingerprint changed, an output is
+missing or was modified since the build last wrote it, or a dependency was
+rebuilt since it last ran. Editing one scene therefore rebuilds that
+scene's outline, optimize and mask targets and nothing else.
+
+Fingerprints and file stats are kept in .asset_cache/build_state.json and
+files are only re-hashed when their size or mtime changed, so a no-op build
+just stats files. Stale targets run in worker processes, up to --jobs at a
+time, as soon as their dependencies finish.
+
+Narration costs API credits, so .mp3 files that predate the build state
+are adopted as built rather than regenerated; --force regenerates them.
+Audio targets need ELEVENLABS_API_KEY and a voice_id in the story config.
+At most `audio_concurrency` of them run at once (build: config, default 1)
+and new pages start at most `audio_rate` per second; each worker reuses one
+HTTP session and paces its own retries with a token bucket.
+
+Usage:
+    python3 tools/build_graph.py                          # Build everything stale
+    python3 tools/build_graph.py 'outline:*' 'mask:*'     # Matching targets and their deps
+    python3 tools/build_graph.py --dry-run                # List stale targets and why
+    python3 tools/build_graph.py --force '*burger*'       # Rebuild regardless
+
+Requirements:
+    pip install Pillow numpy pyyaml opencv-python requests
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import contextlib
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import yaml
+
+import story_text_export
+from optimize_assets import load_config as load_format_rules, match_rule
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_DIR = TOOLS_DIR.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = TOOLS_DIR / "asset_config.yaml"
+STATE_PATH = REPO_DIR / ".asset_cache" / "build_state.json"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "build_report.json"
+
+AUDIO_SCRIPT = TOOLS_DIR / "generate_story_audio.py"
+AUDIO_DIR = ASSETS_DIR / "audio" / "stories"
+
+# Fingerprint parts, in the order stale reasons are reported
+PARTS = ("code", "params", "inputs")
+
+
+def load_build_config(config_path: Path) -> dict:
+    """Load the build section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    build = cfg.get("build") or {}
+    build.setdefault("packs", [])
+    build.setdefault("mask_dilate", 1)
+    build.setdefault("mask_threshold", 200)
+    build.setdefault("audio_concurrency", 1)
+    build.setdefault("audio_rate", 2.0)
+    return build
+
+
+def rel(path: Path) -> str:
+    return path.relative_to(REPO_DIR).as_posix()
+
+
+def stat_sig(path: Path) -> list[int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def file_digest(path: Path, state: dict) -> str:
+    """SHA-256 of a source file, re-hashed only when its size or mtime changed."""
+    key = rel(path)
+    sig = stat_sig(path)
+    if sig is None:
+        return "missing"
+    cached = state["sources"].get(key)
+    if cached and cached[:2] == sig:
+        return cached[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    state["sources"][key] = sig + [digest]
+    return digest
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Code fingerprints
+# ---------------------------------------------------------------------------
+
+_modules: dict[Path, tuple[dict[str, ast.AST], dict[str, str]]] = {}
+
+
+def _index_module(path: Path) -> tuple[dict[str, ast.AST], dict[str, str]]:
+    """Top-level definitions by name, and imported names by source module."""
+    if path not in _modules:
+        defs: dict[str, ast.AST] = {}
+        imports: dict[str, str] = {}
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                defs[node.name] = node
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        defs[target.id] = node
+            elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+                defs[node.target.id] = node
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                for alias in node.names:
+                    imports[alias.asname or alias.name] = node.module
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports[alias.asname or alias.name.split(".")[0]] = alias.name
+        _modules[path] = defs, imports
+    return _modules[path]
+
+
+def code_fingerprint(path: Path, entries: list[str], state: dict,
+                     exclude: frozenset[str] = frozenset()) -> str:
+    """Fingerprint of the code reachable from `entries` in one module.
+
+    Follows names from each reached definition to other top-level functions,
+    classes and constants of the module. Names imported from sibling tools
+    pull in that whole file by content; library imports are not tracked.
+    """
+    defs, imports = _index_module(path)
+    reached: dict[str, str] = {}
+    queue = list(entries)
+    while queue:
+        name = queue.pop()
+        if name in reached or name in exclude:
+            continue
+        if name in defs:
+            node = defs[name]
+            reached[name] = ast.dump(node)
+            queue.extend(n.id for n in ast.walk(node) if isinstance(n, ast.Name))
+        elif name in imports and (TOOLS_DIR / f"{imports[name]}.py").exists():
+            sibling = TOOLS_DIR / f"{imports[name]}.py"
+            reached[name] = file_digest(sibling, state)
+    return _digest(sorted(reached.items()))
+
+
+def pack_scenes(generator: Path) -> list[tuple[str, str]]:
+    """(output name, scene function name) pairs from a generator's SCENES list."""
+    defs, _ = _index_module(generator)
+    node = defs.get("SCENES")
+    if node is None or not isinstance(node.value, ast.List):
+        raise ValueError(f"{generator.name} has no SCENES list")
+    return [(item.elts[0].value, item.elts[1].id) for item in node.value.elts]
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+def make_target(name: str, action: str, args: list, outputs: list[Path], state: dict, *,
+                code: str = "", code_files: tuple[Path, ...] = (), params: dict | None = None,
+                inputs: tuple[Path, ...] = (), deps: tuple[str, ...] = (),
+                adopt: bool = False) -> dict:
+    return {
+        "name": name,
+        "action": action,
+        "args": args,
+        "outputs": outputs,
+        "deps": list(deps),
+        "adopt": adopt,
+        "parts": {
+            "code": _digest(code, [file_digest(p, state) for p in code_files]),
+            "params": _digest(params or {}),
+            "inputs": _digest({rel(p): file_digest(p, state) for p in inputs}),
+        },
+    }
+
+
+def story_targets(state: dict) -> list[dict]:
+    """The story config export and one narration target per story page."""
+    source = story_text_export.STORY_DATA.resolve()
+    config_path = story_text_export.OUTPUT.resolve()
+    targets = [make_target(
+        f"story:{rel(config_path)}", "story", [], [config_path], state,
+        code_files=(TOOLS_DIR / "story_text_export.py",), inputs=(source,))]
+    if not source.exists():
+        return targets
+
+    # Pages as the export would write them, so audio targets don't wait on it.
+    stories = story_text_export.extract_stories(source.read_text(encoding="utf-8"))
+    config = story_text_export.build_config(stories, story_text_export.read_previous())
+    code = code_fingerprint(AUDIO_SCRIPT, ["tts_request"], state)
+    for country, pages in config["stories"].items():
+        for page in pages:
+            out = AUDIO_DIR / country / f"page_{page['page']}.mp3"
+            params = {"text": page["text"], "voice_id": config["voice_id"],
+                      "model_id": config["model_id"], "output_format": config["output_format"]}
+            targets.append(make_target(f"audio:{rel(out)}", "audio", [str(out), params], [out],
+                                       state, code=code, params=params, adopt=True))
+    return targets
+
+
+def pack_targets(cfg: dict, rules: list[dict], state: dict) -> list[dict]:
+    """Outline, optimize and mask targets for every scene of every pack."""
+    targets = []
+    for pack in cfg["packs"]:
+        generator = TOOLS_DIR / f"{pack['generator']}.py"
+        outline_dir = ASSETS_DIR / pack["outlines"]
+        mask_dir = ASSETS_DIR / pack["masks"] if pack.get("masks") else None
+        for scene, function in pack_scenes(generator):
+            outline = outline_dir / scene
+            asset = outline.relative_to(ASSETS_DIR).as_posix()
+            built = f"outline:{rel(outline)}"
+            targets.append(make_target(
+                built, "outline", [pack["generator"], scene, str(outline)], [outline], state,
+                code=code_fingerprint(generator, ["render_scene", function], state,
+                                      exclude=frozenset({"SCENES"}))))
+
+            rule = match_rule(asset.lower(), rules) or match_rule(asset, rules)
+            if rule is not None and not rule.get("skip"):
+                targets.append(make_target(
+                    f"optimize:{rel(outline)}", "optimize", [str(outline)], [outline], state,
+                    code_files=(TOOLS_DIR / "optimize_assets.py", TOOLS_DIR / "pixel_cache.py"),
+                    params=rule, deps=(built,)))
+                built = targets[-1]["name"]
+
+            if mask_dir is not None:
+                mask = mask_dir / f"{outline.stem}_mask.png"
+                params = {"dilate": cfg["mask_dilate"], "threshold": cfg["mask_threshold"]}
+                targets.append(make_target(
+                    f"mask:{rel(mask)}", "mask", [str(outline), str(mask), params], [mask], state,
+                    code_files=(TOOLS_DIR / "generate_masks.py", TOOLS_DIR / "pixel_cache.py"),
+                    params=params, deps=(built,)))
+    return targets
+
+
+def select(targets: list[dict], patterns: list[str]) -> list[dict]:
+    """Targets matching any pattern, plus everything they depend on."""
+    if not patterns:
+        return targets
+    by_name = {t["name"]: t for t in targets}
+    wanted = set()
+    queue = [t["name"] for t in targets if any(fnmatch.fnmatch(t["name"], p) for p in patterns)]
+    while queue:
+        name = queue.pop()
+        if name not in wanted:
+            wanted.add(name)
+            queue.extend(by_name[name]["deps"])
+    return [t for t in targets if t["name"] in wanted]
+
+
+def stale_reason(target: dict, state: dict, stale: dict[str, str]) -> str | None:
+    """Why `target` needs building, or None if it is up to date."""
+    record = state["targets"].get(target["name"])
+    if record is None:
+        if target["adopt"] and all(p.exists() for p in target["outputs"]):
+            return "adopt"
+        return "new"
+    for part in PARTS:
+        if record["parts"].get(part) != target["parts"][part]:
+            return f"{part} changed"
+    for dep in target["deps"]:
+        if dep in stale or record["deps"].get(dep) != state["targets"][dep]["stamp"]:
+            return "upstream rebuilt"
+    for path in target["outputs"]:
+        sig = stat_sig(path)
+        if sig is None:
+            return "output missing"
+        if sig != state["files"].get(rel(path)):
+            return "output modified"
+    return None
+
+
+def plan(targets: list[dict], state: dict, force: bool) -> dict[str, str]:
+    """Stale target names and reasons. Targets are in dependency order."""
+    stale: dict[str, str] = {}
+    for target in targets:
+        reason = "forced" if force else stale_reason(target, state, stale)
+        if reason is not None:
+            stale[target["name"]] = reason
+    return stale
+
+
+def record_built(target: dict, state: dict) -> None:
+    state["targets"][target["name"]] = {
+        "parts": target["parts"],
+        "stamp": uuid.uuid4().hex[:16],
+        "deps": {dep: state["targets"][dep]["stamp"] for dep in target["deps"]},
+    }
+    for path in target["outputs"]:
+        state["files"][rel(path)] = stat_sig(path)
+
+
+# ---------------------------------------------------------------------------
+# Actions (run in worker processes, with the repo as working directory)
+# ---------------------------------------------------------------------------
+
+def build_story() -> None:
+    story_text_export.main()
+
+
+# Per-worker TTS limits, set by _init_worker; the session is opened on first use
+_audio_rate = 0.0
+_audio_client: dict = {}
+
+
+def build_audio(out: str, params: dict) -> dict:
+    from generate_story_audio import TokenBucket, make_session, save_audio
+
+    api_key = os.environ.get("ELEVENLABS_API_KEY")
+    if not api_key:
+        raise RuntimeError("ELEVENLABS_API_KEY is not set")
+    if params["voice_id"] == story_text_export.DEFAULT_SETTINGS["voice_id"]:
+        raise RuntimeError(f"set voice_id in {story_text_export.OUTPUT.name}")
+    if not _audio_client:
+        _audio_client.update(session=make_session(1), limiter=TokenBucket(_audio_rate))
+    return {"bytes": save_audio(Path(out), api_key=api_key, **_audio_client, **params)}
+
+
+def build_outline(generator: str, scene: str, out: str) -> None:
+    module = __import__(generator)
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    before = stat_sig(Path(out))
+    module.render_scene(scene)
+    if stat_sig(Path(out)) in (None, before):
+        raise RuntimeError(f"{generator}.py did not write {out}; check `outlines` in build config")
+
+
+def build_optimize(path: str) -> dict:
+    from optimize_assets import optimize_file
+
+    result = optimize_file(Path(path), ASSETS_DIR, load_format_rules(CONFIG_PATH))
+    if result.get("action") == "error":
+        raise RuntimeError(result.get("error", "optimize failed"))
+    return result
+
+
+def build_mask(outline: str, mask: str, params: dict) -> dict:
+    from generate_masks import generate_mask
+
+    Path(mask).parent.mkdir(parents=True, exist_ok=True)
+    return generate_mask(outline, mask, dilate_iterations=params["dilate"],
+                         threshold=params["threshold"])
+
+
+ACTIONS = {
+    "story": build_story,
+    "audio": build_audio,
+    "outline": build_outline,
+    "optimize": build_optimize,
+    "mask": build_mask,
+}
+
+
+def _init_worker(audio_rate: float = 0.0) -> None:
+    global _audio_rate
+    os.chdir(REPO_DIR)
+    sys.path.insert(0, str(TOOLS_DIR))
+    _audio_rate = audio_rate
+
+
+def _run_action(action: str, args: list) -> dict:
+    """Run one action, capturing its output; failures come back as an error."""
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            result = ACTIONS[action](*args)
+    except (Exception, SystemExit) as e:
+        lines = log.getvalue().strip().splitlines()
+        error = str(e) if not isinstance(e, SystemExit) else (lines[-1] if lines else "exited")
+        return {"error": error or type(e).__name__, "seconds": time.perf_counter() - start}
+    return {"result": result, "seconds": time.perf_counter() - start}
+
+
+def run(
+    targets: list[dict], stale: dict[str, str], state: dict, jobs: int,
+    audio_concurrency: int = 1, audio_rate: float = 0.0,
+) -> list[dict]:
+    """Build the stale targets, each as soon as its dependencies are done.
+
+    No more than `audio_concurrency` audio targets run at once, and they are
+    started at most `audio_rate` per second (0 = unlimited). Each worker
+    also rate-limits its own retries at `audio_rate`.
+    """
+    results = []
+    waiting = {}
+    for target in targets:
+        if target["name"] not in stale:
+            continue
+        if stale[target["name"]] == "adopt":
+            record_built(target, state)
+            results.append({"name": target["name"], "reason": "adopt", "status": "adopted"})
+        else:
+            waiting[target["name"]] = target
+    total = len(waiting)
+    finished = 0
+    failed: set[str] = set()
+    if not waiting:
+        return results
+
+    audio_concurrency = max(1, audio_concurrency)
+    next_audio = 0.0  # monotonic time the next audio target may start
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, total)), initializer=_init_worker,
+                             initargs=(audio_rate,)) as pool:
+        running = {}
+        while waiting or running:
+            throttled = False
+            for name, target in list(waiting.items()):
+                if any(dep in waiting or dep in running.values() for dep in target["deps"]):
+                    continue
+                if target["action"] == "audio" and not any(dep in failed for dep in target["deps"]):
+                    if sum(n.startswith("audio:") for n in running.values()) >= audio_concurrency:
+                        continue
+                    now = time.monotonic()
+                    if now < next_audio:
+                        throttled = True
+                        continue
+                    if audio_rate > 0:
+                        next_audio = now + 1 / audio_rate
+                del waiting[name]
+                blocked = [dep for dep in target["deps"] if dep in failed]
+                if blocked:
+                    failed.add(name)
+                    finished += 1
+                    results.append({"name": name, "reason": stale[name], "status": "blocked",
+                                    "error": f"{blocked[0]} failed"})
+                    print(f"  [{finished}/{total}] BLOCKED {name}")
+                    continue
+                running[pool.submit(_run_action, target["action"], target["args"])] = name
+            # Wake up for the next audio start even if nothing finishes.
+            timeout = max(0.0, next_audio - time.monotonic()) if throttled else None
+            if not running:
+                time.sleep(timeout or 0)
+                continue
+
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                target = next(t for t in targets if t["name"] == name)
+                outcome = future.result()
+                finished += 1
+                entry = {"name": name, "reason": stale[name],
+                         "seconds": round(outcome["seconds"], 2)}
+                if "error" in outcome:
+                    failed.add(name)
+                    state["targets"].pop(name, None)
+                    entry.update(status="failed", error=outcome["error"])
+                    print(f"  [{finished}/{total}] ERROR {name}: {outcome['error']}")
+                else:
+                    record_built(target, state)
+                    entry.update(status="built", result=outcome["result"])
+                    print(f"  [{finished}/{total}] {name} ({stale[name]}) "
+                          f"{outcome['seconds']:.2f}s")
+                results.append(entry)
+    return results
+
+
+def load_state(path: Path) -> dict:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    for key in ("sources", "files", "targets"):
+        state.setdefault(key, {})
+    return state
+
+
+def save_state(state: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build stale assets through the pipeline graph")
+    parser.add_argument("targets", nargs="*", metavar="PATTERN",
+                        help="Build only targets matching these glob patterns (and their deps)")
+    parser.add_argument("--dry-run", action="store_true", help="List stale targets without building")
+    parser.add_argument("--force", action="store_true", help="Rebuild the selected targets regardless")
+    parser.add_argument("--list", action="store_true", help="List the selected targets and exit")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--state", type=Path, default=STATE_PATH,
+                        help=f"Build state file (default: {STATE_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        cfg = load_build_config(args.config)
+        rules = load_format_rules(args.config)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    state = load_state(args.state)
+    try:
+        targets = story_targets(state) + pack_targets(cfg, rules, state)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: bad build graph: {e}")
+        sys.exit(1)
+    targets = select(targets, args.targets)
+    if not targets:
+        print(f"Error: no targets match {' '.join(args.targets)}")
+        sys.exit(1)
+
+    if args.list:
+        for target in targets:
+            deps = f"  <- {', '.join(target['deps'])}" if target["deps"] else ""
+            print(f"{target['name']}{deps}")
+        return
+
+    stale = plan(targets, state, args.force)
+    if args.dry_run:
+        for name, reason in stale.items():
+            print(f"  {name} ({reason})")
+        print(f"\n{len(stale)} of {len(targets)} targets stale")
+        save_state(state, args.state)
+        return
+
+    try:
+        results = run(targets, stale, state, args.jobs,
+                      audio_concurrency=cfg["audio_concurrency"], audio_rate=cfg["audio_rate"])
+    finally:
+        save_state(state, args.state)
+    elapsed = time.perf_counter() - start
+
+    optimized = [r["result"] for r in results
+                 if r["status"] == "built" and r["name"].startswith("optimize:")]
+    if optimized:
+        from optimize_assets import record_decisions
+        record_decisions(optimized)
+
+    failed = [r for r in results if r["status"] in ("failed", "blocked")]
+    report = {"tool": "build_graph", "targets": len(targets), "stale": len(stale),
+              "failed": len(failed), "seconds": round(elapsed, 2), "results": results}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("BUILD SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Targets:          {len(targets)}")
+    print(f"Up to date:       {len(targets) - len(stale)}")
+    print(f"Built:            {sum(1 for r in results if r['status'] == 'built')}")
+    print(f"Adopted:          {sum(1 for r in results if r['status'] == 'adopted')}")
+    print(f"Failed:           {sum(1 for r in results if r['status'] == 'failed')}")
+    print(f"Blocked:          {sum(1 for r in results if r['status'] == 'blocked')}")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"State:            {args.state}")
+    print(f"Report:           {args.report}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Step Sequence Delta Encoder
+
+Recipe story steps (coloring/ghana/food/story/ghana_jollof_story_step_01_wash.png
+... _step_08_cook.png) are full-size pages that differ from each other in a
+small area, yet each step transition decodes a whole new page. This tool
+finds such sequences and factors each into one base image plus a small
+overlay per step, so a transition only decodes that step's overlay.
+
+A sequence is three or more same-size images in one directory whose names
+differ only in a step number (<prefix>_<NN>[_<label>].png). For each:
+
+    1. the base is the per-pixel mode of all steps, which leaves every step
+       as few changed pixels as possible
+    2. each step's changed pixels are marked on a `tile`-pixel grid and
+       covered with rectangles, one run of tiles per `strip` tile rows
+       (runs closer than `gap` tiles are joined)
+    3. the rectangles are cut from the step and shelf-packed into one
+       overlay image per step
+
+Sequences whose overlays would average more than `max_coverage` of a page
+are not near-identical and are left alone. Settings come from the `delta:`
+section of asset_config.yaml.
+
+Output goes to <output>/<asset dir>/: <prefix>_base.png, <prefix>_NN_delta.png
+and <prefix>.json, the manifest:
+
+    {"sequence": prefix, "size": [w, h], "base": file,
+     "steps": [{"index": 1, "source": asset path, "sha256": of RGBA pixels,
+                "overlay": file or null,
+                "patches": [[src_x, src_y, w, h, dst_x, dst_y], ...]}]}
+
+A step is recomposed by drawing the base, then copying each patch from the
+overlay onto it (BlendMode.src). Images are written losslessly (palette
+PNGs when a image has at most 256 colours) and every step is recomposed
+and checked bit-exact against its RGBA pixels after encoding; --verify
+re-checks existing manifests, against the sources when they are present.
+
+Usage:
+    python3 tools/delta_sequences.py                                 # Find + encode
+    python3 tools/delta_sequences.py assets/coloring/ghana/food/story
+    python3 tools/delta_sequences.py --verify                        # Re-check output
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from pixel_cache import load_pixels
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "delta_report.json"
+
+# <prefix>_<NN>[_<label>]: the last number in the stem is the step
+STEP_NAME = re.compile(r"^(?P<prefix>.*\D)_(?P<index>\d+)(?:_(?P<label>[^\d][^.]*))?$")
+
+IMAGE_EXTENSIONS = {".png", ".webp", ".jpg", ".jpeg"}
+
+
+def load_delta_config(config_path: Path) -> dict:
+    """Load the delta section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    delta = cfg.get("delta") or {}
+    delta.setdefault("paths", ["coloring"])
+    delta.setdefault("min_steps", 3)
+    delta.setdefault("tile", 16)
+    delta.setdefault("strip", 4)
+    delta.setdefault("gap", 1)
+    delta.setdefault("max_coverage", 0.15)
+    delta.setdefault("output", "build/delta")
+    return delta
+
+
+def find_sequences(paths: list[Path], min_steps: int) -> list[list[Path]]:
+    """Step-numbered image runs, grouped by directory and name prefix."""
+    groups: dict[tuple[Path, str], dict[int, Path]] = {}
+    for path in paths:
+        candidates = [path] if path.is_file() else path.rglob("*")
+        for p in candidates:
+            if not p.is_file() or p.suffix.lower() not in IMAGE_EXTENSIONS or "masks" in p.parts:
+                continue
+            m = STEP_NAME.match(p.stem)
+            if m:
+                groups.setdefault((p.parent.resolve(), m["prefix"]), {})[int(m["index"])] = p.resolve()
+    return [[steps[i] for i in sorted(steps)] for _, steps in sorted(groups.items())
+            if len(steps) >= min_steps]
+
+
+def rgba_words(path: Path) -> np.ndarray:
+    """Pixels as one uint32 per RGBA pixel, for exact comparison."""
+    return np.ascontiguousarray(load_pixels(path, "RGBA")).view(np.uint32)[..., 0]
+
+
+def pixel_sha256(words: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(words).tobytes()).hexdigest()
+
+
+def mode_image(stack: np.ndarray) -> np.ndarray:
+    """Most common value of each pixel across the stack (ties: lowest value)."""
+    ordered = np.sort(stack, axis=0)
+    best = ordered[0].copy()
+    best_count = np.ones(best.shape, dtype=np.int32)
+    count = np.ones(best.shape, dtype=np.int32)
+    for i in range(1, len(ordered)):
+        count = np.where(ordered[i] == ordered[i - 1], count + 1, 1)
+        better = count > best_count
+        best[better] = ordered[i][better]
+        np.maximum(best_count, count, out=best_count)
+    return best
+
+
+def changed_tiles(step: np.ndarray, base: np.ndarray, tile: int) -> np.ndarray:
+    h, w = base.shape
+    th, tw = -(-h // tile), -(-w // tile)
+    diff = np.zeros((th * tile, tw * tile), dtype=bool)
+    diff[:h, :w] = step != base
+    return diff.reshape(th, tile, tw, tile).any(axis=(1, 3))
+
+
+def cover_tiles(tiles: np.ndarray, strip: int, gap: int) -> list[tuple[int, int, int, int]]:
+    """Rectangles (x, y, w, h, in tiles) covering every set tile.
+
+    Each band of `strip` tile rows gets one rectangle per run of changed
+    columns, runs closer than `gap` tiles joined, trimmed to the rows used.
+    """
+    rects = []
+    for y0 in range(0, tiles.shape[0], strip):
+        band = tiles[y0:y0 + strip]
+        cols = np.flatnonzero(band.any(axis=0))
+        if not len(cols):
+            continue
+        breaks = np.flatnonzero(np.diff(cols) > gap + 1)
+        for start, end in zip(np.r_[cols[0], cols[breaks + 1]], np.r_[cols[breaks], cols[-1]] + 1):
+            rows = np.flatnonzero(band[:, start:end].any(axis=1))
+            rects.append((int(start), y0 + int(rows[0]), int(end - start), int(rows[-1] - rows[0] + 1)))
+    return rects
+
+
+def shelf_pack(sizes: list[tuple[int, int]]) -> tuple[tuple[int, int], list[tuple[int, int]]]:
+    """Place (w, h) boxes on shelves, tallest first; returns atlas size and positions."""
+    area = sum(w * h for w, h in sizes)
+    width = max(max(w for w, _ in sizes), int(np.ceil(np.sqrt(area) * 1.1)))
+    positions: list[tuple[int, int]] = [(0, 0)] * len(sizes)
+    x = y = shelf = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    height = max(py + sizes[i][1] for i, (_, py) in enumerate(positions))
+    return (width, height), positions
+
+
+def encode_png(words: np.ndarray, path: Path) -> int:
+    """Write uint32 RGBA pixels losslessly; palette PNG when 256 colours or fewer."""
+    rgba = words.view(np.uint8).reshape(*words.shape, 4)
+    colors, index = np.unique(words, return_inverse=True)
+    opaque = bool((rgba[..., 3] == 255).all())
+    if len(colors) <= 256:
+        img = Image.fromarray(index.reshape(words.shape).astype(np.uint8), "P")
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        img.putpalette(palette[:, :3].tobytes())
+        extra = {} if opaque else {"transparency": palette[:, 3].tobytes()}
+        img.save(path, format="PNG", optimize=True, **extra)
+    else:
+        img = Image.fromarray(np.ascontiguousarray(rgba[..., :3] if opaque else rgba),
+                              "RGB" if opaque else "RGBA")
+        img.save(path, format="PNG", optimize=True)
+    return path.stat().st_size
+
+
+def recompose(base: np.ndarray, overlay: np.ndarray | None, patches: list[list[int]]) -> np.ndarray:
+    page = base.copy()
+    for sx, sy, w, h, dx, dy in patches:
+        page[dy:dy + h, dx:dx + w] = overlay[sy:sy + h, sx:sx + w]
+    return page
+
+
+def encode_sequence(sources: list[Path], assets_dir: Path, out_root: Path, cfg: dict) -> dict:
+    """Factor one sequence into base + overlays, write them and verify every step."""
+    first = sources[0]
+    prefix = STEP_NAME.match(first.stem)["prefix"]
+    rel_dir = first.parent.relative_to(assets_dir)
+    result: dict = {"sequence": (rel_dir / prefix).as_posix(), "steps": len(sources)}
+    try:
+        steps = [rgba_words(p) for p in sources]
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    if len({s.shape for s in steps}) > 1:
+        result["skipped"] = "steps differ in size"
+        return result
+    stack = np.stack(steps)
+
+    n, h, w = stack.shape
+    tile, page = cfg["tile"], h * w
+    base = mode_image(stack)
+    covers = []
+    for step in stack:
+        rects = cover_tiles(changed_tiles(step, base, tile), cfg["strip"], cfg["gap"])
+        # Tile rectangles in pixels, clipped to the page
+        covers.append([(x * tile, y * tile, min(rw * tile, w - x * tile), min(rh * tile, h - y * tile))
+                       for x, y, rw, rh in rects])
+    coverage = sum(rw * rh for rects in covers for _, _, rw, rh in rects) / (n * page)
+    result["coverage"] = round(coverage, 4)
+    if coverage > cfg["max_coverage"]:
+        result["skipped"] = f"overlays would average {coverage:.0%} of a page"
+        return result
+
+    out_dir = out_root / rel_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"sequence": prefix, "size": [w, h], "base": f"{prefix}_base.png", "steps": []}
+    delta_bytes = encode_png(base, out_dir / manifest["base"])
+    result["base_bytes"] = delta_bytes
+    overlay_pixels = 0
+    for i, (source, step, rects) in enumerate(zip(sources, stack, covers)):
+        entry = {"index": int(STEP_NAME.match(source.stem)["index"]),
+                 "source": source.relative_to(assets_dir).as_posix(),
+                 "sha256": pixel_sha256(step), "overlay": None, "patches": []}
+        overlay = None
+        if rects:
+            (aw, ah), positions = shelf_pack([(rw, rh) for _, _, rw, rh in rects])
+            overlay = np.zeros((ah, aw), dtype=np.uint32)
+            for (x, y, rw, rh), (sx, sy) in zip(rects, positions):
+                overlay[sy:sy + rh, sx:sx + rw] = step[y:y + rh, x:x + rw]
+                entry["patches"].append([sx, sy, rw, rh, x, y])
+            entry["overlay"] = f"{prefix}_{entry['index']:02d}_delta.png"
+            delta_bytes += encode_png(overlay, out_dir / entry["overlay"])
+            overlay_pixels += aw * ah
+        if not np.array_equal(recompose(base, overlay, entry["patches"]), step):
+            result["error"] = f"step {entry['index']} does not recompose exactly"
+            return result
+        manifest["steps"].append(entry)
+
+    (out_dir / f"{prefix}.json").write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    verified = verify_manifest(out_dir / f"{prefix}.json", assets_dir)
+    if verified["mismatched"]:
+        result["error"] = f"written files do not recompose: {', '.join(verified['mismatched'])}"
+        return result
+    result.update({
+        "manifest": (out_dir / f"{prefix}.json").relative_to(out_root).as_posix(),
+        "source_bytes": sum(p.stat().st_size for p in sources),
+        "delta_bytes": delta_bytes,
+        "patches": sum(len(s["patches"]) for s in manifest["steps"]),
+        "step_decode": round(overlay_pixels / (n * page), 4),
+    })
+    return result
+
+
+def verify_manifest(manifest_path: Path, assets_dir: Path) -> dict:
+    """Recompose every step from the written files and compare bit-exactly."""
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    out_dir = manifest_path.parent
+    base = np.ascontiguousarray(np.asarray(Image.open(out_dir / manifest["base"]).convert("RGBA")))
+    base = base.view(np.uint32)[..., 0]
+    mismatched, checked_sources = [], 0
+    for entry in manifest["steps"]:
+        overlay = None
+        if entry["overlay"]:
+            overlay = np.ascontiguousarray(
+                np.asarray(Image.open(out_dir / entry["overlay"]).convert("RGBA"))).view(np.uint32)[..., 0]
+        page = recompose(base, overlay, entry["patches"])
+        ok = pixel_sha256(page) == entry["sha256"]
+        source = assets_dir / entry["source"]
+        if ok and source.exists():
+            ok = np.array_equal(page, rgba_words(source))
+            checked_sources += 1
+        if not ok:
+            mismatched.append(f"step {entry['index']}")
+    return {"manifest": manifest_path.as_posix(), "steps": len(manifest["steps"]),
+            "checked_sources": checked_sources, "mismatched": mismatched}
+
+
+def verify_all(out_root: Path, assets_dir: Path) -> None:
+    manifests = sorted(out_root.rglob("*.json"))
+    if not manifests:
+        print(f"Error: no manifests under {out_root}")
+        sys.exit(1)
+    failed = 0
+    for path in manifests:
+        r = verify_manifest(path, assets_dir)
+        status = "OK" if not r["mismatched"] else f"MISMATCH {', '.join(r['mismatched'])}"
+        print(f"  {path.relative_to(out_root)}: {r['steps']} steps, "
+              f"{r['checked_sources']} checked against sources  {status}")
+        failed += bool(r["mismatched"])
+    print(f"\n{len(manifests) - failed}/{len(manifests)} sequences recompose exactly")
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode step image sequences as base + deltas")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Files or directories to search (default: delta.paths)")
+    parser.add_argument("--out", type=Path, help="Output directory (default: delta.output)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Re-check existing manifests instead of encoding")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    try:
+        cfg = load_delta_config(args.config)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    assets_dir = ASSETS_DIR.resolve()
+    out_root = (args.out or REPO_DIR / cfg["output"]).resolve()
+    if args.verify:
+        verify_all(out_root, assets_dir)
+        return
+
+    roots = [p.resolve() for p in args.paths] or [assets_dir / p for p in cfg["paths"]]
+    outside = [p for p in roots if p != assets_dir and assets_dir not in p.parents]
+    if outside:
+        print(f"Error: {outside[0]} is not under {assets_dir}")
+        sys.exit(1)
+    sequences = find_sequences(roots, cfg["min_steps"])
+    print(f"Found {len(sequences)} step sequence(s)\n")
+
+    start = time.perf_counter()
+    results = []
+
+    def report(r: dict) -> None:
+        results.append(r)
+        prefix = f"  [{len(results)}/{len(sequences)}] {r['sequence']} ({r['steps']} steps)"
+        if "error" in r:
+            print(f"{prefix}  ERROR: {r['error']}")
+        elif "skipped" in r:
+            print(f"{prefix}  skipped: {r['skipped']}")
+        else:
+            print(f"{prefix}  {r['source_bytes'] / 1024:.0f} KB -> {r['delta_bytes'] / 1024:.0f} KB, "
+                  f"{r['patches']} patches, each step decodes {r['step_decode']:.1%} of a page")
+
+    work = [(seq, assets_dir, out_root, cfg) for seq in sequences]
+    if args.jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for future in as_completed([pool.submit(encode_sequence, *w) for w in work]):
+                report(future.result())
+    else:
+        for w in work:
+            report(encode_sequence(*w))
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["sequence"])
+    encoded = [r for r in results if "manifest" in r]
+    failed = [r for r in results if "error" in r]
+    source_total = sum(r["source_bytes"] for r in encoded)
+    delta_total = sum(r["delta_bytes"] for r in encoded)
+
+    report_data = {"tool": "delta_sequences", "sequences": len(results), "encoded": len(encoded),
+                   "errors": len(failed), "seconds": round(elapsed, 2),
+                   "settings": {k: cfg[k] for k in ("tile", "strip", "gap", "max_coverage")},
+                   "results": results}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report_data, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("DELTA SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Sequences:        {len(results)}")
+    print(f"Encoded:          {len(encoded)}")
+    print(f"Skipped:          {sum(1 for r in results if 'skipped' in r)}")
+    print(f"Errors:           {len(failed)}")
+    if encoded:
+        print(f"Source total:     {source_total / 1024:.0f} KB")
+        print(f"Delta total:      {delta_total / 1024:.0f} KB ({delta_total / source_total:.0%})")
+        steps = sum(r["steps"] for r in encoded)
+        decode = sum(r["step_decode"] * r["steps"] for r in encoded) / steps
+        print(f"Step decode:      {decode:.1%} of a page per transition")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"Output:           {out_root}")
+    print(f"Report:           {args.report}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
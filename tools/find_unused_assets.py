@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Unused Asset Finder
+
+pubspec.yaml bundles whole directories, so every file in them ships whether
+the app uses it or not. This tool indexes every asset path referenced from
+lib/**/*.dart and from the JSON data files (recipes, traces, achievements,
+catalogs), then reports:
+
+  * unreferenced — bundled files nothing refers to, with their byte cost
+  * dangling     — referenced paths that don't exist on disk
+
+Dart paths built with interpolation ('assets/stories/$countryId/page_$n.webp')
+are resolved against string constants in the same file where possible and
+otherwise treated as globs, so dynamically loaded files count as used.
+Bare file names with an asset extension ('drop.mp3') match by basename.
+
+Usage:
+    python3 tools/find_unused_assets.py                       # Print report
+    python3 tools/find_unused_assets.py --json report.json    # Also write JSON report
+    python3 tools/find_unused_assets.py --write-asset-list assets.yaml
+                                                              # Exact-file pubspec list
+
+Requirements:
+    pip install pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import yaml
+
+REPO_DIR = Path(__file__).parent.parent
+PUBSPEC_PATH = REPO_DIR / "pubspec.yaml"
+
+# Where JSON data files that can reference assets live
+JSON_ROOTS = ("assets", "lib")
+
+# Path prefixes of bundled files as they appear in code and data
+PATH_ROOTS = ("assets/", "lib/")
+
+# Extensions that make a bare string literal look like an asset file name
+ASSET_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp3", ".wav",
+                    ".ogg", ".json", ".svg", ".ttf", ".otf")
+
+_STRING_RE = re.compile(r"'((?:[^'\\\n]|\\.)*)'|\"((?:[^\"\\\n]|\\.)*)\"")
+_CONST_RE = re.compile(
+    r"\b(?:const|final|var|static const|static final)\s+(?:String\s+)?"
+    r"(\w+)\s*=\s*(?:'([^'\n]*)'|\"([^\"\n]*)\")\s*;")
+_INTERP_RE = re.compile(r"\$\{\s*(\w+)\s*\}|\$(\w+)|\$\{[^}]*\}")
+
+
+def load_pubspec_assets(pubspec_path: Path) -> list[str]:
+    """Return the flutter.assets entries from pubspec.yaml."""
+    with open(pubspec_path) as f:
+        spec = yaml.safe_load(f)
+    return list((spec.get("flutter") or {}).get("assets") or [])
+
+
+def bundled_files(repo_dir: Path, entries: list[str]) -> dict[str, int]:
+    """Map every file Flutter would bundle to its size in bytes.
+
+    Directory entries bundle only their direct children, like Flutter does.
+    """
+    files: dict[str, int] = {}
+    for entry in entries:
+        path = repo_dir / entry
+        if entry.endswith("/"):
+            if not path.is_dir():
+                continue
+            for child in sorted(path.iterdir()):
+                if child.is_file() and not child.name.startswith("."):
+                    files[child.relative_to(repo_dir).as_posix()] = child.stat().st_size
+        elif path.is_file():
+            files[entry] = path.stat().st_size
+    return files
+
+
+def _resolve_interpolation(literal: str, constants: dict[str, str]) -> str:
+    """Substitute known constants; any other interpolation becomes a glob."""
+    def sub(match: re.Match) -> str:
+        name = match.group(1) or match.group(2)
+        if name and name in constants:
+            return constants[name]
+        return "*"
+    # Resolve nested constants (const _a = '$_b/x') a few levels deep.
+    for _ in range(3):
+        resolved = _INTERP_RE.sub(sub, literal)
+        if resolved == literal:
+            break
+        literal = resolved
+    return literal
+
+
+def dart_references(repo_dir: Path) -> tuple[set[str], set[str]]:
+    """Return (literal paths, glob patterns) referenced from lib/**/*.dart."""
+    literals: set[str] = set()
+    patterns: set[str] = set()
+    for path in sorted((repo_dir / "lib").rglob("*.dart")):
+        source = path.read_text(encoding="utf-8")
+        constants = {m.group(1): m.group(2) if m.group(2) is not None else m.group(3)
+                     for m in _CONST_RE.finditer(source)}
+        for match in _STRING_RE.finditer(source):
+            raw = match.group(1) if match.group(1) is not None else match.group(2)
+            if raw.startswith("package:") or raw.startswith("."):
+                continue
+            value = _resolve_interpolation(raw, constants)
+            if value.startswith(PATH_ROOTS) or "/assets/" in value:
+                if not value.startswith(PATH_ROOTS):
+                    value = value[value.index("assets/"):]
+                if value.endswith("/"):
+                    value += "*"
+                if "*" not in value:
+                    literals.add(value)
+                elif _is_specific_pattern(value):
+                    patterns.add(value)
+            elif (value.lower().endswith(ASSET_EXTENSIONS) and "/" not in value
+                  and _is_specific_pattern(value)):
+                # Bare file name, e.g. a sound cue joined onto a directory.
+                patterns.add("*/" + value)
+    return literals, patterns
+
+
+def _is_specific_pattern(pattern: str) -> bool:
+    """Reject globs so broad they would mark everything as used.
+
+    A path pattern needs a literal directory below its root ('assets/*' is
+    rejected); a bare file name needs a literal stem ('$cue.mp3' is rejected).
+    """
+    if "/" not in pattern:
+        return not Path(pattern).stem.strip("*") == ""
+    parts = pattern.split("/")
+    return len(parts) > 2 and "*" not in parts[1]
+
+
+def _json_strings(node):
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for value in node.values():
+            yield from _json_strings(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _json_strings(value)
+
+
+def json_references(repo_dir: Path) -> tuple[set[str], set[str]]:
+    """Return (literal paths, glob patterns) referenced from JSON data files.
+
+    Relative file names ("cat.json" in a trace pack, "kente.webp" in the
+    sticker catalog) are resolved against the JSON file's own directory when
+    they contain a directory, and matched by basename otherwise.
+    """
+    literals: set[str] = set()
+    patterns: set[str] = set()
+    for root in JSON_ROOTS:
+        for dirpath, _, filenames in os.walk(repo_dir / root):
+            for fname in sorted(filenames):
+                if not fname.endswith(".json"):
+                    continue
+                path = Path(dirpath) / fname
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except (ValueError, UnicodeDecodeError) as e:
+                    print(f"  WARNING: cannot parse {path.relative_to(repo_dir)}: {e}",
+                          file=sys.stderr)
+                    continue
+                base = path.parent.relative_to(repo_dir).as_posix()
+                for value in _json_strings(data):
+                    if value.startswith(PATH_ROOTS):
+                        literals.add(value)
+                    elif not value.lower().endswith(ASSET_EXTENSIONS) or ":" in value:
+                        continue
+                    elif "/" in value:
+                        literals.add(os.path.normpath(f"{base}/{value}").replace(os.sep, "/"))
+                    elif _is_specific_pattern(value):
+                        patterns.add("*/" + value)
+    return literals, patterns
+
+
+def _extension_mismatches(repo_dir: Path, dangling: list[str]) -> list[dict]:
+    """Pair dangling references with an existing file differing only in extension."""
+    mismatches = []
+    for ref in dangling:
+        ref_path = repo_dir / ref
+        if not ref_path.parent.is_dir():
+            continue
+        for candidate in sorted(ref_path.parent.iterdir()):
+            if candidate.stem == ref_path.stem and candidate.is_file():
+                mismatches.append({"reference": ref,
+                                   "existing": candidate.relative_to(repo_dir).as_posix()})
+                break
+    return mismatches
+
+
+def analyze(repo_dir: Path, pubspec_path: Path) -> dict:
+    """Build the usage report."""
+    bundled = bundled_files(repo_dir, load_pubspec_assets(pubspec_path))
+    dart_literals, dart_patterns = dart_references(repo_dir)
+    json_literals, json_patterns = json_references(repo_dir)
+    literals = dart_literals | json_literals
+    patterns = dart_patterns | json_patterns
+
+    referenced = {p for p in bundled if p in literals}
+    dynamic = {p for p in bundled if p not in referenced
+               and any(fnmatch.fnmatch(p, pat) for pat in patterns)}
+    unreferenced = sorted((p for p in bundled if p not in referenced and p not in dynamic),
+                          key=lambda p: -bundled[p])
+    dangling = sorted(p for p in literals if not (repo_dir / p).exists())
+
+    return {
+        "bundled_files": len(bundled),
+        "bundled_bytes": sum(bundled.values()),
+        "referenced": sorted(referenced),
+        "dynamic": sorted(dynamic),
+        "unreferenced": [{"path": p, "bytes": bundled[p]} for p in unreferenced],
+        "unreferenced_bytes": sum(bundled[p] for p in unreferenced),
+        "dangling": dangling,
+        "extension_mismatch": _extension_mismatches(repo_dir, dangling),
+        "patterns": sorted(patterns),
+    }
+
+
+def write_asset_list(report: dict, out_path: Path) -> None:
+    """Write an exact-file flutter.assets list for pubspec.yaml."""
+    used = sorted(set(report["referenced"]) | set(report["dynamic"]))
+    lines = ["# Generated by tools/find_unused_assets.py -- paste under flutter: assets:",
+             "assets:"]
+    lines += [f"  - {json.dumps(p)}" if " " in p else f"  - {p}" for p in used]
+    out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find unused Planet Wonders assets")
+    parser.add_argument("--pubspec", type=str, default=str(PUBSPEC_PATH),
+                        help="Path to pubspec.yaml")
+    parser.add_argument("--json", type=str,
+                        help="Write the full report as JSON to this path")
+    parser.add_argument("--write-asset-list", type=str,
+                        help="Write an exact-file asset list (YAML) to this path")
+    args = parser.parse_args()
+
+    report = analyze(REPO_DIR, Path(args.pubspec))
+
+    if report["unreferenced"]:
+        print("Unreferenced bundled files:")
+        for item in report["unreferenced"]:
+            print(f"  {item['bytes']:>12,}  {item['path']}")
+    if report["dangling"]:
+        print("\nDangling references (file missing):")
+        for path in report["dangling"]:
+            print(f"  {path}")
+    if report["extension_mismatch"]:
+        print("\nReferenced with the wrong extension:")
+        for item in report["extension_mismatch"]:
+            print(f"  {item['reference']}  (exists as {item['existing']})")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nReport written to: {args.json}")
+    if args.write_asset_list:
+        write_asset_list(report, Path(args.write_asset_list))
+        print(f"Asset list written to: {args.write_asset_list}")
+
+    print(f"\n{'='*60}")
+    print("ASSET USAGE SUMMARY")
+    print(f"{'='*60}")
+    print(f"Bundled files:    {report['bundled_files']}")
+    print(f"Referenced:       {len(report['referenced'])}")
+    print(f"Dynamic matches:  {len(report['dynamic'])}")
+    print(f"Unreferenced:     {len(report['unreferenced'])} "
+          f"({report['unreferenced_bytes'] / (1024*1024):.1f} MB of "
+          f"{report['bundled_bytes'] / (1024*1024):.1f} MB)")
+    print(f"Dangling:         {len(report['dangling'])}")
+
+
+if __name__ == "__main__":
+    main()
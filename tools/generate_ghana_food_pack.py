@@ -4,8 +4,13 @@ from __future__ import annotations
 import math
 from pathlib import Path
 
+import numpy as np
 from PIL import Image, ImageDraw
 
+from pixel_cache import load_pixels
+from scene_render import ScaledDraw, run_pack
+from scene_svg import RecordingDraw, write_svg
+
 W = 2048
 H = 2048
 BLACK = 0
@@ -249,10 +254,12 @@ SCENES = [
 ]
 
 
-def finalize(img: Image.Image, out_path: Path) -> None:
-    # Hard-threshold to pure B/W for fill safety.
-    bw = img.point(lambda p: 0 if p < 180 else 255, mode='1').convert('L')
+def finalize(img: Image.Image, out_path: Path) -> Image.Image:
+    # Hard-threshold to pure B/W for fill safety; saved as 1-bit PNG.
+    bw = img.point(lambda p: 0 if p < 180 else 255, mode='1')
     bw.save(out_path, format='PNG', optimize=True)
+    validate(out_path)
+    return bw
 
 
 def validate(path: Path) -> None:
@@ -261,23 +268,35 @@ def validate(path: Path) -> None:
         raise RuntimeError(f'{path.name} is not PNG')
     if img.size != (W, H):
         raise RuntimeError(f'{path.name} size is {img.size}, expected {(W, H)}')
-    vals = set(img.convert('L').getdata())
+    vals = set(np.unique(load_pixels(path, 'L')).tolist())
     if not vals.issubset({0, 255}):
         bad = sorted(v for v in vals if v not in {0, 255})
         raise RuntimeError(f'{path.name} contains non-BW values: {bad[:10]}')
 
 
-def main() -> None:
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
+def render_scene(name: str, svg_dir: Path | None = None) -> dict | None:
+    fn = dict(SCENES)[name]
+    img, draw = new_canvas()
+    draw = RecordingDraw(draw)
+    fn(draw)
+    add_border(draw)
+    bw = finalize(img, OUT_DIR / name)
+    if svg_dir is not None:
+        return write_svg(draw, bw, svg_dir / Path(name).with_suffix('.svg'))
+    return None
+
 
-    for name, fn in SCENES:
-        img, draw = new_canvas()
-        fn(draw)
-        add_border(draw)
-        finalize(img, OUT_DIR / name)
+def preview_scene(name: str, scale: float) -> Image.Image:
+    img = Image.new('L', (round(W * scale), round(H * scale)), WHITE)
+    draw = ScaledDraw(ImageDraw.Draw(img), scale)
+    dict(SCENES)[name](draw)
+    add_border(draw)
+    return img
 
-    for name, _ in SCENES:
-        validate(OUT_DIR / name)
+
+def main() -> None:
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    run_pack('Ghana food pack', SCENES, render_scene, preview_scene)
 
 
 if __name__ == '__main__':
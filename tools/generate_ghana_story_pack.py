@@ -4,8 +4,13 @@ from __future__ import annotations
 import math
 from pathlib import Path
 
+import numpy as np
 from PIL import Image, ImageDraw
 
+from pixel_cache import load_pixels
+from scene_render import ScaledDraw, run_pack
+from scene_svg import RecordingDraw, write_svg
+
 W = 2048
 H = 2048
 BLACK = 0
@@ -248,9 +253,11 @@ def draw_thought_bubble(draw: ImageDraw.ImageDraw, x: int, y: int, w: int, h: in
     draw.ellipse((x, y, x + w, y + h), outline=BLACK, width=MAIN)
 
 
-def finalize(img: Image.Image, out_path: Path) -> None:
-    bw = img.point(lambda p: 0 if p < 180 else 255, mode='1').convert('L')
+def finalize(img: Image.Image, out_path: Path) -> Image.Image:
+    bw = img.point(lambda p: 0 if p < 180 else 255, mode='1')
     bw.save(out_path, format='PNG', optimize=True)
+    validate(out_path)
+    return bw
 
 
 # -----------------------------
@@ -613,25 +620,35 @@ def validate(path: Path) -> None:
     img = Image.open(path)
     if img.size != (W, H):
         raise RuntimeError(f'{path.name} has wrong size: {img.size}')
-    px = img.convert('L').getdata()
-    vals = set(px)
+    vals = set(np.unique(load_pixels(path, 'L')).tolist())
     if not vals.issubset({0, 255}):
         bad = sorted(v for v in vals if v not in {0, 255})
         raise RuntimeError(f'{path.name} has non-bw values: {bad[:10]}')
 
 
-def main() -> None:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+def render_scene(name: str, svg_dir: Path | None = None) -> dict | None:
+    fn = dict(SCENES)[name]
+    img, draw = new_canvas()
+    draw = RecordingDraw(draw)
+    fn(draw)
+    add_border(draw)
+    bw = finalize(img, OUTPUT_DIR / name)
+    if svg_dir is not None:
+        return write_svg(draw, bw, svg_dir / Path(name).with_suffix('.svg'))
+    return None
+
 
-    for name, fn in SCENES:
-        img, draw = new_canvas()
-        fn(draw)
-        add_border(draw)
-        out_path = OUTPUT_DIR / name
-        finalize(img, out_path)
+def preview_scene(name: str, scale: float) -> Image.Image:
+    img = Image.new('L', (round(W * scale), round(H * scale)), WHITE)
+    draw = ScaledDraw(ImageDraw.Draw(img), scale)
+    dict(SCENES)[name](draw)
+    add_border(draw)
+    return img
 
-    for name, _ in SCENES:
-        validate(OUTPUT_DIR / name)
+
+def main() -> None:
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    run_pack('Ghana story pack', SCENES, render_scene, preview_scene)
 
 
 if __name__ == '__main__':
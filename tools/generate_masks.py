@@ -7,6 +7,9 @@ integer ID (1-255). Pixel value 0 = outline/border (not fillable).
 
 Usage:
     python generate_masks.py input_outline.png output_mask.png
+    python generate_masks.py --batch assets/coloring/usa             # every outline -> masks/
+    python generate_masks.py --batch assets/coloring/usa --shard 1/4 --report s1.json
+    python generate_masks.py --merge-reports s1.json s2.json s3.json s4.json
 
 Requirements:
     pip install opencv-python numpy pillow
@@ -22,10 +25,19 @@ Algorithm:
 """
 
 import sys
+import time
+from pathlib import Path
+
 import cv2
 import numpy as np
 from PIL import Image
 
+from pixel_cache import load_pixels
+from sharding import merge_reports, select_shard, write_report
+
+# Tool name stamped into --report files
+REPORT_TOOL = "generate_masks"
+
 
 def generate_mask(input_path, output_path, dilate_iterations=1, threshold=200):
     """
@@ -36,15 +48,18 @@ def generate_mask(input_path, output_path, dilate_iterations=1, threshold=200):
         output_path: Path to output mask PNG (grayscale, region IDs)
         dilate_iterations: Number of dilation passes to seal gaps (default: 1)
         threshold: Grayscale threshold for line detection (default: 200)
+
+    Returns:
+        dict with the component count and the number of fillable regions written
     """
     print(f"Loading outline image: {input_path}")
-    img = cv2.imread(input_path)
-
-    if img is None:
-        raise ValueError(f"Could not load image: {input_path}")
+    try:
+        img = load_pixels(input_path, "RGB")
+    except (OSError, ValueError):
+        raise ValueError(f"Could not load image: {input_path}") from None
 
     # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(np.ascontiguousarray(img), cv2.COLOR_RGB2GRAY)
     print(f"  Image size: {gray.shape[1]}x{gray.shape[0]}")
 
     # Threshold: pixels below threshold become foreground (lines)
@@ -124,9 +139,105 @@ def generate_mask(input_path, output_path, dilate_iterations=1, threshold=200):
     print(f"Saving mask to: {output_path}")
     Image.fromarray(mask, mode='L').save(output_path)
     print(f"✓ Mask generated successfully: {num_labels - 1} regions")
+    return {"components": num_labels - 1, "regions": region_id - 1,
+            "capped": len(filtered_components) > 255}
+
+
+def batch_outlines(batch_dir):
+    """Outline PNGs under batch_dir, skipping masks/ directories.
+
+    Masks are written flat as <stem>_mask.png, so two outlines sharing a stem
+    raise ValueError rather than overwrite each other's mask.
+    """
+    outlines = sorted(p for p in Path(batch_dir).rglob('*')
+                      if p.suffix.lower() == '.png' and 'masks' not in p.parts)
+    seen = {}
+    for outline in outlines:
+        if outline.stem in seen:
+            raise ValueError(f"outlines {seen[outline.stem]} and {outline} "
+                             f"would both write {outline.stem}_mask.png")
+        seen[outline.stem] = outline
+    return outlines
+
+
+def run_batch(batch_dir, mask_dir, shard, report, dilate, threshold):
+    """Generate masks for every outline (or this shard's share of them)."""
+    batch_dir = Path(batch_dir)
+    mask_dir = Path(mask_dir) if mask_dir else batch_dir / 'masks'
+    outlines, shard_meta = select_shard(batch_outlines(batch_dir), batch_dir, shard)
+    print(f"{len(outlines)} of {shard_meta['plan_files']} outlines"
+          + (f" (shard {shard})" if shard else ""))
+    mask_dir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for i, outline in enumerate(outlines, 1):
+        rel = outline.relative_to(batch_dir).as_posix()
+        output = mask_dir / f"{outline.stem}_mask.png"
+        print(f"\n[{i}/{len(outlines)}] {rel}")
+        start = time.perf_counter()
+        try:
+            stats = generate_mask(str(outline), str(output),
+                                  dilate_iterations=dilate, threshold=threshold)
+            results.append({"path": rel, "action": "written",
+                            "mask": output.as_posix(), **stats,
+                            "seconds": round(time.perf_counter() - start, 3)})
+        except Exception as e:
+            print(f"ERROR: {e}")
+            results.append({"path": rel, "action": "error", "error": str(e)})
+
+    if report:
+        write_report(Path(report), REPORT_TOOL, shard_meta, results)
+        print(f"\nReport written to: {report}")
+    print_summary(results)
+    return results
+
+
+def print_summary(results):
+    """Print the batch summary for a list of mask results."""
+    written = [r for r in results if r["action"] == "written"]
+    print(f"\n{'='*60}")
+    print("MASK SUMMARY")
+    print(f"{'='*60}")
+    print(f"Outlines processed: {len(results)}")
+    print(f"Masks written:      {len(written)}")
+    print(f"Errors:             {len(results) - len(written)}")
+    print(f"Regions total:      {sum(r['regions'] for r in written)}")
+    print(f"Capped at 255:      {sum(r['capped'] for r in written)}")
+    print(f"Time:               {sum(r['seconds'] for r in written):.1f}s")
+
+
+def _option(name, default=None):
+    """Value following `name` in sys.argv, or default."""
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return default
 
 
 def main():
+    if '--merge-reports' in sys.argv:
+        reports = sys.argv[sys.argv.index('--merge-reports') + 1:]
+        try:
+            results, problems = merge_reports([Path(p) for p in reports], REPORT_TOOL)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"ERROR: cannot read reports: {e}")
+            sys.exit(1)
+        for problem in problems:
+            print(f"WARNING: {problem}")
+        print_summary(results)
+        sys.exit(1 if problems else 0)
+
+    if '--batch' in sys.argv:
+        try:
+            results = run_batch(_option('--batch'), _option('--mask-dir'),
+                                _option('--shard'), _option('--report'),
+                                int(_option('--dilate', 1)), int(_option('--threshold', 200)))
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        sys.exit(1 if any(r["action"] == "error" for r in results) else 0)
+
     if len(sys.argv) < 3:
         print(__doc__)
         print("\nUsage:")
@@ -134,6 +245,12 @@ def main():
         print("\nOptional arguments:")
         print("  --dilate N      Number of dilation iterations (default: 1)")
         print("  --threshold T   Grayscale threshold for line detection (default: 200)")
+        print("\nBatch mode:")
+        print("  --batch DIR             Generate masks for every outline PNG under DIR")
+        print("  --mask-dir DIR          Where batch masks go (default: <batch DIR>/masks)")
+        print("  --shard i/N             Only process shard i of N, balanced by file size")
+        print("  --report FILE           Write per-outline results as JSON")
+        print("  --merge-reports F...    Combine shard reports and print the summary")
         sys.exit(1)
 
     input_path = sys.argv[1]
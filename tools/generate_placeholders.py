@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Placeholder Manifest Generator
+
+Computes a low-quality placeholder for every displayable image so screens
+can paint instantly and lay out without waiting for decode. Each entry in
+the manifest (assets/placeholders.json) holds:
+
+    width, height   original pixel dimensions
+    blurhash        BlurHash string (components from asset_config.yaml)
+    color           dominant colour as #rrggbb
+
+Sources come from the `placeholders:` section of asset_config.yaml.
+Transparent pixels are composited over white before hashing. Results are
+cached by file content hash in .asset_cache/, so unchanged images are not
+decoded again.
+
+Remember to add `assets/placeholders.json` to pubspec.yaml.
+
+Usage:
+    python3 tools/generate_placeholders.py            # Update manifest
+    python3 tools/generate_placeholders.py --force    # Ignore the cache
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from pixel_cache import content_hash, load_image
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+CACHE_PATH = REPO_DIR / ".asset_cache" / "placeholders.json"
+
+# File extensions we compute placeholders for
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# Images are shrunk to this size before hashing; BlurHash needs very little.
+SAMPLE_SIZE = 64
+
+_BASE83 = ("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+           "#$%*+,-.:;=?@[]^_{|}~")
+
+
+def load_placeholder_config(config_path: Path) -> dict:
+    """Load the placeholder section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    ph = cfg.get("placeholders") or {}
+    ph.setdefault("manifest", "placeholders.json")
+    ph.setdefault("components_x", 4)
+    ph.setdefault("components_y", 3)
+    ph.setdefault("exclude", [])
+    ph.setdefault("sources", ["**"])
+    return ph
+
+
+def _matches_any(rel_path: str, patterns: list[str]) -> bool:
+    return any(fnmatch.fnmatch(rel_path, pat) for pat in patterns)
+
+
+def collect_sources(assets_dir: Path, cfg: dict) -> list[str]:
+    """Return asset-relative paths (forward slashes) that need placeholders."""
+    sources = []
+    for root, _, filenames in os.walk(assets_dir):
+        for fname in sorted(filenames):
+            if Path(fname).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            rel = (Path(root) / fname).relative_to(assets_dir).as_posix()
+            if _matches_any(rel, cfg["exclude"]):
+                continue
+            if _matches_any(rel, cfg["sources"]):
+                sources.append(rel)
+    return sorted(sources)
+
+
+def _base83(value: int, length: int) -> str:
+    """Encode `value` as `length` base83 digits, most significant first."""
+    return "".join(_BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _srgb_to_linear(v: np.ndarray) -> np.ndarray:
+    v = v / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(v: np.ndarray) -> np.ndarray:
+    v = np.clip(v, 0.0, 1.0)
+    out = np.where(v <= 0.0031308, v * 12.92, 1.055 * v ** (1 / 2.4) - 0.055)
+    return np.floor(out * 255 + 0.5).astype(int)
+
+
+def blurhash_encode(rgb: np.ndarray, components_x: int, components_y: int) -> str:
+    """Encode an (h, w, 3) uint8 array as a BlurHash string.
+
+    All components are computed in one einsum over the separable cosine
+    basis instead of a per-pixel loop; the string layout follows the
+    reference encoder so any BlurHash decoder can read it.
+    """
+    h, w, _ = rgb.shape
+    linear = _srgb_to_linear(rgb.astype(np.float64))
+    basis_x = np.cos(np.pi * np.arange(components_x)[:, None] * np.arange(w)[None, :] / w)
+    basis_y = np.cos(np.pi * np.arange(components_y)[:, None] * np.arange(h)[None, :] / h)
+    # factors[j, i, c] = sum over pixels of basis_y[j, y] * basis_x[i, x] * linear[y, x, c]
+    factors = np.einsum("jy,ix,yxc->jic", basis_y, basis_x, linear) / (w * h)
+    norm = np.full((components_y, components_x), 2.0)
+    norm[0, 0] = 1.0
+    factors *= norm[..., None]
+
+    dc = factors[0, 0]
+    ac = factors.reshape(-1, 3)[1:]
+
+    result = _base83((components_x - 1) + (components_y - 1) * 9, 1)
+    if len(ac):
+        actual_max = float(np.abs(ac).max())
+        quantised_max = int(max(0, min(82, np.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        max_value = 1.0
+        result += _base83(0, 1)
+
+    r, g, b = _linear_to_srgb(dc)
+    result += _base83((int(r) << 16) + (int(g) << 8) + int(b), 4)
+
+    scaled = ac / max_value
+    quant = np.clip(np.floor(np.sign(scaled) * np.abs(scaled) ** 0.5 * 9 + 9.5), 0, 18).astype(int)
+    for qr, qg, qb in quant:
+        result += _base83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
+
+
+def dominant_color(rgba: np.ndarray) -> str:
+    """Most common colour (12-bit bins, opaque pixels only) as #rrggbb."""
+    pixels = rgba.reshape(-1, 4)
+    opaque = pixels[pixels[:, 3] >= 128][:, :3]
+    if len(opaque) == 0:
+        return "#ffffff"  # Fully transparent: matches the white composite
+    bins = ((opaque[:, 0] >> 4).astype(np.int32) << 8) | ((opaque[:, 1] >> 4) << 4) | (opaque[:, 2] >> 4)
+    top = np.bincount(bins, minlength=4096).argmax()
+    r, g, b = opaque[bins == top].mean(axis=0).round().astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def compute_placeholder(path: Path, components_x: int, components_y: int) -> dict:
+    """Decode a small copy of `path` and return its manifest entry."""
+    with Image.open(path) as img:
+        width, height = img.size
+        if img.format == "JPEG":
+            img.draft("RGB", (SAMPLE_SIZE, SAMPLE_SIZE))
+            small = img.convert("RGBA")
+        else:
+            small = load_image(path, "RGBA")
+        small.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR, reducing_gap=2.0)
+    rgba = np.asarray(small)
+    alpha = rgba[..., 3:4].astype(np.float64) / 255.0
+    over_white = (rgba[..., :3] * alpha + 255 * (1 - alpha)).round().astype(np.uint8)
+    return {
+        "width": width,
+        "height": height,
+        "blurhash": blurhash_encode(over_white, components_x, components_y),
+        "color": dominant_color(rgba),
+    }
+
+
+def load_cache(cache_path: Path) -> dict:
+    """Load cached entries keyed by "<sha256>:<cx>x<cy>"; empty if missing or corrupt."""
+    if cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            pass
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Planet Wonders image placeholders")
+    parser.add_argument("--force", action="store_true",
+                        help="Recompute every placeholder, ignoring the cache")
+    parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
+                        help="Path to config YAML")
+    args = parser.parse_args()
+
+    cfg = load_placeholder_config(Path(args.config))
+    cx, cy = cfg["components_x"], cfg["components_y"]
+    sources = collect_sources(ASSETS_DIR, cfg)
+    cache = {} if args.force else load_cache(CACHE_PATH)
+    new_cache = {}
+    images = {}
+    computed = 0
+    errors = 0
+
+    for i, rel in enumerate(sources, 1):
+        path = ASSETS_DIR / rel
+        key = f"{content_hash(path)}:{cx}x{cy}"
+        entry = cache.get(key)
+        if entry is None:
+            try:
+                entry = compute_placeholder(path, cx, cy)
+            except Exception as e:
+                errors += 1
+                print(f"[{i}/{len(sources)}] ERROR: {rel} — {e}")
+                continue
+            computed += 1
+            print(f"[{i}/{len(sources)}] {rel} {entry['blurhash']} {entry['color']}")
+        new_cache[key] = entry
+        images[f"assets/{rel}"] = entry
+
+    manifest_path = ASSETS_DIR / cfg["manifest"]
+    manifest = {"components": [cx, cy], "images": images}
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_PATH.write_text(json.dumps(new_cache) + "\n", encoding="utf-8")
+
+    print(f"\nManifest written to: {manifest_path.relative_to(REPO_DIR)}")
+
+    print(f"\n{'='*60}")
+    print("PLACEHOLDER SUMMARY")
+    print(f"{'='*60}")
+    print(f"Images:           {len(images)}")
+    print(f"Computed:         {computed}")
+    print(f"From cache:       {len(images) - computed}")
+    print(f"Errors:           {errors}")
+    print(f"Manifest size:    {manifest_path.stat().st_size / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
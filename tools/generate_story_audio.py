@@ -5,6 +5,18 @@ Generate story narration audio via the ElevenLabs Text-to-Speech API.
 Reads story_audio_config.json (produced by story_text_export.py) and
 generates one MP3 per story page, saving them to assets/audio/stories/.
 
+Pages are generated concurrently over one pooled HTTP session:
+--concurrency caps the streams in flight, and a token bucket caps request
+starts at --rate per second (bursts of --burst). 429 and 5xx responses,
+dropped connections and timeouts are retried with exponential backoff,
+honouring Retry-After when the server sends it. Audio is streamed straight
+to a temp file next to the target and renamed into place, so an
+interrupted run never leaves a truncated MP3 behind (which the next run
+would skip as done).
+
+The API base URL can be pointed at a local stand-in server with --api-base
+or ELEVENLABS_API_BASE; it must accept POST <base>/<voice_id>.
+
 Usage:
     export ELEVENLABS_API_KEY=sk-...
     python tools/generate_story_audio.py
@@ -12,63 +24,212 @@ Usage:
     # Override voice per country:
     python tools/generate_story_audio.py --country ghana --voice-id abc123
 
+    # Gentler on a low-tier API plan:
+    python tools/generate_story_audio.py --concurrency 2 --rate 1
+
 Requirements:
     pip install requests
 """
 
+from __future__ import annotations
+
 import argparse
+import email.utils
 import json
+import os
+import random
 import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Iterator
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Error: 'requests' package required. Run: pip install requests", file=sys.stderr)
     sys.exit(1)
 
-import os
-
-API_BASE = "https://api.elevenlabs.io/v1/text-to-speech"
+API_BASE = os.environ.get("ELEVENLABS_API_BASE", "https://api.elevenlabs.io/v1/text-to-speech")
 CONFIG_PATH = Path(__file__).parent / "story_audio_config.json"
 ASSETS_DIR = Path(__file__).parent.parent / "assets/audio/stories"
 
+VOICE_SETTINGS = {
+    "stability": 0.6,
+    "similarity_boost": 0.75,
+    "style": 0.4,
+    "use_speaker_boost": True,
+}
 
-def generate_audio(
+# Statuses worth retrying: rate limited, or the server having a bad moment
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = (10, 60)  # connect, read (between chunks)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding up to `burst`.
+
+    acquire() takes one token, sleeping until it is due. Callers that find
+    the bucket empty reserve their token before sleeping, so concurrent
+    waiters are spaced 1/rate apart rather than waking together.
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """Session keeping up to `pool_size` connections alive for reuse across pages."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def tts_request(text: str, voice_id: str, model_id: str, output_format: str) -> tuple[str, dict, dict]:
+    """Voice path, JSON payload and query params for one page: all that decides the audio."""
+    payload = {
+        "text": text,
+        "model_id": model_id,
+        "voice_settings": VOICE_SETTINGS,
+    }
+    return voice_id, payload, {"output_format": output_format}
+
+
+def retry_delay(resp: requests.Response | None, attempt: int, backoff: float,
+                max_delay: float) -> float:
+    """Seconds to wait before retry `attempt` (0-based).
+
+    Uses the server's Retry-After (seconds or an HTTP date) when present,
+    otherwise exponential backoff with jitter so parallel workers spread out.
+    """
+    header = resp.headers.get("Retry-After") if resp is not None else None
+    if header:
+        try:
+            return min(max_delay, max(0.0, float(header)))
+        except ValueError:
+            try:
+                when = email.utils.parsedate_to_datetime(header)
+                return min(max_delay, max(0.0, (when - datetime.now(timezone.utc)).total_seconds()))
+            except (TypeError, ValueError):
+                pass
+    return min(max_delay, backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def stream_audio(
+    consume: Callable[[Iterator[bytes]], object],
     text: str,
     voice_id: str,
     model_id: str,
     output_format: str,
     api_key: str,
-) -> bytes:
-    """Call ElevenLabs TTS API and return MP3 bytes."""
-    url = f"{API_BASE}/{voice_id}"
+    *,
+    session: requests.Session | None = None,
+    limiter: TokenBucket | None = None,
+    retries: int = 5,
+    backoff: float = 1.0,
+    max_delay: float = 60.0,
+    api_base: str = API_BASE,
+):
+    """POST one page and hand the streamed body to `consume`, retrying transient failures.
+
+    A failure while `consume` reads the body (dropped connection, read
+    timeout) retries the whole request, so `consume` must be safe to call
+    again. Other 4xx responses raise requests.HTTPError straight away.
+    """
+    voice, payload, params = tts_request(text, voice_id, model_id, output_format)
     headers = {
         "xi-api-key": api_key,
         "Content-Type": "application/json",
         "Accept": "audio/mpeg",
     }
-    payload = {
-        "text": text,
-        "model_id": model_id,
-        "voice_settings": {
-            "stability": 0.6,
-            "similarity_boost": 0.75,
-            "style": 0.4,
-            "use_speaker_boost": True,
-        },
-    }
+    own_session = session is None
+    session = session or make_session(1)
+    try:
+        for attempt in range(retries + 1):
+            if limiter:
+                limiter.acquire()
+            try:
+                with session.post(f"{api_base}/{voice}", headers=headers, json=payload,
+                                  params=params, timeout=TIMEOUT, stream=True) as resp:
+                    if resp.status_code in RETRY_STATUSES and attempt < retries:
+                        delay = retry_delay(resp, attempt, backoff, max_delay)
+                    else:
+                        if resp.status_code >= 400:
+                            _ = resp.content  # keep the error body readable once the stream closes
+                        resp.raise_for_status()
+                        return consume(resp.iter_content(CHUNK_SIZE))
+            except (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                if attempt == retries:
+                    raise
+                delay = retry_delay(None, attempt, backoff, max_delay)
+            time.sleep(delay)
+    finally:
+        if own_session:
+            session.close()
+
 
-    resp = requests.post(
-        url,
-        headers=headers,
-        json=payload,
-        params={"output_format": output_format},
-        timeout=60,
-    )
-    resp.raise_for_status()
-    return resp.content
+def write_atomic(out_file: Path, chunks: Iterator[bytes]) -> int:
+    """Write chunks to a temp file beside `out_file`, then rename it into place."""
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_file.with_name(f".{out_file.name}.{uuid.uuid4().hex[:8]}.tmp")
+    size = 0
+    try:
+        with open(tmp, "xb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp, out_file)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return size
+
+
+def save_audio(out_file: Path, text: str, voice_id: str, model_id: str, output_format: str,
+               api_key: str, **kwargs) -> int:
+    """Generate one page straight to `out_file`; returns its size in bytes.
+
+    Keyword arguments (session, limiter, retries, ...) go to stream_audio.
+    """
+    return stream_audio(lambda chunks: write_atomic(Path(out_file), chunks),
+                        text, voice_id, model_id, output_format, api_key, **kwargs)
+
+
+def generate_audio(
+    text: str,
+    voice_id: str,
+    model_id: str,
+    output_format: str,
+    api_key: str,
+    **kwargs,
+) -> bytes:
+    """Call ElevenLabs TTS API and return MP3 bytes."""
+    return stream_audio(b"".join, text, voice_id, model_id, output_format, api_key, **kwargs)
 
 
 def main():
@@ -76,8 +237,22 @@ def main():
     parser.add_argument("--country", help="Generate only for this country ID")
     parser.add_argument("--voice-id", help="Override voice ID for the selected country")
     parser.add_argument("--dry-run", action="store_true", help="Print what would be generated")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Requests in flight at once (default: 4)")
+    parser.add_argument("--rate", type=float, default=2.0,
+                        help="Request starts per second, retries included; 0 = unlimited (default: 2)")
+    parser.add_argument("--burst", type=int,
+                        help="Requests allowed back to back before --rate applies (default: --concurrency)")
+    parser.add_argument("--retries", type=int, default=5,
+                        help="Retries per page on 429/5xx and network errors (default: 5)")
+    parser.add_argument("--api-base", default=API_BASE,
+                        help="TTS endpoint base URL, e.g. a local stand-in server")
     args = parser.parse_args()
 
+    if args.concurrency < 1 or args.retries < 0 or args.rate < 0:
+        print("Error: --concurrency must be >= 1, --retries and --rate >= 0", file=sys.stderr)
+        sys.exit(1)
+
     api_key = os.environ.get("ELEVENLABS_API_KEY")
     if not api_key and not args.dry_run:
         print("Error: Set ELEVENLABS_API_KEY environment variable", file=sys.stderr)
@@ -96,8 +271,8 @@ def main():
     countries = [args.country] if args.country else list(stories.keys())
 
     total = sum(len(stories.get(c, [])) for c in countries)
-    generated = 0
     skipped = 0
+    pending = []
 
     for country_id in countries:
         pages = stories.get(country_id, [])
@@ -105,15 +280,12 @@ def main():
             print(f"  Skipping {country_id}: no pages in config")
             continue
 
-        out_dir = ASSETS_DIR / country_id
-        out_dir.mkdir(parents=True, exist_ok=True)
-
         voice = args.voice_id if args.voice_id else default_voice_id
 
         for page in pages:
             page_num = page["page"]
             text = page["text"]
-            out_file = out_dir / f"page_{page_num}.mp3"
+            out_file = ASSETS_DIR / country_id / f"page_{page_num}.mp3"
 
             if out_file.exists():
                 print(f"  [{country_id}] page_{page_num}.mp3 already exists, skipping")
@@ -123,33 +295,43 @@ def main():
             if args.dry_run:
                 preview = text[:80].replace("\n", " ")
                 print(f"  [DRY RUN] {country_id}/page_{page_num}.mp3 — {preview}...")
-                generated += 1
-                continue
+            pending.append((f"{country_id}/page_{page_num}.mp3", out_file, text, voice))
 
-            print(f"  Generating {country_id}/page_{page_num}.mp3 ...", end=" ", flush=True)
-            try:
-                audio_bytes = generate_audio(
-                    text=text,
-                    voice_id=voice,
-                    model_id=model_id,
-                    output_format=output_format,
-                    api_key=api_key,
-                )
-                out_file.write_bytes(audio_bytes)
-                size_kb = len(audio_bytes) / 1024
-                print(f"OK ({size_kb:.0f} KB)")
-                generated += 1
-
-                # Rate limit: ~2 requests/sec to be safe
-                time.sleep(0.5)
-            except requests.HTTPError as e:
-                print(f"FAILED: {e}")
-                print(f"    Response: {e.response.text[:200] if e.response else 'N/A'}")
-            except Exception as e:
-                print(f"FAILED: {e}")
+    generated = 0
+    failed = 0
+    if pending and not args.dry_run:
+        print(f"\n  Generating {len(pending)} page(s), {args.concurrency} at a time ...")
+        limiter = TokenBucket(args.rate, args.burst or args.concurrency)
+        start = time.perf_counter()
+        with make_session(args.concurrency) as session, \
+                ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = {
+                pool.submit(save_audio, out_file, text, voice, model_id, output_format, api_key,
+                            session=session, limiter=limiter, retries=args.retries,
+                            api_base=args.api_base): name
+                for name, out_file, text, voice in pending
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    size = future.result()
+                    print(f"  [{i}/{len(pending)}] {name} OK ({size / 1024:.0f} KB)")
+                    generated += 1
+                except requests.HTTPError as e:
+                    print(f"  [{i}/{len(pending)}] {name} FAILED: {e}")
+                    print(f"    Response: {e.response.text[:200] if e.response is not None else 'N/A'}")
+                    failed += 1
+                except Exception as e:
+                    print(f"  [{i}/{len(pending)}] {name} FAILED: {e}")
+                    failed += 1
+        print(f"  Took {time.perf_counter() - start:.1f}s")
+    elif args.dry_run:
+        generated = len(pending)
 
     print()
-    print(f"Done: {generated} generated, {skipped} skipped, {total} total")
+    print(f"Done: {generated} generated, {skipped} skipped, {failed} failed, {total} total")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
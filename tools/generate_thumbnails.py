@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Thumbnail Generator
+
+Derives small WebP thumbnails for coloring pages, recipes, story pages and
+puzzles so grid screens don't decode full-size art for a tile. Sources, sizes
+and quality come from the `thumbnails:` section of asset_config.yaml.
+
+Thumbnails are written under assets/thumbnails/, mirroring the source path:
+
+    assets/coloring/ghana/food/ghana_food_01_jollof.png
+      -> assets/thumbnails/coloring/ghana/food/ghana_food_01_jollof_256.webp
+
+A lookup manifest (assets/thumbnails/manifest.json) maps every source asset
+to its thumbnails by size. With --rewrite-refs the `thumbnailAsset` /
+`thumbnail` keys in the configured data JSON files are pointed at the
+generated thumbnail of their sibling `imageAsset` / `image`, which also
+normalizes the puzzle packs' mixed `thumbs/` vs `thumb/` folders.
+
+Remember to add `assets/thumbnails/` (and its subfolders) to pubspec.yaml.
+
+Usage:
+    python3 tools/generate_thumbnails.py                  # Build missing/stale thumbnails
+    python3 tools/generate_thumbnails.py --force          # Rebuild everything
+    python3 tools/generate_thumbnails.py --dry-run        # Report only
+    python3 tools/generate_thumbnails.py --rewrite-refs   # Also update data JSON
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import yaml
+from PIL import Image
+
+from pixel_cache import load_image
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+
+# File extensions we derive thumbnails from
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# (thumbnail key, sibling full-size image key) pairs rewritten in data JSON
+THUMBNAIL_KEYS = [("thumbnailAsset", "imageAsset"), ("thumbnail", "image")]
+
+
+def load_thumbnail_config(config_path: Path) -> dict:
+    """Load the thumbnail section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    thumbs = cfg.get("thumbnails") or {}
+    if not thumbs.get("sources"):
+        raise ValueError(f"No thumbnails.sources configured in {config_path}")
+    thumbs.setdefault("output_dir", "thumbnails")
+    thumbs.setdefault("manifest", f"{thumbs['output_dir']}/manifest.json")
+    thumbs.setdefault("quality", 80)
+    thumbs.setdefault("sizes", [256])
+    thumbs.setdefault("default_size", thumbs["sizes"][0])
+    thumbs.setdefault("exclude", [])
+    thumbs.setdefault("rewrite_json", [])
+    return thumbs
+
+
+def _matches_any(rel_path: str, patterns: list[str]) -> bool:
+    return any(fnmatch.fnmatch(rel_path, pat) for pat in patterns)
+
+
+def collect_sources(assets_dir: Path, cfg: dict) -> list[str]:
+    """Return asset-relative paths (forward slashes) that need thumbnails."""
+    sources = []
+    for root, _, filenames in os.walk(assets_dir):
+        for fname in sorted(filenames):
+            if Path(fname).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            rel = (Path(root) / fname).relative_to(assets_dir).as_posix()
+            if _matches_any(rel, cfg["exclude"]):
+                continue
+            if _matches_any(rel, cfg["sources"]):
+                sources.append(rel)
+    return sorted(sources)
+
+
+def thumbnail_rel_path(rel_path: str, size: int, output_dir: str) -> str:
+    """Asset-relative path of the thumbnail for `rel_path` at `size`."""
+    src = Path(rel_path)
+    return (Path(output_dir) / src.parent / f"{src.stem}_{size}.webp").as_posix()
+
+
+def make_thumbnail(src_path: Path, out_path: Path, size: int, quality: int) -> int:
+    """Write a WebP thumbnail fitting in size x size. Returns bytes written."""
+    with Image.open(src_path) as img:
+        if img.format == "JPEG":
+            # draft() lets JPEG decode at a reduced scale.
+            img.draft("RGB", (size, size))
+            img.load()
+        else:
+            img = load_image(src_path)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        img.thumbnail((size, size), Image.LANCZOS, reducing_gap=3.0)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        img.save(out_path, "WEBP", quality=quality, method=6)
+    return out_path.stat().st_size
+
+
+def is_stale(src_path: Path, out_path: Path) -> bool:
+    return not out_path.exists() or out_path.stat().st_mtime < src_path.stat().st_mtime
+
+
+def build_thumbnails(
+    assets_dir: Path,
+    cfg: dict,
+    force: bool = False,
+    dry_run: bool = False,
+) -> tuple[dict[str, dict[str, str]], dict]:
+    """Generate thumbnails. Returns (manifest entries, stats)."""
+    sources = collect_sources(assets_dir, cfg)
+    entries: dict[str, dict[str, str]] = {}
+    stats = {"sources": len(sources), "written": 0, "up_to_date": 0,
+             "errors": 0, "source_bytes": 0, "thumb_bytes": 0}
+
+    for i, rel in enumerate(sources, 1):
+        src_path = assets_dir / rel
+        stats["source_bytes"] += src_path.stat().st_size
+        # Only sizes that exist (or would be written on a dry run) go in the
+        # manifest, so --rewrite-refs never points at a missing thumbnail.
+        entry = {}
+        for size in cfg["sizes"]:
+            thumb_rel = thumbnail_rel_path(rel, size, cfg["output_dir"])
+            out_path = assets_dir / thumb_rel
+
+            if not force and not is_stale(src_path, out_path):
+                stats["up_to_date"] += 1
+                stats["thumb_bytes"] += out_path.stat().st_size
+                entry[str(size)] = f"assets/{thumb_rel}"
+                continue
+            if dry_run:
+                print(f"[{i}/{len(sources)}] would_write: {thumb_rel}")
+                entry[str(size)] = f"assets/{thumb_rel}"
+                continue
+            try:
+                written = make_thumbnail(src_path, out_path, size, cfg["quality"])
+            except Exception as e:
+                stats["errors"] += 1
+                print(f"[{i}/{len(sources)}] ERROR: {rel} — {e}")
+                continue
+            stats["written"] += 1
+            stats["thumb_bytes"] += written
+            entry[str(size)] = f"assets/{thumb_rel}"
+            print(f"[{i}/{len(sources)}] {thumb_rel} ({written:,} bytes)")
+        if entry:
+            entries[f"assets/{rel}"] = entry
+
+    return entries, stats
+
+
+def write_manifest(assets_dir: Path, cfg: dict, entries: dict) -> Path:
+    manifest_path = assets_dir / cfg["manifest"]
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "sizes": cfg["sizes"],
+        "default_size": cfg["default_size"],
+        "thumbnails": entries,
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest_path
+
+
+def _thumbnail_targets(node, entries: dict, size_key: str, out: list) -> None:
+    """Collect the new value (or None) for every string thumbnail key, in file order."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            pair = next((p for p in THUMBNAIL_KEYS if p[0] == key), None)
+            if pair and isinstance(value, str):
+                image = node.get(pair[1])
+                out.append(entries.get(image, {}).get(size_key)
+                           if isinstance(image, str) else None)
+            else:
+                _thumbnail_targets(value, entries, size_key, out)
+    elif isinstance(node, list):
+        for value in node:
+            _thumbnail_targets(value, entries, size_key, out)
+
+
+_THUMB_VALUE_RE = re.compile(
+    r'("(?:%s)"\s*:\s*)"((?:[^"\\]|\\.)*)"' % "|".join(k for k, _ in THUMBNAIL_KEYS))
+
+
+def rewrite_json_text(text: str, entries: dict, size_key: str) -> tuple[str, int]:
+    """Point thumbnail keys at generated thumbnails, preserving file formatting."""
+    targets: list = []
+    _thumbnail_targets(json.loads(text), entries, size_key, targets)
+    matches = list(_THUMB_VALUE_RE.finditer(text))
+    if len(matches) != len(targets):
+        raise ValueError("thumbnail keys could not be matched in source text")
+
+    changed = 0
+    parts = []
+    last = 0
+    for match, target in zip(matches, targets):
+        if target is None or json.loads(f'"{match.group(2)}"') == target:
+            continue
+        parts.append(text[last:match.start()])
+        parts.append(f'{match.group(1)}"{target}"')
+        last = match.end()
+        changed += 1
+    parts.append(text[last:])
+    return "".join(parts), changed
+
+
+def rewrite_references(repo_dir: Path, cfg: dict, entries: dict, dry_run: bool = False) -> int:
+    """Update thumbnail references in the configured data JSON files."""
+    size_key = str(cfg["default_size"])
+    total = 0
+    for rel in cfg["rewrite_json"]:
+        path = repo_dir / rel
+        if not path.exists():
+            print(f"  Skipping {rel}: not found")
+            continue
+        try:
+            text, changed = rewrite_json_text(path.read_text(encoding="utf-8"),
+                                              entries, size_key)
+        except ValueError as e:
+            print(f"  ERROR: {rel} — {e}")
+            continue
+        total += changed
+        if changed and not dry_run:
+            path.write_text(text, encoding="utf-8")
+        print(f"  {rel}: {changed} reference(s) {'would change' if dry_run else 'updated'}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Planet Wonders thumbnails")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would change without writing files")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild thumbnails even if up to date")
+    parser.add_argument("--rewrite-refs", action="store_true",
+                        help="Point data JSON thumbnail keys at the generated thumbnails")
+    parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
+                        help="Path to config YAML")
+    args = parser.parse_args()
+
+    try:
+        cfg = load_thumbnail_config(Path(args.config))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    entries, stats = build_thumbnails(ASSETS_DIR, cfg, force=args.force,
+                                      dry_run=args.dry_run)
+    if not args.dry_run:
+        manifest_path = write_manifest(ASSETS_DIR, cfg, entries)
+        print(f"\nManifest written to: {manifest_path.relative_to(REPO_DIR)}")
+
+    if args.rewrite_refs:
+        print("\nRewriting thumbnail references:")
+        rewrite_references(REPO_DIR, cfg, entries, dry_run=args.dry_run)
+
+    print(f"\n{'='*60}")
+    print("THUMBNAIL SUMMARY")
+    print(f"{'='*60}")
+    print(f"Sources:          {stats['sources']}")
+    print(f"Written:          {stats['written']}")
+    print(f"Up to date:       {stats['up_to_date']}")
+    print(f"Errors:           {stats['errors']}")
+    print(f"Source total:     {stats['source_bytes'] / (1024*1024):.1f} MB")
+    print(f"Thumbnail total:  {stats['thumb_bytes'] / (1024*1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,13 @@ from __future__ import annotations
 import math
 from pathlib import Path
 
+import numpy as np
 from PIL import Image, ImageDraw
 
+from pixel_cache import load_pixels
+from scene_render import ScaledDraw, run_pack
+from scene_svg import RecordingDraw, write_svg
+
 W = 2048
 H = 2048
 BLACK = 0
@@ -236,28 +241,44 @@ SCENES = [
 
 
 def save_bw(img, path):
-    bw = img.point(lambda p: 0 if p < 180 else 255, mode='1').convert('L')
+    bw = img.point(lambda p: 0 if p < 180 else 255, mode='1')
     bw.save(path, format='PNG', optimize=True)
+    validate(path)
+    return bw
 
 
 def validate(path):
     img = Image.open(path)
     if img.size != (W, H):
         raise RuntimeError(f'bad size {path.name}: {img.size}')
-    vals = set(img.convert('L').getdata())
+    vals = set(np.unique(load_pixels(path, 'L')).tolist())
     if not vals.issubset({0, 255}):
         raise RuntimeError(f'bad grayscale values in {path.name}')
 
 
+def render_scene(name, svg_dir=None):
+    fn = dict(SCENES)[name]
+    img, draw = canvas()
+    draw = RecordingDraw(draw)
+    fn(draw)
+    border(draw)
+    bw = save_bw(img, OUT_DIR / name)
+    if svg_dir is not None:
+        return write_svg(draw, bw, svg_dir / Path(name).with_suffix('.svg'))
+    return None
+
+
+def preview_scene(name, scale):
+    img = Image.new('L', (round(W * scale), round(H * scale)), WHITE)
+    draw = ScaledDraw(ImageDraw.Draw(img), scale)
+    dict(SCENES)[name](draw)
+    border(draw)
+    return img
+
+
 def main():
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    for name, fn in SCENES:
-        img, draw = canvas()
-        fn(draw)
-        border(draw)
-        save_bw(img, OUT_DIR / name)
-    for name, _ in SCENES:
-        validate(OUT_DIR / name)
+    run_pack('USA food pack', SCENES, render_scene, preview_scene)
 
 
 if __name__ == '__main__':
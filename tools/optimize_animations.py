@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Animation Optimizer
+
+Re-encodes the WebP animations under assets/animations/ per the rules in the
+`animations:` section of asset_config.yaml:
+
+  * duplicate / near-duplicate consecutive frames are dropped and their
+    durations merged into the frame they repeat
+  * frames shorter than the rule's max_fps allows are merged the same way
+  * every frame is cropped to the union bounding box of non-transparent pixels
+  * frames are downscaled to max_width x max_height
+  * the result is re-encoded lossy (quality / alpha_quality per rule); for
+    multi-frame files libwebp may keep individual frames lossless when that
+    is smaller (allow_mixed)
+
+Single-frame files go through the same crop/resize/re-encode path. Files are
+rewritten in place, and only when the result is smaller or the decoded
+dimensions shrank. optimize_assets.py leaves animations/** to this tool.
+
+Cropping and downscaling change what the file covers, so every rewritten
+animation gets an entry in the manifest (`animations.manifest`, default
+assets/animation_manifest.json) saying where it sits on its original canvas:
+
+    canvas   [width, height] of the original animation
+    offset   [x, y] of the animation's top-left corner on that canvas
+    size     [width, height] it covers on that canvas
+    image    [width, height] of the encoded frames (smaller if downscaled)
+
+As with trim_layers.py, re-runs map through an existing entry, so offsets
+always refer to the original canvas.
+
+Usage:
+    python3 tools/optimize_animations.py              # Optimize all animations
+    python3 tools/optimize_animations.py --dry-run    # Report only
+    python3 tools/optimize_animations.py --single assets/animations/airplane.webp
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from optimize_assets import resize_image
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+
+# Frames whose mean absolute RGBA difference from the previous kept frame is
+# at most this (0-255 scale) count as duplicates unless a rule overrides it.
+DEFAULT_DEDUPE_THRESHOLD = 0.5
+
+# Bytes per decoded pixel (RGBA8888, as Flutter's codec decodes WebP frames)
+BYTES_PER_PIXEL = 4
+
+
+def load_animation_config(config_path: Path) -> dict:
+    """Load the animations section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    animations = cfg.get("animations") or {}
+    animations.setdefault("rules", [])
+    animations.setdefault("manifest", "animation_manifest.json")
+    return animations
+
+
+def load_manifest(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8")).get("animations", {})
+    return {}
+
+
+def write_manifest(path: Path, entries: dict) -> None:
+    manifest = {"animations": dict(sorted(entries.items()))}
+    path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+
+def placement(
+    bbox: tuple[int, int, int, int], width: int, height: int,
+    image_size: tuple[int, int], previous: dict | None,
+) -> dict:
+    """Manifest entry for `bbox` of a width x height file, on its original canvas."""
+    if previous and previous["image"] == [width, height]:
+        canvas, base = previous["canvas"], previous["offset"]
+        sx, sy = previous["size"][0] / width, previous["size"][1] / height
+    else:
+        canvas, base, sx, sy = [width, height], [0, 0], 1.0, 1.0
+    left, top, right, bottom = bbox
+    return {"canvas": canvas,
+            "offset": [round(base[0] + left * sx), round(base[1] + top * sy)],
+            "size": [round((right - left) * sx), round((bottom - top) * sy)],
+            "image": list(image_size)}
+
+
+def match_rule(rel_path: str, rules: list[dict]) -> dict | None:
+    """Find the first matching rule for a file path."""
+    for rule in rules:
+        if fnmatch.fnmatch(rel_path, rule["pattern"]):
+            return rule
+    return None
+
+
+def read_frames(path: Path) -> tuple[np.ndarray, list[int], dict]:
+    """Decode every frame as RGBA. Returns (frames[n, h, w, 4], durations ms, info)."""
+    frames = []
+    durations = []
+    with Image.open(path) as img:
+        info = {"loop": img.info.get("loop", 0),
+                "background": img.info.get("background")}
+        for index in range(getattr(img, "n_frames", 1)):
+            img.seek(index)
+            img.load()  # WebP only fills in per-frame duration on load
+            frames.append(np.asarray(img.convert("RGBA")))
+            durations.append(int(img.info.get("duration") or 0))
+    return np.stack(frames), durations, info
+
+
+def merge_duplicate_frames(
+    frames: np.ndarray, durations: list[int], threshold: float,
+) -> tuple[np.ndarray, list[int]]:
+    """Drop frames that repeat the previous kept frame, merging their durations."""
+    keep = [0]
+    merged = [durations[0]]
+    for index in range(1, len(frames)):
+        diff = np.abs(frames[index].astype(np.int16) - frames[keep[-1]]).mean()
+        if diff <= threshold:
+            merged[-1] += durations[index]
+        else:
+            keep.append(index)
+            merged.append(durations[index])
+    return frames[keep], merged
+
+
+def cap_frame_rate(
+    frames: np.ndarray, durations: list[int], max_fps: float,
+) -> tuple[np.ndarray, list[int]]:
+    """Fold frames into their predecessor until each lasts at least 1/max_fps."""
+    min_duration = 1000.0 / max_fps
+    keep = [0]
+    merged = [durations[0]]
+    for index in range(1, len(frames)):
+        if merged[-1] < min_duration:
+            merged[-1] += durations[index]
+        else:
+            keep.append(index)
+            merged.append(durations[index])
+    return frames[keep], merged
+
+
+def union_bbox(frames: np.ndarray) -> tuple[int, int, int, int] | None:
+    """(left, top, right, bottom) of pixels visible in any frame, or None if all clear."""
+    visible = (frames[..., 3] > 0).any(axis=0)
+    rows = np.flatnonzero(visible.any(axis=1))
+    cols = np.flatnonzero(visible.any(axis=0))
+    if not len(rows):
+        return None
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def encode_animation(
+    images: list[Image.Image], durations: list[int], info: dict,
+    out_path: Path, rule: dict,
+) -> None:
+    params = {
+        "quality": rule.get("quality", 85),
+        "alpha_quality": rule.get("alpha_quality", 100),
+        "method": 6,
+    }
+    if len(images) == 1:
+        images[0].save(out_path, "WEBP", **params)
+        return
+    images[0].save(
+        out_path, "WEBP", save_all=True, append_images=images[1:],
+        duration=durations, loop=info["loop"], allow_mixed=True,
+        minimize_size=True, **params,
+    )
+
+
+def optimize_animation(
+    file_path: Path, assets_dir: Path, rules: list[dict], dry_run: bool = False,
+    previous: dict | None = None,
+) -> dict:
+    """Optimize one animation. Returns stats dict, with the new manifest entry
+    under "entry" when the file is (or would be) rewritten."""
+    rel_path = file_path.relative_to(assets_dir).as_posix()
+    original_size = file_path.stat().st_size
+    stats = {"path": rel_path, "action": "skip", "original": original_size,
+             "new": original_size, "saved": 0}
+
+    rule = match_rule(rel_path, rules)
+    if rule is None:
+        stats["action"] = "no_rule"
+        return stats
+
+    try:
+        frames, durations, info = read_frames(file_path)
+        n, height, width, _ = frames.shape
+        stats["frames_before"] = n
+        stats["size_before"] = (width, height)
+
+        frames, durations = merge_duplicate_frames(
+            frames, durations, rule.get("dedupe_threshold", DEFAULT_DEDUPE_THRESHOLD))
+        if rule.get("max_fps") and len(frames) > 1:
+            frames, durations = cap_frame_rate(frames, durations, rule["max_fps"])
+
+        bbox = (0, 0, width, height)
+        if rule.get("crop", True):
+            visible = union_bbox(frames)
+            if visible is not None:
+                bbox = visible
+                left, top, right, bottom = bbox
+                frames = frames[:, top:bottom, left:right]
+                stats["crop"] = list(bbox)
+
+        max_w = rule.get("max_width", width)
+        max_h = rule.get("max_height", height)
+        images = [resize_image(Image.fromarray(frame, "RGBA"), max_w, max_h)
+                  for frame in frames]
+        stats["frames_after"] = len(images)
+        stats["size_after"] = images[0].size
+        entry = placement(bbox, width, height, stats["size_after"], previous)
+
+        shrank = (stats["size_after"][0] * stats["size_after"][1]
+                  < width * height or len(images) < n)
+        if dry_run:
+            stats["action"] = "would_optimize" if shrank else "would_reencode"
+            stats["entry"] = entry
+            return stats
+
+        with tempfile.NamedTemporaryFile(suffix=".webp", dir=file_path.parent,
+                                         delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+        try:
+            encode_animation(images, durations, info, tmp_path, rule)
+            new_size = tmp_path.stat().st_size
+            if new_size < original_size or shrank:
+                os.replace(tmp_path, file_path)
+                stats["action"] = "optimized"
+                stats["new"] = new_size
+                stats["saved"] = original_size - new_size
+                stats["entry"] = entry
+            else:
+                stats["action"] = "kept_original_smaller"
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    except Exception as e:
+        stats["action"] = "error"
+        stats["error"] = str(e)
+
+    return stats
+
+
+def get_animation_files(assets_dir: Path, rules: list[dict]) -> list[Path]:
+    """All .webp files under assets/ matched by an animation rule."""
+    files = []
+    for path in sorted(assets_dir.rglob("*.webp")):
+        if match_rule(path.relative_to(assets_dir).as_posix(), rules):
+            files.append(path)
+    return files
+
+
+def _frame_kb(size: tuple[int, int]) -> float:
+    return size[0] * size[1] * BYTES_PER_PIXEL / 1024
+
+
+def print_result(result: dict, prefix: str = "") -> None:
+    print(f"{prefix}{result['action']}: {result['path']}")
+    if result["action"] == "error":
+        print(f"  {result.get('error', 'unknown')}")
+        return
+    if "frames_after" not in result:
+        return
+    (w0, h0), (w1, h1) = result["size_before"], result["size_after"]
+    print(f"  frames:        {result['frames_before']} -> {result['frames_after']}")
+    print(f"  dimensions:    {w0}x{h0} -> {w1}x{h1}"
+          + (f" (cropped to {result['crop']})" if "crop" in result else ""))
+    print(f"  decoded/frame: {_frame_kb(result['size_before']):,.0f} KB -> "
+          f"{_frame_kb(result['size_after']):,.0f} KB")
+    print(f"  file size:     {result['original']:,} -> {result['new']:,} bytes "
+          f"(saved {result['saved']:,})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize Planet Wonders animations")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would change without modifying files")
+    parser.add_argument("--single", type=str,
+                        help="Optimize a single file")
+    parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
+                        help="Path to config YAML")
+    args = parser.parse_args()
+
+    cfg = load_animation_config(Path(args.config))
+    rules = cfg["rules"]
+    if not rules:
+        print(f"No animations.rules configured in {args.config}")
+        sys.exit(1)
+    manifest_path = ASSETS_DIR / cfg["manifest"]
+    entries = load_manifest(manifest_path)
+
+    if args.single:
+        file_path = Path(args.single).resolve()
+        if not file_path.exists():
+            print(f"File not found: {file_path}")
+            sys.exit(1)
+        key = f"assets/{file_path.relative_to(ASSETS_DIR).as_posix()}"
+        result = optimize_animation(file_path, ASSETS_DIR, rules, dry_run=args.dry_run,
+                                    previous=entries.get(key))
+        print_result(result)
+        if not args.dry_run and "entry" in result:
+            entries[key] = result["entry"]
+            write_manifest(manifest_path, entries)
+        return
+
+    files = get_animation_files(ASSETS_DIR, rules)
+    print(f"Found {len(files)} animation files to process")
+    if args.dry_run:
+        print("DRY RUN — no files will be modified\n")
+
+    results = []
+    for i, file_path in enumerate(files, 1):
+        key = f"assets/{file_path.relative_to(ASSETS_DIR).as_posix()}"
+        result = optimize_animation(file_path, ASSETS_DIR, rules, dry_run=args.dry_run,
+                                    previous=entries.get(key))
+        results.append(result)
+        print_result(result, prefix=f"[{i}/{len(files)}] ")
+        if not args.dry_run and "entry" in result:
+            entries[key] = result["entry"]
+
+    if not args.dry_run:
+        write_manifest(manifest_path, entries)
+        print(f"\nManifest written to: {manifest_path.relative_to(ASSETS_DIR.parent)}")
+
+    done = [r for r in results if "frames_after" in r]
+    total_original = sum(r["original"] for r in results)
+    total_new = sum(r["new"] for r in results)
+    print(f"\n{'='*60}")
+    print("ANIMATION SUMMARY")
+    print(f"{'='*60}")
+    print(f"Files processed:  {len(files)}")
+    print(f"Optimized:        {sum(r['action'] == 'optimized' for r in results)}")
+    print(f"Errors:           {sum(r['action'] == 'error' for r in results)}")
+    print(f"Frames:           {sum(r['frames_before'] for r in done)} -> "
+          f"{sum(r['frames_after'] for r in done)}")
+    print(f"Original total:   {total_original / 1024:.1f} KB")
+    print(f"New total:        {total_new / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,24 @@ Planet Wonders — Asset Optimization Script
 
 Resizes and converts all image assets according to asset_config.yaml rules.
 Converts PNG/JPG to WebP (lossy with alpha) or compresses PNG with pngquant.
+Existing WebP files are re-encoded only when they exceed their rule's size,
+are lossless, or get meaningfully smaller (see WEBP_MIN_SAVINGS).
+Pure black-and-white images under a `bilevel: true` rule are written losslessly
+as 1-bit PNG instead, with the scanline filter and zlib strategy picked per file.
+Rules with `format: auto` classify each image (bilevel / flat / continuous tone)
+and pick lossless WebP, palette PNG or lossy WebP accordingly; the decisions
+are recorded in .asset_cache/encoder_decisions.json.
 
 Usage:
     python3 tools/optimize_assets.py                  # Full optimization
     python3 tools/optimize_assets.py --dry-run        # Report only, no changes
     python3 tools/optimize_assets.py --single FILE    # Optimize one file
+    python3 tools/optimize_assets.py --watch          # Re-optimize files as they change
+    python3 tools/optimize_assets.py --shard 2/4 --report shard2.json
+    python3 tools/optimize_assets.py --merge-reports shard*.json
 
 Requirements:
-    pip install Pillow pyyaml
+    pip install Pillow pyyaml numpy
     brew install webp pngquant
 """
 
@@ -19,22 +29,65 @@ from __future__ import annotations
 
 import argparse
 import fnmatch
+import json
 import os
 import shutil
+import struct
 import subprocess
 import sys
 import tempfile
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import yaml
 from PIL import Image
 
+from pixel_cache import load_image, natural_mode
+from sharding import merge_reports, select_shard, write_report
+
 ASSETS_DIR = Path(__file__).parent.parent / "assets"
 CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
 
 # File extensions we process
-IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# Shrink-on-load stops this many times above the target size before the final
+# LANCZOS pass. 3.0 stays above 50 dB PSNR against a full-resolution LANCZOS
+# resize on our largest assets; 2.0 dips below 40 dB at 256 px targets
+# (see tools/benchmark_resize.py).
+RESIZE_REDUCING_GAP = 3.0
+
+# A lossy WebP that already fits its rule is only replaced if re-encoding
+# shrinks it by at least this fraction (avoids generational loss for nothing).
+# Rules can override it with `min_savings`.
+WEBP_MIN_SAVINGS = 0.10
+
+# Content classification for `format: auto` rules. Statistics come from a
+# strided sample at most this many pixels on its long side (no resampling,
+# so no new colours are introduced).
+CLASSIFY_SAMPLE = 512
+
+# "flat" art: its FLAT_MAX_COLORS most common colours cover at least
+# FLAT_MIN_COVERAGE of the sampled pixels, so a palette PNG is near-lossless.
+FLAT_MAX_COLORS = 256
+FLAT_MIN_COVERAGE = 0.995
+
+# Encoder picked for each content class under `format: auto`
+AUTO_ROUTES = {
+    "bilevel": {"format": "webp", "lossless": True},
+    "flat": {"format": "png", "compression": "pngquant"},
+    "continuous": {"format": "webp", "lossless": False},
+}
+
+# Per-file encoder decisions made for `format: auto` rules
+DECISIONS_PATH = Path(__file__).parent.parent / ".asset_cache" / "encoder_decisions.json"
+
+# Tool name stamped into --report files
+REPORT_TOOL = "optimize_assets"
 
 # Skip these files/patterns
 SKIP_PATTERNS = {".DS_Store", ".gitkeep", "*.json", "*.md", "*.mp3",
@@ -79,7 +132,15 @@ def get_image_files(assets_dir: Path) -> list[Path]:
 
 
 def resize_image(img: Image.Image, max_w: int, max_h: int) -> Image.Image:
-    """Resize image to fit within max dimensions, preserving aspect ratio."""
+    """Resize image to fit within max dimensions, preserving aspect ratio.
+
+    Shrinks on load where possible: JPEGs are decoded at a reduced DCT scale
+    via draft(), and other formats are box-reduced by an integer factor
+    (reducing_gap) before the final LANCZOS pass. Both stop at
+    RESIZE_REDUCING_GAP x the target size, so the LANCZOS pass still does
+    the last step. Call before the image is loaded; draft() changes
+    img.size in place.
+    """
     w, h = img.size
     if w <= max_w and h <= max_h:
         return img
@@ -87,7 +148,38 @@ def resize_image(img: Image.Image, max_w: int, max_h: int) -> Image.Image:
     ratio = min(max_w / w, max_h / h)
     new_w = int(w * ratio)
     new_h = int(h * ratio)
-    return img.resize((new_w, new_h), Image.LANCZOS)
+    # Pillow silently falls back to NEAREST for palette and 1-bit images.
+    if img.mode == "P":
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+    elif img.mode == "1":
+        img = img.convert("L")
+    if img.format == "JPEG":
+        img.draft(img.mode, (int(new_w * RESIZE_REDUCING_GAP),
+                             int(new_h * RESIZE_REDUCING_GAP)))
+    return img.resize((new_w, new_h), Image.LANCZOS,
+                      reducing_gap=RESIZE_REDUCING_GAP)
+
+
+def run_cwebp(png_path: Path, output_path: Path, quality: int,
+              lossless: bool = False) -> bool:
+    """Encode a PNG with cwebp (lossy with alpha, or lossless)."""
+    if lossless:
+        settings = ["-lossless", "-z", "9"]  # max lossless effort
+    else:
+        settings = ["-q", str(quality), "-alpha_filter", "best",
+                    "-m", "6"]  # max compression effort
+    cmd = [
+        "cwebp",
+        *settings,
+        "-quiet",
+        str(png_path),
+        "-o", str(output_path),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"  ERROR: cwebp failed for {png_path}: {result.stderr}")
+        return False
+    return True
 
 
 def convert_to_webp(input_path: Path, output_path: Path, quality: int) -> bool:
@@ -107,24 +199,58 @@ def convert_to_webp(input_path: Path, output_path: Path, quality: int) -> bool:
         # Save resized as PNG for cwebp
         img.save(tmp_path, "PNG")
         img.close()
+        return run_cwebp(tmp_path, output_path, quality)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
 
-        # Run cwebp
-        cmd = [
-            "cwebp",
-            "-q", str(quality),
-            "-alpha_filter", "best",
-            "-m", "6",  # max compression effort
-            "-quiet",
-            str(tmp_path),
-            "-o", str(output_path),
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"  ERROR: cwebp failed for {input_path}: {result.stderr}")
-            return False
+def encode_image(
+    resized: Image.Image,
+    output_path: Path,
+    target_format: str,
+    quality: int,
+    compression: str | None = None,
+    lossless: bool = False,
+) -> bool:
+    """Encode an already-resized image as optimize_file does.
+
+    WebP goes through cwebp, PNG through pngquant when `compression` asks
+    for it, and is otherwise written as-is.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+        tmp_png = Path(tmp.name)
+    try:
+        resized.save(tmp_png, "PNG")
+        if target_format == "webp":
+            return run_cwebp(tmp_png, output_path, quality, lossless=lossless)
+        if compression == "pngquant":
+            return compress_png(tmp_png, output_path)
+        # Plain PNG, just save the resized version
+        shutil.copy2(tmp_png, output_path)
         return True
     finally:
-        tmp_path.unlink(missing_ok=True)
+        tmp_png.unlink(missing_ok=True)
+
+
+def webp_encoding(path: Path) -> str:
+    """Classify a .webp file as "lossy", "lossless" or "not_webp".
+
+    Reads the RIFF chunk headers only, seeking past chunk payloads. Files
+    that merely carry a .webp name (e.g. a renamed PNG) are "not_webp".
+    """
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WEBP":
+            return "not_webp"
+        while len(chunk := f.read(8)) == 8:
+            tag = chunk[:4]
+            size = struct.unpack("<I", chunk[4:])[0]
+            if tag == b"VP8L":
+                return "lossless"
+            if tag == b"VP8 ":
+                return "lossy"
+            f.seek(size + (size & 1), os.SEEK_CUR)
+    return "lossy"
 
 
 def compress_png(input_path: Path, output_path: Path) -> bool:
@@ -144,6 +270,146 @@ def compress_png(input_path: Path, output_path: Path) -> bool:
     return True
 
 
+# PNG scanline filters tried for 1-bit output (None, Sub, Up, Average, Paeth)
+PNG_FILTERS = (0, 1, 2, 3, 4)
+
+# zlib strategies tried for 1-bit output
+ZLIB_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)
+
+
+def bilevel_pixels(img: Image.Image) -> np.ndarray | None:
+    """Return a boolean (True = white) array if the image is pure black/white.
+
+    Images with any transparency, colour or grey values return None.
+    """
+    if img.mode == "1":
+        return np.asarray(img, dtype=bool)
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        alpha = np.asarray(img.convert("RGBA").getchannel("A"))
+        if not (alpha == 255).all():
+            return None
+    if img.mode == "L":
+        gray = np.asarray(img)
+    else:
+        rgb = np.asarray(img.convert("RGB"))
+        gray = rgb[..., 0]
+        if not ((gray == rgb[..., 1]).all() and (gray == rgb[..., 2]).all()):
+            return None
+    if not ((gray == 0) | (gray == 255)).all():
+        return None
+    return gray == 255
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return (struct.pack(">I", len(data)) + tag + data
+            + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def _filter_scanlines(rows: np.ndarray, filter_type: int) -> bytes:
+    """Apply one PNG filter to every packed scanline (1 byte per filter unit)."""
+    x = rows.astype(np.int16)
+    left = np.zeros_like(x)
+    left[:, 1:] = x[:, :-1]
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    if filter_type == 0:
+        out = x
+    elif filter_type == 1:
+        out = x - left
+    elif filter_type == 2:
+        out = x - up
+    elif filter_type == 3:
+        out = x - (left + up) // 2
+    else:
+        up_left = np.zeros_like(x)
+        up_left[1:, 1:] = x[:-1, :-1]
+        p = left + up - up_left
+        pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+        pred = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+        out = x - pred
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = filter_type
+    filtered[:, 1:] = (out & 0xFF).astype(np.uint8)
+    return filtered.tobytes()
+
+
+def encode_bilevel_png(white: np.ndarray) -> tuple[bytes, dict]:
+    """Encode a boolean image as 1-bit grayscale PNG, smallest of all
+    filter/strategy combinations. Returns (png bytes, chosen settings)."""
+    h, w = white.shape
+    rows = np.packbits(white, axis=1)
+    best: tuple[bytes, dict] | None = None
+    for filter_type in PNG_FILTERS:
+        raw = _filter_scanlines(rows, filter_type)
+        for strategy in ZLIB_STRATEGIES:
+            comp = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+            idat = comp.compress(raw) + comp.flush()
+            if best is None or len(idat) < len(best[0]):
+                best = (idat, {"filter": filter_type, "strategy": strategy})
+    idat, settings = best
+    ihdr = struct.pack(">IIBBBBB", w, h, 1, 0, 0, 0, 0)
+    png = (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", ihdr)
+           + _png_chunk(b"IDAT", idat) + _png_chunk(b"IEND", b""))
+    return png, settings
+
+
+def verify_bilevel_png(path: Path, expected: np.ndarray) -> bool:
+    """Check a written PNG decodes to exactly the expected black/white pixels."""
+    with Image.open(path) as img:
+        decoded = bilevel_pixels(img)
+    return decoded is not None and np.array_equal(decoded, expected)
+
+
+def classify_image(img: Image.Image) -> dict:
+    """Classify image content as "bilevel", "flat" or "continuous".
+
+    bilevel:    opaque, every pixel pure black or pure white (line art)
+    flat:       the FLAT_MAX_COLORS most common RGBA values cover at least
+                FLAT_MIN_COVERAGE of pixels (flat illustration, icons)
+    continuous: everything else (painted / photographic)
+
+    Fully transparent pixels count as one colour whatever their RGB.
+    """
+    rgba = np.asarray(img.convert("RGBA"))
+    step = max(1, -(-max(rgba.shape[:2]) // CLASSIFY_SAMPLE))
+    sample = rgba[::step, ::step].reshape(-1, 4)
+    packed = ((sample[:, 0].astype(np.uint32) << 24) | (sample[:, 1].astype(np.uint32) << 16)
+              | (sample[:, 2].astype(np.uint32) << 8) | sample[:, 3])
+    packed[sample[:, 3] == 0] = 0
+    _, counts = np.unique(packed, return_counts=True)
+    top = np.sort(counts)[::-1][:FLAT_MAX_COLORS]
+    coverage = float(top.sum() / len(packed))
+
+    rgb = sample[:, :3]
+    opaque = bool((sample[:, 3] == 255).all())
+    grey = (rgb[:, 0] == rgb[:, 1]) & (rgb[:, 1] == rgb[:, 2])
+    if opaque and grey.all() and ((rgb[:, 0] == 0) | (rgb[:, 0] == 255)).all():
+        content = "bilevel"
+    elif coverage >= FLAT_MIN_COVERAGE:
+        content = "flat"
+    else:
+        content = "continuous"
+    return {"class": content, "colors": int(len(counts)),
+            "top_coverage": round(coverage, 4)}
+
+
+def record_decisions(results: list[dict], path: Path = DECISIONS_PATH) -> None:
+    """Merge the `format: auto` decisions in `results` into the decisions file."""
+    decided = [r for r in results if "decision" in r]
+    if not decided:
+        return
+    decisions = {}
+    if path.exists():
+        try:
+            decisions = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            pass
+    for result in decided:
+        decisions[result.get("new_path", result["path"]).replace("\\", "/")] = result["decision"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(decisions, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
 def optimize_file(
     file_path: Path,
     assets_dir: Path,
@@ -183,8 +449,52 @@ def optimize_file(
         return {"path": rel_path, "action": "error", "error": str(e),
                 "original": original_size, "new": original_size, "saved": 0}
 
+    # Existing WebP sources: animations are left alone, and a lossy file that
+    # already fits its rule must earn its re-encode (see WEBP_MIN_SAVINGS).
+    source_encoding = None
+    if file_path.suffix.lower() == ".webp":
+        if getattr(img, "n_frames", 1) > 1:
+            img.close()
+            return {"path": rel_path, "action": "skip_animated",
+                    "original": original_size, "new": original_size, "saved": 0}
+        source_encoding = webp_encoding(file_path)
+
+    # Decode through the shared pixel cache unless that would lose
+    # something: JPEGs shrink on load via draft(), and palette / LA sources
+    # would be widened.
+    if img.format != "JPEG" and natural_mode(img) == img.mode:
+        cached = load_image(file_path)
+        cached.info = dict(img.info)
+        img.close()
+        img = cached
+
+    source_size = img.size
     resized = resize_image(img, max_w, max_h)
-    resized_changed = resized.size != img.size
+    resized_changed = resized.size != source_size
+
+    # Pure B/W outlines: lossless 1-bit PNG instead of pngquant / WebP.
+    # Resampling introduces grey edges, so only untouched-size images qualify.
+    bilevel = None
+    if rule.get("bilevel") and not resized_changed:
+        bilevel = bilevel_pixels(img)
+    if bilevel is not None:
+        img.close()
+        return optimize_bilevel(file_path, assets_dir, bilevel, original_size,
+                                dry_run=dry_run)
+
+    # format: auto -- pick the encoder from the image content.
+    compression = rule.get("compression")
+    lossless = False
+    decision = {}
+    if target_format == "auto":
+        content = classify_image(img)
+        route = AUTO_ROUTES[content["class"]]
+        target_format = route["format"]
+        compression = route.get("compression")
+        lossless = route.get("lossless", False)
+        encoder = ("png_palette" if target_format == "png"
+                   else "webp_lossless" if lossless else "webp_lossy")
+        decision = {"decision": {**content, "encoder": encoder}}
 
     if target_format == "webp":
         new_ext = ".webp"
@@ -198,7 +508,12 @@ def optimize_file(
 
     if dry_run:
         # Estimate savings
-        if target_format == "webp":
+        if source_encoding == "lossy" and new_ext == ".webp":
+            # Already lossy WebP: roughly scales with pixel count
+            w, h = source_size
+            rw, rh = resized.size
+            estimated = int(original_size * (rw * rh) / (w * h))
+        elif target_format == "webp" and not lossless:
             # Rough estimate: WebP is ~10-15% of PNG size after resize
             w, h = resized.size
             pixels = w * h
@@ -206,44 +521,60 @@ def optimize_file(
             if img.mode == "RGBA":
                 estimated = int(estimated * 1.3)
         else:
-            estimated = int(original_size * 0.7)  # pngquant ~30% savings
-
+            # pngquant / lossless WebP: ~30% savings
+            estimated = int(original_size * 0.7)
+
+        if source_encoding == "lossy" and new_ext == ".webp" and not resized_changed:
+            # Re-encode to a scratch file so dry-run applies the same
+            # min_savings test as a real run.
+            with tempfile.NamedTemporaryFile(suffix=new_ext, delete=False) as tmp:
+                tmp_output = Path(tmp.name)
+            try:
+                if encode_image(resized, tmp_output, target_format, quality,
+                                compression, lossless=lossless):
+                    estimated = tmp_output.stat().st_size
+            finally:
+                tmp_output.unlink(missing_ok=True)
+            min_savings = rule.get("min_savings", WEBP_MIN_SAVINGS)
+            if estimated > original_size * (1 - min_savings):
+                img.close()
+                return {"path": rel_path, "action": "kept_within_budget",
+                        "original": original_size, "new": original_size, "saved": 0}
         img.close()
         return {"path": rel_path, "action": f"would_convert_to_{target_format}",
                 "original": original_size, "new": estimated,
                 "saved": original_size - estimated,
-                "resize": f"{img.size} -> {resized.size}" if resized_changed else "no"}
+                "resize": f"{source_size} -> {resized.size}" if resized_changed else "no",
+                **decision}
 
     # Actually convert
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-        tmp_resized = Path(tmp.name)
-
     with tempfile.NamedTemporaryFile(suffix=new_ext, delete=False) as tmp:
         tmp_output = Path(tmp.name)
 
     try:
-        # Save resized image as temp PNG
-        resized.save(tmp_resized, "PNG")
+        success = encode_image(resized, tmp_output, target_format, quality,
+                               compression, lossless=lossless)
         resized.close()
         img.close()
 
-        if target_format == "webp":
-            success = convert_to_webp(tmp_resized, tmp_output, quality)
-        elif rule.get("compression") == "pngquant":
-            success = compress_png(tmp_resized, tmp_output)
-        else:
-            # Plain PNG, just save the resized version
-            shutil.copy2(tmp_resized, tmp_output)
-            success = True
-
         if not success:
             return {"path": rel_path, "action": "error",
                     "original": original_size, "new": original_size, "saved": 0}
 
         new_size = tmp_output.stat().st_size
 
-        # Only replace if we actually saved space (or changed format)
-        if new_size < original_size or new_ext != old_ext.lower():
+        # Only replace if we actually saved space (or changed format).
+        # Lossy WebP within its limits must shrink by min_savings to be
+        # worth another generation of compression. An auto-routed format
+        # change must also pay for itself.
+        if source_encoding == "lossy" and new_ext == ".webp" and not resized_changed:
+            min_savings = rule.get("min_savings", WEBP_MIN_SAVINGS)
+            replace = new_size <= original_size * (1 - min_savings)
+        else:
+            replace = (new_size < original_size
+                       or (new_ext != old_ext.lower() and not decision)
+                       or (resized_changed and source_encoding is not None))
+        if replace:
             # Remove original
             file_path.unlink()
             # Move optimized to final location
@@ -253,17 +584,188 @@ def optimize_file(
             return {"path": rel_path, "new_path": str(new_path.relative_to(assets_dir)),
                     "action": f"converted_to_{target_format}",
                     "original": original_size, "new": new_size,
-                    "saved": original_size - new_size}
+                    "saved": original_size - new_size, **decision}
+        # Nothing was re-encoded, so no encoder decision to record.
+        elif source_encoding == "lossy":
+            return {"path": rel_path, "action": "kept_within_budget",
+                    "original": original_size, "new": original_size, "saved": 0}
         else:
             return {"path": rel_path, "action": "kept_original_smaller",
                     "original": original_size, "new": original_size, "saved": 0}
 
     finally:
-        tmp_resized.unlink(missing_ok=True)
         if tmp_output:
             Path(tmp_output).unlink(missing_ok=True)
 
 
+def optimize_bilevel(
+    file_path: Path,
+    assets_dir: Path,
+    white: np.ndarray,
+    original_size: int,
+    dry_run: bool = False,
+) -> dict:
+    """Write a pure black/white image as a verified 1-bit PNG."""
+    rel_path = str(file_path.relative_to(assets_dir))
+    png, settings = encode_bilevel_png(white)
+    new_size = len(png)
+    new_path = file_path.with_suffix(".png")
+    converted = file_path.suffix.lower() != ".png"
+
+    if new_size >= original_size and not converted:
+        return {"path": rel_path, "action": "kept_original_smaller",
+                "original": original_size, "new": original_size, "saved": 0}
+
+    if dry_run:
+        return {"path": rel_path, "action": "would_convert_to_bilevel_png",
+                "original": original_size, "new": new_size,
+                "saved": original_size - new_size, **settings}
+
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+        tmp_output = Path(tmp.name)
+    try:
+        tmp_output.write_bytes(png)
+        if not verify_bilevel_png(tmp_output, white):
+            return {"path": rel_path, "action": "error",
+                    "error": "1-bit output is not pixel-identical",
+                    "original": original_size, "new": original_size, "saved": 0}
+        file_path.unlink()
+        shutil.move(str(tmp_output), str(new_path))
+        tmp_output = None
+    finally:
+        if tmp_output:
+            tmp_output.unlink(missing_ok=True)
+
+    return {"path": rel_path, "new_path": str(new_path.relative_to(assets_dir)),
+            "action": "converted_to_bilevel_png",
+            "original": original_size, "new": new_size,
+            "saved": original_size - new_size, **settings}
+
+
+# Format rules loaded once per watch-mode worker process
+_WORKER_RULES: list[dict] = []
+
+
+def _init_worker(config_path: str) -> None:
+    global _WORKER_RULES
+    _WORKER_RULES = load_config(Path(config_path))
+
+
+def _optimize_in_worker(file_path: str, assets_dir: str, dry_run: bool) -> dict:
+    return optimize_file(Path(file_path), Path(assets_dir), _WORKER_RULES,
+                         dry_run=dry_run)
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def snapshot_image_files(assets_dir: Path) -> dict[Path, tuple[int, int]]:
+    """Map every image file under assets_dir to its (mtime, size) signature."""
+    snap = {}
+    for path in get_image_files(assets_dir):
+        sig = _file_signature(path)
+        if sig is not None:
+            snap[path] = sig
+    return snap
+
+
+def watch(
+    assets_dir: Path,
+    config_path: Path,
+    jobs: int,
+    interval: float = 0.5,
+    debounce: float = 1.0,
+    dry_run: bool = False,
+) -> None:
+    """Poll assets_dir and re-optimize image files after they change.
+
+    A file is dispatched once its size and mtime have been stable for
+    `debounce` seconds, so half-written exports are not picked up. Worker
+    processes keep Pillow imported and the format rules parsed between jobs.
+    """
+    known = snapshot_image_files(assets_dir)
+    pending: dict[Path, tuple[tuple[int, int], float]] = {}
+    inflight: dict[Future, Path] = {}
+
+    print(f"Watching {assets_dir} ({len(known)} image files, {jobs} workers). "
+          f"Ctrl-C to stop.")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(str(config_path),)) as pool:
+        try:
+            while True:
+                time.sleep(interval)
+                now = time.monotonic()
+                current = snapshot_image_files(assets_dir)
+
+                for path in set(known) - set(current):
+                    known.pop(path, None)
+                    pending.pop(path, None)
+                for path, sig in current.items():
+                    if known.get(path) == sig:
+                        continue
+                    if path not in pending or pending[path][0] != sig:
+                        pending[path] = (sig, now)
+
+                busy = set(inflight.values())
+                for path, (sig, changed_at) in list(pending.items()):
+                    if now - changed_at < debounce or path in busy:
+                        continue
+                    del pending[path]
+                    known[path] = sig
+                    future = pool.submit(_optimize_in_worker, str(path),
+                                         str(assets_dir), dry_run)
+                    inflight[future] = path
+
+                for future in [f for f in inflight if f.done()]:
+                    path = inflight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"ERROR: {path.relative_to(assets_dir)} — {e}")
+                        continue
+                    print(f"{result['action']}: {result['path']} "
+                          f"({result['original']:,} -> {result['new']:,} bytes)")
+                    if not dry_run:
+                        record_decisions([result])
+                    # Don't re-trigger on our own output.
+                    for out in (path, assets_dir / result.get("new_path", result["path"])):
+                        sig = _file_signature(out)
+                        if sig is not None:
+                            known[out] = sig
+                        pending.pop(out, None)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+
+
+def print_summary(results: list[dict]) -> None:
+    """Print the batch summary for a list of optimize_file() results."""
+    total_original = sum(r["original"] for r in results)
+    total_new = sum(r["new"] for r in results)
+    total_saved = sum(r["saved"] for r in results)
+    converted = sum("convert" in r["action"] for r in results)
+    errors = sum(r["action"] == "error" for r in results)
+    skipped = sum(r["action"] in ("skip", "no_rule", "skip_animated", "kept_within_budget",
+                                  "kept_original_smaller") for r in results)
+
+    print(f"\n{'='*60}")
+    print(f"OPTIMIZATION SUMMARY")
+    print(f"{'='*60}")
+    print(f"Files processed:  {len(results)}")
+    print(f"Converted:        {converted}")
+    print(f"Skipped:          {skipped}")
+    print(f"Errors:           {errors}")
+    print(f"Original total:   {total_original / (1024*1024):.1f} MB")
+    print(f"New total:        {total_new / (1024*1024):.1f} MB")
+    print(f"Saved:            {total_saved / (1024*1024):.1f} MB "
+          f"({total_saved / total_original * 100:.0f}%)"
+          if total_original > 0 else "")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Optimize Planet Wonders assets")
     parser.add_argument("--dry-run", action="store_true",
@@ -272,72 +774,97 @@ def main():
                         help="Optimize a single file")
     parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
                         help="Path to config YAML")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-optimize files as they change")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for --watch (default: CPU count)")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="Seconds a file must be unchanged before --watch "
+                             "optimizes it (default: 1.0)")
+    parser.add_argument("--shard", type=str,
+                        help="Only process shard i of N (e.g. 2/4), balanced by file size")
+    parser.add_argument("--report", type=str,
+                        help="Write per-file results as JSON (for --merge-reports)")
+    parser.add_argument("--merge-reports", type=str, nargs="+", metavar="REPORT",
+                        help="Combine --report files from sharded runs and print the summary")
     args = parser.parse_args()
 
+    if args.merge_reports:
+        try:
+            results, problems = merge_reports([Path(p) for p in args.merge_reports], REPORT_TOOL)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: cannot read reports: {e}")
+            sys.exit(1)
+        for problem in problems:
+            print(f"WARNING: {problem}")
+        print_summary(results)
+        if problems:
+            sys.exit(1)
+        return
+
     config_path = Path(args.config)
     rules = load_config(config_path)
 
+    if args.watch:
+        watch(ASSETS_DIR, config_path, jobs=args.jobs, debounce=args.debounce,
+              dry_run=args.dry_run)
+        return
+
     if args.single:
         file_path = Path(args.single)
         if not file_path.exists():
             print(f"File not found: {file_path}")
             sys.exit(1)
         result = optimize_file(file_path, ASSETS_DIR, rules, dry_run=args.dry_run)
+        if not args.dry_run:
+            record_decisions([result])
         print(f"{result['action']}: {result['path']}")
+        if "decision" in result:
+            print(f"  {result['decision']['class']} -> {result['decision']['encoder']}")
         print(f"  {result['original']:,} -> {result['new']:,} bytes "
               f"(saved {result['saved']:,})")
         return
 
-    # Process all images
+    # Process all images (or this host's shard of them)
     files = get_image_files(ASSETS_DIR)
-    print(f"Found {len(files)} image files to process")
+    try:
+        files, shard_meta = select_shard(files, ASSETS_DIR, args.shard)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.shard:
+        print(f"Shard {args.shard}: {len(files)} of {shard_meta['plan_files']} image files "
+              f"({shard_meta['shard_bytes'] / (1024*1024):.1f} MB)")
+    else:
+        print(f"Found {len(files)} image files to process")
     if args.dry_run:
         print("DRY RUN — no files will be modified\n")
 
-    total_original = 0
-    total_new = 0
-    total_saved = 0
-    converted = 0
-    skipped = 0
-    errors = 0
-
+    results = []
     for i, file_path in enumerate(files, 1):
         result = optimize_file(file_path, ASSETS_DIR, rules, dry_run=args.dry_run)
-
-        total_original += result["original"]
-        total_new += result["new"]
-        total_saved += result["saved"]
+        results.append(result)
 
         action = result["action"]
         if "convert" in action:
-            converted += 1
             saved_pct = (result["saved"] / result["original"] * 100
                          if result["original"] > 0 else 0)
+            encoder = (f" [{result['decision']['class']} -> {result['decision']['encoder']}]"
+                       if "decision" in result else "")
             print(f"[{i}/{len(files)}] {action}: {result['path']} "
                   f"({result['original']:,} -> {result['new']:,}, "
-                  f"-{saved_pct:.0f}%)")
-        elif action == "skip" or action == "no_rule":
-            skipped += 1
+                  f"-{saved_pct:.0f}%){encoder}")
         elif action == "error":
-            errors += 1
             print(f"[{i}/{len(files)}] ERROR: {result['path']} "
                   f"— {result.get('error', 'unknown')}")
-        elif action == "kept_original_smaller":
-            skipped += 1
 
-    # Summary
-    print(f"\n{'='*60}")
-    print(f"OPTIMIZATION SUMMARY")
-    print(f"{'='*60}")
-    print(f"Files processed:  {len(files)}")
-    print(f"Converted:        {converted}")
-    print(f"Skipped:          {skipped}")
-    print(f"Errors:           {errors}")
-    print(f"Original total:   {total_original / (1024*1024):.1f} MB")
-    print(f"New total:        {total_new / (1024*1024):.1f} MB")
-    print(f"Saved:            {total_saved / (1024*1024):.1f} MB "
-          f"({total_saved / total_original * 100:.0f}%)"
-          if total_original > 0 else "")
+    if not args.dry_run:
+        record_decisions(results)
+    if args.report:
+        write_report(Path(args.report), REPORT_TOOL, shard_meta, results)
+        print(f"\nReport written to: {args.report}")
+
+    print_summary(results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""
+Planet Wonders — Shared decoded-pixel cache
+
+One build runs several tools over the same sources (generator validate(),
+generate_masks.py, optimize_assets.py, thumbnails, placeholders), and each
+used to decode every image itself. Tools load images through this module
+instead: the first load decodes the file and stores the raw pixel array as
+an .npy file keyed by the file's content hash; later loads, in the same or
+another process, memory-map that array read-only without decoding or
+copying.
+
+Arrays are stored in the image's natural mode (1, L, RGB or RGBA; palette
+images are expanded to RGB/RGBA), so every tool shares one entry per file
+whatever mode it asks for; other modes are converted in memory.
+
+The cache lives in .asset_cache/pixels/ and is trimmed least recently used
+(by mtime, bumped on every hit) once it exceeds PW_PIXEL_CACHE_MB megabytes
+(default 2048). Each process scans the directory once and then tracks the
+size it adds, so stores only rescan when that running total goes over.
+Set PW_PIXEL_CACHE_MB=0 to bypass the cache entirely.
+
+    from pixel_cache import load_image, load_pixels
+
+    pixels = load_pixels(path)            # read-only np.memmap, natural mode
+    gray = load_pixels(path, "L")         # converted copy
+    img = load_image(path)                # PIL image over the cached pixels
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+CACHE_DIR = Path(__file__).parent.parent / ".asset_cache" / "pixels"
+
+# Bump when the stored array layout changes.
+CACHE_VERSION = 1
+
+# Cache size limit in MB; 0 disables the cache.
+MAX_MB = int(os.environ.get("PW_PIXEL_CACHE_MB", "2048"))
+
+# Content hashes of files already hashed by this process, by (path, mtime, size)
+_hashes: dict[tuple[str, int, int], str] = {}
+
+# Cache size in bytes as last scanned plus what this process stored since
+_cache_bytes: int | None = None
+
+
+def natural_mode(img: Image.Image) -> str:
+    """Mode pixels are cached in: 1, L and RGB(A) as-is, everything else widened."""
+    if img.mode in ("1", "L", "RGB", "RGBA"):
+        return img.mode
+    if "A" in img.getbands() or "transparency" in img.info:
+        return "RGBA"
+    return "RGB"
+
+
+def content_hash(path: Path) -> str:
+    """SHA-256 of the file's bytes, memoized per process by mtime and size."""
+    st = path.stat()
+    key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    if key not in _hashes:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _hashes[key] = h.hexdigest()
+    return _hashes[key]
+
+
+def _cache_path(digest: str) -> Path:
+    return CACHE_DIR / digest[:2] / f"{digest}-v{CACHE_VERSION}.npy"
+
+
+def _decode(path: Path) -> np.ndarray:
+    with Image.open(path) as img:
+        mode = natural_mode(img)
+        return np.asarray(img if img.mode == mode else img.convert(mode))
+
+
+def _store(cache_path: Path, pixels: np.ndarray) -> None:
+    global _cache_bytes
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix=".npy",
+                                     delete=False) as tmp:
+        np.save(tmp, pixels)
+    os.replace(tmp.name, cache_path)
+    if _cache_bytes is None:
+        _cache_bytes = sum(size for _, size, _ in _entries())
+    else:
+        _cache_bytes += cache_path.stat().st_size
+    if _cache_bytes > MAX_MB * 1024 * 1024:
+        evict(MAX_MB * 1024 * 1024)
+
+
+def _entries() -> list[tuple[float, int, Path]]:
+    """(mtime, size, path) of every cache entry."""
+    entries = []
+    for path in CACHE_DIR.glob("*/*.npy"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+def evict(max_bytes: int) -> int:
+    """Delete least recently used entries until the cache fits. Returns files removed."""
+    global _cache_bytes
+    if not CACHE_DIR.exists():
+        return 0
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    _cache_bytes = total
+    return removed
+
+
+def load_pixels(path: Path | str, mode: str | None = None) -> np.ndarray:
+    """Pixels of `path` as an array, decoding at most once per content hash.
+
+    Returns a read-only memmap in the natural mode when `mode` is None or
+    matches it, otherwise an in-memory array converted to `mode`.
+    """
+    path = Path(path)
+    if MAX_MB <= 0:
+        pixels = _decode(path)
+    else:
+        cache_path = _cache_path(content_hash(path))
+        try:
+            pixels = np.load(cache_path, mmap_mode="r")
+            os.utime(cache_path)
+        except (FileNotFoundError, ValueError):
+            pixels = _decode(path)
+            _store(cache_path, pixels)
+    if mode is None:
+        return pixels
+    img = Image.fromarray(pixels)
+    return pixels if img.mode == mode else np.asarray(img.convert(mode))
+
+
+def load_image(path: Path | str, mode: str | None = None) -> Image.Image:
+    """PIL image of `path` backed by the pixel cache (see load_pixels)."""
+    return Image.fromarray(load_pixels(path, mode))
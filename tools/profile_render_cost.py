@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Coloring Page Render-Cost Profiler
+
+Predicts the on-device fill cost of each coloring page offline. The app
+fills regions through RegionPictureCache (lib/coloring_engine/fill/), which
+records one picture per filled region with one drawRect per horizontal run
+of that region's mask pixels, and replays every cached picture each frame.
+Per page this reports:
+
+    regions         fillable regions in the mask
+    runs            drawRect calls replayed per frame once every region is
+                    filled (the ranking key)
+    max_runs        drawRect calls in the costliest single region's picture
+    largest         area of the largest region, as a fraction of the mask
+    picture_kb      estimated memory of all cached region pictures
+    scan_mpx        mask pixels scanned to record them all (each new region
+                    scans the whole mask)
+    dropped         regions past the runtime mask's 255 limit, which can
+                    never be filled
+
+Pages with a mask asset at <dir>/masks/<stem>_mask.png are profiled from
+it. Others are profiled from the mask the app generates at runtime
+(RegionMaskResolver): the outline fitted into a square canvas, then
+thresholded, dilated and split into 4-connected regions, dropping regions
+that touch the edge or are too small and keeping the first 255. Estimates,
+runtime-mask settings and flag thresholds come from the `render_cost:`
+section of asset_config.yaml.
+
+Usage:
+    python3 tools/profile_render_cost.py                          # All pages
+    python3 tools/profile_render_cost.py assets/coloring/usa      # Dirs or files
+    python3 tools/profile_render_cost.py --top 10                 # Costliest 10
+    python3 tools/profile_render_cost.py --strict                 # Fail if flagged
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from pixel_cache import load_image, load_pixels
+from validate_outlines import collect_outlines, dilate, find_mask, label_runs
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "render_cost_report.json"
+
+# Flag name -> (metric, threshold key)
+FLAGS = {
+    "runs": ("runs", "max_runs"),
+    "region_runs": ("max_runs", "max_region_runs"),
+    "largest": ("largest", "max_largest_region"),
+    "picture": ("picture_kb", "max_picture_kb"),
+    "dropped": ("dropped_regions", "max_dropped_regions"),
+}
+
+
+def load_render_cost_config(config_path: Path) -> dict:
+    """Load the render_cost section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    render_cost = cfg.get("render_cost") or {}
+    render_cost.setdefault("mask_size", 1024)
+    render_cost.setdefault("line_threshold", 210)
+    render_cost.setdefault("dilate", 1)
+    render_cost.setdefault("min_region", 48)
+    render_cost.setdefault("max_regions", 255)
+    render_cost.setdefault("bytes_per_rect", 24)
+    render_cost.setdefault("picture_overhead", 512)
+    render_cost.setdefault("max_runs", 20000)
+    render_cost.setdefault("max_region_runs", 4000)
+    render_cost.setdefault("max_largest_region", 0.75)
+    render_cost.setdefault("max_picture_kb", 1024)
+    render_cost.setdefault("max_dropped_regions", 0)
+    return render_cost
+
+
+def runtime_mask(outline: Path, cfg: dict) -> tuple[np.ndarray, int]:
+    """The region mask the app generates for an outline without a mask asset.
+
+    Returns (mask, dropped), where dropped counts regions beyond max_regions.
+    """
+    size = cfg["mask_size"]
+    img = load_image(outline, "RGBA")
+    scale = min(size / img.width, size / img.height)
+    w, h = max(1, round(img.width * scale)), max(1, round(img.height * scale))
+    page = Image.new("RGB", (size, size), (255, 255, 255))
+    fitted = img.resize((w, h), Image.BILINEAR)
+    page.paste(fitted, ((size - w) // 2, (size - h) // 2), fitted)
+
+    rgb = np.asarray(page)
+    lines = dilate((rgb < cfg["line_threshold"]).any(axis=2), cfg["dilate"])
+    rows, starts, ends, labels = label_runs(~lines, diagonal=False)
+    mask = np.zeros((size, size), dtype=np.uint8)
+    if not len(labels):
+        return mask, 0
+
+    areas = np.bincount(labels, weights=ends - starts).astype(np.int64)
+    touches = (rows == 0) | (rows == size - 1) | (starts == 0) | (ends == size)
+    keep = areas >= cfg["min_region"]
+    keep[labels[touches]] = False
+    # Labels are numbered in raster order, as the app's scan assigns IDs.
+    region_ids = np.zeros(len(areas), dtype=np.int64)
+    kept = np.flatnonzero(keep)[:cfg["max_regions"]]
+    region_ids[kept] = np.arange(1, len(kept) + 1)
+
+    ids = region_ids[labels]
+    painted = ids > 0
+    steps = np.zeros((size, size + 1), dtype=np.int64)
+    np.add.at(steps, (rows[painted], starts[painted]), ids[painted])
+    np.add.at(steps, (rows[painted], ends[painted]), -ids[painted])
+    mask[:] = np.cumsum(steps, axis=1)[:, :-1]
+    return mask, int(keep.sum()) - len(kept)
+
+
+def mask_costs(mask: np.ndarray, cfg: dict) -> dict:
+    """Region, run and memory figures for one region mask."""
+    h, w = mask.shape
+    run_start = np.ones((h, w), dtype=bool)
+    run_start[:, 1:] = mask[:, 1:] != mask[:, :-1]
+    runs = np.bincount(mask[run_start & (mask > 0)], minlength=256)
+    areas = np.bincount(mask.ravel(), minlength=256)
+    regions = int(np.count_nonzero(areas[1:]))
+    total_runs = int(runs[1:].sum())
+    picture_bytes = total_runs * cfg["bytes_per_rect"] + regions * cfg["picture_overhead"]
+    return {
+        "mask_size": [w, h],
+        "regions": regions,
+        "runs": total_runs,
+        "max_runs": int(runs[1:].max()),
+        "max_runs_region": int(runs[1:].argmax()) + 1 if regions else 0,
+        "mean_runs": round(total_runs / regions, 1) if regions else 0.0,
+        "largest": round(int(areas[1:].max()) / (h * w), 4),
+        "picture_kb": round(picture_bytes / 1024, 1),
+        "scan_mpx": round(regions * h * w / 1e6, 1),
+    }
+
+
+def profile_page(outline: Path, assets_dir: Path, cfg: dict) -> dict:
+    """Costs for one page, from its mask asset or its runtime mask."""
+    result: dict = {"path": outline.relative_to(assets_dir).as_posix(), "flags": []}
+    mask_path = find_mask(outline)
+    try:
+        if mask_path is not None:
+            result["mask"] = mask_path.relative_to(assets_dir).as_posix()
+            mask, dropped = np.asarray(load_pixels(mask_path, "L")), 0
+        else:
+            result["mask"] = None
+            mask, dropped = runtime_mask(outline, cfg)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    result.update(mask_costs(mask, cfg))
+    result["dropped_regions"] = dropped
+    for flag, (metric, limit) in FLAGS.items():
+        if result[metric] > cfg[limit]:
+            result["flags"].append(flag)
+    return result
+
+
+def _profile_worker(args: tuple) -> dict:
+    return profile_page(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile coloring page fill render cost")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Outline files or directories (default: assets/coloring)")
+    parser.add_argument("--top", type=int, metavar="N", help="List only the N costliest pages")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--strict", action="store_true", help="Fail if any page is flagged")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    try:
+        cfg = load_render_cost_config(args.config)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    assets_dir = ASSETS_DIR.resolve()
+    outlines = collect_outlines([p.resolve() for p in args.paths] or [assets_dir / "coloring"])
+    outside = [p for p in outlines if assets_dir not in p.parents]
+    if outside:
+        print(f"Error: {outside[0]} is not under {assets_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    work = [(p, assets_dir, cfg) for p in outlines]
+    if args.jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_profile_worker, work, chunksize=4))
+    else:
+        results = [_profile_worker(w) for w in work]
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if "error" in r]
+    ranked = sorted((r for r in results if "error" not in r), key=lambda r: -r["runs"])
+    for rank, r in enumerate(ranked, 1):
+        r["rank"] = rank
+    flagged = [r for r in ranked if r["flags"]]
+
+    listed = ranked[:args.top]
+    width = max((len(r["path"]) for r in listed), default=4)
+    print(f"{'#':>3}  {'page':<{width}} {'src':<7} {'regions':>7} {'runs':>8} "
+          f"{'max/rgn':>8} {'largest':>7} {'pic KB':>8}  flags")
+    for r in listed:
+        print(f"{r['rank']:>3}  {r['path']:<{width}} {'mask' if r['mask'] else 'runtime':<7} "
+              f"{r['regions']:>7} {r['runs']:>8} {r['max_runs']:>8} {r['largest']:>7.1%} "
+              f"{r['picture_kb']:>8.1f}  {', '.join(r['flags'])}")
+    for r in failed:
+        print(f"  ERROR {r['path']}: {r['error']}")
+
+    report = {"tool": "profile_render_cost", "pages": len(results), "flagged": len(flagged),
+              "errors": len(failed), "seconds": round(elapsed, 2),
+              "thresholds": {limit: cfg[limit] for _, limit in FLAGS.values()},
+              "results": ranked + failed}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("RENDER COST SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Pages:            {len(results)}")
+    print(f"From mask assets: {sum(1 for r in ranked if r['mask'])}")
+    print(f"Flagged:          {len(flagged)}")
+    print(f"Errors:           {len(failed)}")
+    if ranked:
+        print(f"Costliest page:   {ranked[0]['path']} ({ranked[0]['runs']} runs)")
+        print(f"Largest cache:    {max(r['picture_kb'] for r in ranked):.1f} KB")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"Report:           {args.report}")
+
+    if failed or (args.strict and flagged):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Planet Wonders — Parallel scene runner for the coloring pack generators
+
+Each generate_*_pack.py script defines SCENES and two module-level
+functions: render_scene(name, svg_dir), which draws, thresholds, validates
+in memory and writes one scene, plus its SVG (see scene_svg.py) when
+svg_dir is set; and preview_scene(name, scale), which draws the scene
+through ScaledDraw onto a small canvas and returns it. run_pack() renders
+the selected scenes in a process pool, so a pack takes roughly one scene's
+wall time on a multi-core machine, and prints per-scene timings.
+
+--preview renders at a fraction of full size (0.25 by default) without
+writing any PNGs and tiles the scenes into one labelled contact sheet.
+
+    python3 tools/generate_ghana_story_pack.py                     # All scenes
+    python3 tools/generate_ghana_story_pack.py --only ghana_03_school
+    python3 tools/generate_ghana_story_pack.py --jobs 1            # Serial
+    python3 tools/generate_ghana_story_pack.py --svg build/svg/ghana
+    python3 tools/generate_ghana_story_pack.py --preview           # Contact sheet
+    python3 tools/generate_ghana_story_pack.py --preview 0.5 --sheet story.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image, ImageDraw, ImageFont
+
+PREVIEW_DIR = Path(__file__).parent.parent / "build" / "previews"
+
+# Scenes whose SVG raster is grossly off (beyond edge rounding) for more
+# than this fraction of black pixels are flagged.
+SVG_MAX_GROSS = 0.005
+
+# Contact sheet layout
+SHEET_GAP = 8
+SHEET_LABEL = 18
+
+Render = Callable[[str, Path | None], dict | None]
+Preview = Callable[[str, float], Image.Image]
+
+
+class ScaledDraw:
+    """ImageDraw wrapper that scales coordinates, stroke widths and radii.
+
+    Lets scene functions written for the full canvas draw a preview on a
+    smaller one. Every primitive takes its coordinates first; `width` and
+    `radius` must be passed as keywords, as the generators do.
+    """
+
+    def __init__(self, draw: ImageDraw.ImageDraw, scale: float):
+        self._draw = draw
+        self.scale = scale
+
+    def _xy(self, xy):
+        s = self.scale
+        if isinstance(xy[0], (int, float)):
+            return [v * s for v in xy]
+        return [(x * s, y * s) for x, y in xy]
+
+    def __getattr__(self, name):
+        method = getattr(self._draw, name)
+
+        def scaled(xy, *args, **kwargs):
+            if kwargs.get("width"):
+                kwargs["width"] = max(1, round(kwargs["width"] * self.scale))
+            if "radius" in kwargs:
+                kwargs["radius"] = kwargs["radius"] * self.scale
+            return method(self._xy(xy), *args, **kwargs)
+
+        return scaled
+
+
+def _timed(fn: Callable, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def select_scenes(names: list[str], only: list[str] | None) -> list[str]:
+    """Filter scene file names by --only values (with or without .png).
+
+    Raises ValueError naming any value that matches no scene.
+    """
+    if not only:
+        return list(names)
+    wanted = {o[:-4] if o.endswith(".png") else o for o in only}
+    unknown = wanted - {n.removesuffix(".png") for n in names}
+    if unknown:
+        raise ValueError(f"unknown scene(s): {', '.join(sorted(unknown))}")
+    return [n for n in names if n.removesuffix(".png") in wanted]
+
+
+def contact_sheet(tiles: list[tuple[str, Image.Image]], columns: int | None = None) -> Image.Image:
+    """Tile labelled scene previews into one image, in the given order."""
+    columns = columns or math.ceil(math.sqrt(len(tiles)))
+    rows = math.ceil(len(tiles) / columns)
+    tw = max(img.width for _, img in tiles)
+    th = max(img.height for _, img in tiles) + SHEET_LABEL
+    sheet = Image.new("L", (columns * (tw + SHEET_GAP) + SHEET_GAP,
+                            rows * (th + SHEET_GAP) + SHEET_GAP), 160)
+    draw = ImageDraw.Draw(sheet)
+    font = ImageFont.load_default()
+    for i, (label, img) in enumerate(tiles):
+        x = SHEET_GAP + (i % columns) * (tw + SHEET_GAP)
+        y = SHEET_GAP + (i // columns) * (th + SHEET_GAP)
+        draw.rectangle((x, y, x + tw - 1, y + SHEET_LABEL - 1), fill=255)
+        draw.text((x + 4, y + 3), label, fill=0, font=font)
+        sheet.paste(img, (x, y + SHEET_LABEL))
+    return sheet
+
+
+def run_pack(
+    title: str,
+    scenes: list[tuple[str, Callable]],
+    render: Render,
+    preview: Preview | None = None,
+    argv: list[str] | None = None,
+) -> None:
+    """Parse the CLI, render (or preview) the chosen scenes and print a summary."""
+    parser = argparse.ArgumentParser(description=f"Generate the {title} coloring pack")
+    parser.add_argument("--only", action="append", metavar="NAME",
+                        help="Render only this scene (repeatable)")
+    parser.add_argument("--jobs", type=int,
+                        help="Worker processes (default: CPU count, 1 for --preview; "
+                             "1 = serial)")
+    parser.add_argument("--svg", type=Path, metavar="DIR",
+                        help="Also write each scene as SVG into DIR and diff it against the PNG")
+    parser.add_argument("--preview", type=float, nargs="?", const=0.25, metavar="SCALE",
+                        help="Draw at SCALE (default 0.25) into a contact sheet; writes no PNGs")
+    parser.add_argument("--sheet", type=Path, metavar="PATH",
+                        help="Contact sheet path (default: build/previews/<pack>.png)")
+    args = parser.parse_args(argv)
+
+    try:
+        names = select_scenes([name for name, _ in scenes], args.only)
+    except ValueError as e:
+        print(f"Error: {e}")
+        print(f"Scenes: {', '.join(name.removesuffix('.png') for name, _ in scenes)}")
+        sys.exit(1)
+    if args.preview is not None and (preview is None or not 0 < args.preview <= 1):
+        print("Error: --preview needs a scale in (0, 1]" if preview
+              else "Error: this pack has no preview_scene()")
+        sys.exit(1)
+
+    previewing = args.preview is not None
+    if previewing:
+        # Small scenes draw faster than a worker process starts.
+        task, task_args, default_jobs = preview, (args.preview,), 1
+    else:
+        task, task_args, default_jobs = render, (args.svg,), os.cpu_count() or 1
+    jobs = max(1, min(args.jobs or default_jobs, len(names)))
+    if previewing:
+        print(f"Previewing {len(names)} scene(s) at {args.preview:g}x with {jobs} worker(s)\n")
+    else:
+        print(f"Rendering {len(names)} scene(s) with {jobs} worker(s)\n")
+
+    timings: dict[str, float] = {}
+    results: dict[str, object] = {}
+    errors: dict[str, str] = {}
+    start = time.perf_counter()
+
+    def report(name: str, seconds: float | None, result=None, error: str | None = None) -> None:
+        done = len(timings) + len(errors)
+        if error is not None:
+            print(f"  [{done}/{len(names)}] {name}  ERROR: {error}")
+            return
+        line = f"  [{done}/{len(names)}] {name}  {seconds:.2f}s"
+        if isinstance(result, dict):
+            line += f"  svg {result['svg_bytes'] / 1024:.1f} KB, diff {result['diff']:.1%}"
+            if result["gross"] > SVG_MAX_GROSS:
+                line += f"  (check: {result['gross']:.2%} off by more than a pixel)"
+            if result["unsupported"]:
+                line += f"  not in SVG: {', '.join(result['unsupported'])}"
+        print(line)
+
+    def done(name: str, seconds: float, result) -> None:
+        timings[name] = seconds
+        results[name] = result
+        report(name, seconds, result)
+
+    if jobs == 1:
+        for name in names:
+            try:
+                done(name, *_timed(task, name, *task_args))
+            except Exception as e:
+                errors[name] = str(e)
+                report(name, None, error=errors[name])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_timed, task, name, *task_args): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    done(name, *future.result())
+                except Exception as e:
+                    errors[name] = str(e)
+                    report(name, None, error=errors[name])
+
+    sheet_path = None
+    if previewing and results:
+        sheet_path = args.sheet or PREVIEW_DIR / f"{title.lower().replace(' ', '_')}.png"
+        tiles = [(name.removesuffix(".png"), results[name]) for name in names if name in results]
+        sheet_path.parent.mkdir(parents=True, exist_ok=True)
+        contact_sheet(tiles).save(sheet_path, compress_level=1)
+    wall = time.perf_counter() - start
+    total = sum(timings.values())
+
+    print(f"\n{'=' * 60}")
+    print(f"{title.upper()} {'PREVIEW ' if previewing else ''}SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Scenes:           {len(names)}")
+    print(f"{'Previewed:' if previewing else 'Written:':<18}{len(timings)}")
+    print(f"Errors:           {len(errors)}")
+    print(f"Workers:          {jobs}")
+    print(f"Scene time:       {total:.2f}s")
+    print(f"Wall time:        {wall:.2f}s")
+    if timings:
+        slowest = max(timings, key=timings.get)
+        print(f"Slowest scene:    {slowest} ({timings[slowest]:.2f}s)")
+    svgs = {n: r for n, r in results.items() if isinstance(r, dict)}
+    if svgs:
+        worst = max(svgs, key=lambda n: svgs[n]["diff"])
+        print(f"SVG total:        {sum(s['svg_bytes'] for s in svgs.values()) / 1024:.1f} KB")
+        print(f"Worst SVG diff:   {worst} ({svgs[worst]['diff']:.1%}, "
+              f"IoU {svgs[worst]['iou']:.3f})")
+        flagged = sum(1 for s in svgs.values() if s["gross"] > SVG_MAX_GROSS)
+        print(f"SVGs to check:    {flagged}")
+    if sheet_path:
+        print(f"Contact sheet:    {sheet_path}")
+    if errors:
+        sys.exit(1)
@@ -0,0 +1,340 @@
+"""
+Planet Wonders — SVG export for the coloring pack generators
+
+RecordingDraw wraps a PIL ImageDraw: every call is drawn on the raster as
+before and also recorded as an SVG shape with the same stroke width, so a
+scene can be shipped as a few KB of resolution-independent path data next
+to its PNG.
+
+PIL and SVG place thick strokes differently. PIL draws ellipse, rectangle
+and arc outlines inside their bounding box and polygon outlines inside the
+polygon; SVG centres a stroke on its path. The recorder insets each path by
+half the stroke width (polygons are stroked at double width and clipped to
+themselves), and shifts pixel coordinates, truncated to integers as PIL
+does, to pixel centres.
+
+svg_diff() checks the result: it rasterises the recorded shapes with SVG
+semantics (independently of PIL's drawing code) at pixel centres and
+compares them with the thresholded PNG. Expect a few percent of edge
+pixels to differ, and slightly more at the ends of flat ellipses: PIL's
+thick ellipse is the ring between its box and the box inset by the width,
+which is not a constant-width stroke.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Coordinates are written with this many decimals.
+PRECISION = 1
+
+
+def _num(value: float) -> str:
+    text = f"{value:.{PRECISION}f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _points(xy) -> list[tuple[int, int]]:
+    """Normalise PIL coordinate sequences to [(x, y), ...], truncated as PIL does."""
+    if isinstance(xy[0], (int, float)):
+        return [(int(xy[i]), int(xy[i + 1])) for i in range(0, len(xy), 2)]
+    return [(int(x), int(y)) for x, y in xy]
+
+
+def _color(ink) -> str | None:
+    if ink is None:
+        return None
+    return "#fff" if ink == 255 else "#000" if ink == 0 else "#" + f"{int(ink):02x}" * 3
+
+
+class RecordingDraw:
+    """ImageDraw stand-in that draws through and records SVG shapes."""
+
+    def __init__(self, draw: ImageDraw.ImageDraw):
+        self._draw = draw
+        self.shapes: list[dict] = []
+        self.unsupported: set[str] = set()
+
+    def __getattr__(self, name):
+        # Anything not recorded below still draws, but is missing from the SVG.
+        self.unsupported.add(name)
+        return getattr(self._draw, name)
+
+    def _box(self, xy, width: int) -> tuple[float, float, float, float]:
+        """Path box for a PIL bbox whose outline of `width` is drawn inside it."""
+        (x0, y0), (x1, y1) = _points(xy)
+        inset = width / 2
+        return x0 + inset, y0 + inset, x1 + 1 - inset, y1 + 1 - inset
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        self._draw.ellipse(xy, fill=fill, outline=outline, width=width)
+        self.shapes.append({"kind": "ellipse", "box": self._box(xy, width),
+                            "width": width, "stroke": outline, "fill": fill})
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        self._draw.rectangle(xy, fill=fill, outline=outline, width=width)
+        self.shapes.append({"kind": "rect", "box": self._box(xy, width), "radius": 0,
+                            "width": width, "stroke": outline, "fill": fill})
+
+    def rounded_rectangle(self, xy, radius=0, fill=None, outline=None, width=1, **kwargs):
+        self._draw.rounded_rectangle(xy, radius=radius, fill=fill, outline=outline,
+                                     width=width, **kwargs)
+        self.shapes.append({"kind": "rect", "box": self._box(xy, width),
+                            "radius": max(radius - width / 2, 0),
+                            "width": width, "stroke": outline, "fill": fill})
+
+    def arc(self, xy, start, end, fill=None, width=1):
+        self._draw.arc(xy, start, end, fill=fill, width=width)
+        self.shapes.append({"kind": "arc", "box": self._box(xy, width),
+                            "start": start, "end": end, "width": width, "stroke": fill})
+
+    def line(self, xy, fill=None, width=0, joint=None):
+        self._draw.line(xy, fill=fill, width=width, joint=joint)
+        points = [(x + 0.5, y + 0.5) for x, y in _points(xy)]
+        self.shapes.append({"kind": "line", "points": points,
+                            "width": max(width, 1), "stroke": fill})
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        self._draw.polygon(xy, fill=fill, outline=outline, width=width)
+        points = [(x + 0.5, y + 0.5) for x, y in _points(xy)]
+        self.shapes.append({"kind": "polygon", "points": points,
+                            "width": width, "stroke": outline, "fill": fill})
+
+
+# -----------------------------
+# SVG output
+# -----------------------------
+
+def _arc_path(box, start: float, end: float) -> str:
+    x0, y0, x1, y1 = box
+    cx, cy, rx, ry = (x0 + x1) / 2, (y0 + y1) / 2, (x1 - x0) / 2, (y1 - y0) / 2
+    sweep = (end - start) % 360 or 360
+    if sweep >= 360:
+        return (f"M{_num(cx - rx)} {_num(cy)}a{_num(rx)} {_num(ry)} 0 1 1 {_num(2 * rx)} 0"
+                f"a{_num(rx)} {_num(ry)} 0 1 1 {_num(-2 * rx)} 0")
+    a0, a1 = math.radians(start), math.radians(start + sweep)
+    sx, sy = cx + rx * math.cos(a0), cy + ry * math.sin(a0)
+    ex, ey = cx + rx * math.cos(a1), cy + ry * math.sin(a1)
+    large = 1 if sweep > 180 else 0
+    return (f"M{_num(sx)} {_num(sy)}A{_num(rx)} {_num(ry)} 0 {large} 1 "
+            f"{_num(ex)} {_num(ey)}")
+
+
+def _paint(shape: dict, stroke_scale: int = 1) -> str:
+    attrs = []
+    fill = _color(shape.get("fill"))
+    if fill:
+        attrs.append(f'fill="{fill}"')
+    stroke = _color(shape.get("stroke"))
+    if stroke is None:
+        attrs.append('stroke="none"')
+    else:
+        if stroke != "#000":
+            attrs.append(f'stroke="{stroke}"')
+        attrs.append(f'stroke-width="{_num(shape["width"] * stroke_scale)}"')
+    return " ".join(attrs)
+
+
+def to_svg(shapes: list[dict], width: int, height: int) -> str:
+    """Serialise recorded shapes as a standalone SVG document."""
+    body = [f'<rect width="{width}" height="{height}" fill="#fff" stroke="none"/>']
+    clip = 0
+    for s in shapes:
+        kind = s["kind"]
+        if kind == "ellipse":
+            x0, y0, x1, y1 = s["box"]
+            body.append(f'<ellipse cx="{_num((x0 + x1) / 2)}" cy="{_num((y0 + y1) / 2)}" '
+                        f'rx="{_num((x1 - x0) / 2)}" ry="{_num((y1 - y0) / 2)}" {_paint(s)}/>')
+        elif kind == "rect":
+            x0, y0, x1, y1 = s["box"]
+            radius = f' rx="{_num(s["radius"])}"' if s["radius"] else ""
+            body.append(f'<rect x="{_num(x0)}" y="{_num(y0)}" width="{_num(x1 - x0)}" '
+                        f'height="{_num(y1 - y0)}"{radius} {_paint(s)}/>')
+        elif kind == "arc":
+            body.append(f'<path d="{_arc_path(s["box"], s["start"], s["end"])}" {_paint(s)}/>')
+        elif kind == "line":
+            pts = " ".join(f"{_num(x)},{_num(y)}" for x, y in s["points"])
+            # PIL joins wide segments without caps or joints: closest to bevel.
+            body.append(f'<polyline points="{pts}" stroke-linejoin="bevel" {_paint(s)}/>')
+        elif kind == "polygon":
+            pts = " ".join(f"{_num(x)},{_num(y)}" for x, y in s["points"])
+            if s.get("stroke") is None or s["width"] <= 1:
+                body.append(f'<polygon points="{pts}" {_paint(s)}/>')
+                continue
+            # Inside-only outline: double-width stroke clipped to the shape.
+            clip += 1
+            body.append(f'<clipPath id="c{clip}"><polygon id="p{clip}" points="{pts}"/></clipPath>'
+                        f'<use href="#p{clip}" clip-path="url(#c{clip})" {_paint(s, 2)}/>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="{width}" height="{height}">'
+            f'<g fill="none" stroke="#000">'
+            + "".join(body) + "</g></svg>\n")
+
+
+# -----------------------------
+# Rasterising for the diff check
+# -----------------------------
+
+def _segment_distance(px, py, ax, ay, bx, by, butt: bool):
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return np.hypot(px - ax, py - ay)
+    t = ((px - ax) * dx + (py - ay) * dy) / length2
+    if butt:
+        # Butt caps: points beyond either end are outside the stroke.
+        dist = np.abs((px - ax) * dy - (py - ay) * dx) / math.sqrt(length2)
+        return np.where((t >= 0) & (t <= 1), dist, np.inf)
+    t = np.clip(t, 0, 1)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _inside_polygon(px, py, points) -> np.ndarray:
+    inside = np.zeros(px.shape, dtype=bool)
+    n = len(points)
+    for i in range(n):
+        (x0, y0), (x1, y1) = points[i], points[(i + 1) % n]
+        if y0 == y1:
+            continue
+        crosses = (y0 > py) != (y1 > py)
+        x_at = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+        inside ^= crosses & (px < x_at)
+    return inside
+
+
+def _ellipse_field(px, py, box):
+    """Signed distance to an ellipse outline (negative inside).
+
+    Closest points are found by iterating on the evolute, which converges
+    in a few steps even for very flat ellipses.
+    """
+    x0, y0, x1, y1 = box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    a, b = max((x1 - x0) / 2, 1e-6), max((y1 - y0) / 2, 1e-6)
+    qx, qy = np.abs(px - cx), np.abs(py - cy)
+    tx = np.full(qx.shape, math.sqrt(0.5))
+    ty = tx.copy()
+    for _ in range(4):
+        ex = (a * a - b * b) * tx ** 3 / a
+        ey = (b * b - a * a) * ty ** 3 / b
+        r = np.hypot(a * tx - ex, b * ty - ey)
+        q = np.maximum(np.hypot(qx - ex, qy - ey), 1e-9)
+        tx = np.clip(((qx - ex) * r / q + ex) / a, 0, 1)
+        ty = np.clip(((qy - ey) * r / q + ey) / b, 0, 1)
+        t = np.maximum(np.hypot(tx, ty), 1e-9)
+        tx, ty = tx / t, ty / t
+    dist = np.hypot(qx - a * tx, qy - b * ty)
+    inside = (qx / a) ** 2 + (qy / b) ** 2 < 1
+    return np.where(inside, -dist, dist)
+
+
+def _rect_field(px, py, box, radius):
+    """Signed distance to a (rounded) rectangle outline (negative inside)."""
+    x0, y0, x1, y1 = box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    hx, hy = (x1 - x0) / 2, (y1 - y0) / 2
+    r = min(radius, hx, hy)
+    qx = np.abs(px - cx) - (hx - r)
+    qy = np.abs(py - cy) - (hy - r)
+    if r == 0:
+        # Square corners, as SVG's default miter join draws them.
+        return np.maximum(qx, qy)
+    outside = np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+    return outside + np.minimum(np.maximum(qx, qy), 0) - r
+
+
+def rasterize(shapes: list[dict], width: int, height: int) -> np.ndarray:
+    """Rasterise recorded shapes with SVG semantics; returns True where black."""
+    canvas = np.zeros((height, width), dtype=bool)
+    for s in shapes:
+        half = s["width"] / 2
+        if s["kind"] in ("line", "polygon"):
+            xs = [x for x, _ in s["points"]]
+            ys = [y for _, y in s["points"]]
+            pad = s["width"] + 1
+            bx0, by0, bx1, by1 = min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad
+        else:
+            pad = half + 1
+            bx0, by0, bx1, by1 = (s["box"][0] - pad, s["box"][1] - pad,
+                                  s["box"][2] + pad, s["box"][3] + pad)
+        c0, r0 = max(int(bx0), 0), max(int(by0), 0)
+        c1, r1 = min(int(math.ceil(bx1)), width), min(int(math.ceil(by1)), height)
+        if c0 >= c1 or r0 >= r1:
+            continue
+        py, px = np.mgrid[r0:r1, c0:c1] + 0.5
+
+        fill = stroke = None
+        if s["kind"] == "ellipse":
+            field = _ellipse_field(px, py, s["box"])
+            fill, stroke = field <= 0, np.abs(field) <= half
+        elif s["kind"] == "rect":
+            field = _rect_field(px, py, s["box"], s["radius"])
+            fill, stroke = field <= 0, np.abs(field) <= half
+        elif s["kind"] == "arc":
+            field = _ellipse_field(px, py, s["box"])
+            x0, y0, x1, y1 = s["box"]
+            angle = np.degrees(np.arctan2((py - (y0 + y1) / 2) / max(y1 - y0, 1e-6),
+                                          (px - (x0 + x1) / 2) / max(x1 - x0, 1e-6)))
+            sweep = (s["end"] - s["start"]) % 360 or 360
+            within = (angle - s["start"]) % 360 <= sweep
+            stroke = (np.abs(field) <= half) & within
+        elif s["kind"] == "line":
+            dist = np.full(px.shape, np.inf)
+            pts = s["points"]
+            for (ax, ay), (bx, by) in zip(pts, pts[1:]):
+                dist = np.minimum(dist, _segment_distance(px, py, ax, ay, bx, by, butt=True))
+            stroke = dist <= half
+        elif s["kind"] == "polygon":
+            pts = s["points"]
+            fill = _inside_polygon(px, py, pts)
+            dist = np.full(px.shape, np.inf)
+            for i in range(len(pts)):
+                (ax, ay), (bx, by) = pts[i], pts[(i + 1) % len(pts)]
+                dist = np.minimum(dist, _segment_distance(px, py, ax, ay, bx, by, butt=False))
+            # Double-width stroke clipped to the polygon (see to_svg).
+            stroke = (dist <= s["width"]) & fill if s["width"] > 1 else dist <= half
+
+        view = canvas[r0:r1, c0:c1]
+        if s.get("fill") is not None and fill is not None:
+            view[fill] = s["fill"] == 0
+        if s.get("stroke") is not None and stroke is not None:
+            view[stroke] = s["stroke"] == 0
+    return canvas
+
+
+def raster_diff(png: np.ndarray, svg: np.ndarray) -> dict:
+    """Compare two boolean ink rasters of the same size.
+
+    `diff` is the fraction of the PNG's black pixels that differ and `iou`
+    the intersection over union of the two black areas. Most differences
+    are one-pixel edge rounding; `gross` counts only differing pixels whose
+    four neighbours differ too (missing or misplaced geometry), as a
+    fraction of black pixels.
+    """
+    differ = png ^ svg
+    padded = np.pad(differ, 1)
+    gross = (differ & padded[:-2, 1:-1] & padded[2:, 1:-1]
+             & padded[1:-1, :-2] & padded[1:-1, 2:])
+    ink = max(int(png.sum()), 1)
+    return {"diff": round(int(differ.sum()) / ink, 4),
+            "gross": round(int(gross.sum()) / ink, 5),
+            "iou": round(int((png & svg).sum()) / max(int((png | svg).sum()), 1), 4)}
+
+
+def svg_diff(shapes: list[dict], bw: Image.Image) -> dict:
+    """Compare rasterised shapes with the thresholded PNG image (see raster_diff)."""
+    png = ~np.asarray(bw.convert("1"), dtype=bool)
+    return raster_diff(png, rasterize(shapes, bw.width, bw.height))
+
+
+def write_svg(draw: RecordingDraw, bw: Image.Image, out_path: Path) -> dict:
+    """Write the recorded scene as SVG; returns size and diff stats."""
+    svg = to_svg(draw.shapes, bw.width, bw.height)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(svg, encoding="utf-8")
+    return {"svg_bytes": len(svg.encode("utf-8")), "shapes": len(draw.shapes),
+            "unsupported": sorted(draw.unsupported), **svg_diff(draw.shapes, bw)}
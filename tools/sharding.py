@@ -0,0 +1,119 @@
+"""
+Planet Wonders — Shard helpers for batch tools
+
+Splits a file list into N deterministic, size-balanced shards so independent
+processes or hosts can each run `--shard i/N` of a batch, and checks that a
+set of per-shard JSON reports covers the whole plan exactly once.
+
+Assignment is longest-processing-time first: files are ordered by size
+(largest first, ties broken by a SHA-1 of the path) and each goes to the
+currently lightest shard. Every shard must compute its plan from the same
+tree, e.g. separate checkouts of one commit, or processes started before any
+of them writes. Reports carry a digest of the full plan so merge_reports()
+can tell when that was not the case.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+from collections import Counter
+from pathlib import Path
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse "i/N" (1-based) into (index, count); raises ValueError if malformed."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got '{spec}'") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard index must be in 1..{count}, got '{spec}'")
+    return index, count
+
+
+def _path_key(path: str) -> str:
+    return hashlib.sha1(path.encode("utf-8")).hexdigest()
+
+
+def assign_shards(sizes: dict[str, int], count: int) -> dict[str, int]:
+    """Map every path to a 1-based shard, balancing total size per shard."""
+    heap = [(0, shard) for shard in range(1, count + 1)]
+    assignment = {}
+    for path in sorted(sizes, key=lambda p: (-sizes[p], _path_key(p))):
+        load, shard = heapq.heappop(heap)
+        assignment[path] = shard
+        heapq.heappush(heap, (load + sizes[path], shard))
+    return assignment
+
+
+def plan_digest(sizes: dict[str, int]) -> str:
+    """Digest of the full (unsharded) file list and sizes, identical on every shard."""
+    h = hashlib.sha256()
+    for path in sorted(sizes):
+        h.update(f"{path}\0{sizes[path]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def select_shard(
+    files: list[Path], root: Path, spec: str | None,
+) -> tuple[list[Path], dict]:
+    """Return (this shard's files in original order, report metadata).
+
+    With spec None every file is selected and the metadata says so.
+    """
+    sizes = {f.relative_to(root).as_posix(): f.stat().st_size for f in files}
+    if spec is None:
+        selected, shard = list(files), None
+    else:
+        index, count = parse_shard(spec)
+        assignment = assign_shards(sizes, count)
+        selected = [f for f in files if assignment[f.relative_to(root).as_posix()] == index]
+        shard = [index, count]
+    meta = {
+        "shard": shard,
+        "plan_digest": plan_digest(sizes),
+        "plan_files": len(files),
+        "shard_files": len(selected),
+        "shard_bytes": sum(sizes[f.relative_to(root).as_posix()] for f in selected),
+    }
+    return selected, meta
+
+
+def write_report(path: Path, tool: str, meta: dict, results: list[dict]) -> None:
+    report = {"tool": tool, **meta, "results": results}
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def merge_reports(paths: list[Path], tool: str) -> tuple[list[dict], list[str]]:
+    """Load shard reports; return (all results, consistency problems)."""
+    reports = [json.loads(Path(p).read_text(encoding="utf-8")) for p in paths]
+    problems = []
+    for path, report in zip(paths, reports):
+        if report.get("tool") != tool:
+            problems.append(f"{path}: written by {report.get('tool')!r}, not {tool!r}")
+
+    sharded = [r for r in reports if r.get("shard")]
+    digests = {r["plan_digest"] for r in sharded}
+    if len(digests) > 1:
+        problems.append("reports were planned from different file trees "
+                        "(plan digests differ)")
+    counts = {r["shard"][1] for r in sharded}
+    if len(counts) > 1:
+        problems.append(f"reports disagree on shard count: {sorted(counts)}")
+    elif counts:
+        count = counts.pop()
+        seen = [r["shard"][0] for r in sharded]
+        missing = sorted(set(range(1, count + 1)) - set(seen))
+        dupes = sorted({s for s in seen if seen.count(s) > 1})
+        if missing:
+            problems.append(f"missing shard(s): {', '.join(f'{s}/{count}' for s in missing)}")
+        if dupes:
+            problems.append(f"duplicate shard(s): {', '.join(f'{s}/{count}' for s in dupes)}")
+
+    results = [result for report in reports for result in report["results"]]
+    repeated = [p for p, n in Counter(r["path"] for r in results).items() if n > 1]
+    if repeated:
+        problems.append(f"{len(repeated)} file(s) appear in more than one report")
+    return results, problems
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Puzzle Piece Pre-Slicer
+
+Jigsaw and sliding puzzles ship whole images, and the game crops (and for
+jigsaws, would mask) every piece at runtime on the main thread as a puzzle
+opens. This tool cuts the pieces ahead of time: for every puzzle image and
+every supported grid size it writes one atlas holding all the pieces and a
+piece map describing where each one goes.
+
+Both games show the image BoxFit.cover in a square board, so pieces are cut
+from the centred square crop, on integer cell boundaries (cell i of n
+starts at round(i * side / n)). Piece ids match the app's (r<row>_c<col>).
+
+Jigsaw pieces get classic tabs: every inner edge gets a round knob on a
+neck, `tab_radius` of the smaller cell side, pointing into one of its two
+pieces (seeded per puzzle and grid, so re-runs are stable). A piece's image
+covers its cell plus the tabs it sends out; its alpha channel is the piece
+mask, anti-aliased with 4x4 supersampling. Where a tab meets the piece it
+enters, the two alphas sum to exactly 255, so placed pieces tile the image
+with no seams. Sliding puzzle pieces are plain opaque squares.
+
+Atlases are WebP (lossy colour at `quality`, lossless alpha) with pieces in
+a grid of slots rounded up to 16px, so lossy blocks never straddle two
+pieces; spare slot space repeats the piece's edge pixels. Each atlas is
+decoded after writing and checked: jigsaw alphas must still sum to 255
+everywhere, and the image recomposed from the pieces must be within
+`min_psnr` of the source crop. Atlases are encoded in parallel, one job per
+image and grid size.
+
+Output goes to <output>/<asset dir>/: <stem>_<rows>x<cols>.webp per grid and
+<stem>.json, the piece map:
+
+    {"source": asset path, "kind": "jigsaw" | "sliding", "crop": [x, y, w, h],
+     "grids": [{"rows": r, "cols": c, "atlas": file, "atlas_size": [w, h],
+                "pieces": [{"id": "r0_c0", "row": 0, "col": 0,
+                            "cell": [x, y, w, h],      # in the crop
+                            "box": [x, y, w, h],       # cell + tabs, in the crop
+                            "atlas": [x, y],           # box origin in the atlas
+                            "edges": [top, right, bottom, left]}]}]}
+
+`edges` are 1 for a tab, -1 for a blank and 0 for a flat border (all 0 for
+sliding pieces). Jigsaw images and their grids come from the puzzle catalog
+plus the `jigsaw_grids` list; sliding images from `sliding_paths`, cut at
+each of `sliding_grids`. Settings come from the `puzzles:` section of
+asset_config.yaml.
+
+Usage:
+    python3 tools/slice_puzzles.py                        # Everything
+    python3 tools/slice_puzzles.py --only jigsaw          # One kind
+    python3 tools/slice_puzzles.py --jobs 4
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from optimize_assets import IMAGE_EXTENSIONS
+from pixel_cache import load_pixels
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "puzzles_report.json"
+
+# Atlas slots are rounded up to this, the WebP macroblock size
+SLOT_ALIGN = 16
+
+# Supersampling per axis for anti-aliased tab edges
+SUPERSAMPLE = 4
+
+# Knob geometry, in tab radii: circle centre distance from the edge, neck half-width
+KNOB_CENTER = 1.2
+KNOB_NECK = 0.55
+
+
+def load_puzzles_config(config_path: Path) -> dict:
+    """Load the puzzles section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    puzzles = cfg.get("puzzles") or {}
+    puzzles.setdefault("catalog", "puzzles/catalog.json")
+    puzzles.setdefault("jigsaw_grids", ["3x3", "4x4"])
+    puzzles.setdefault("sliding_paths", ["sliding_puzzles"])
+    puzzles.setdefault("sliding_grids", [3, 4])
+    puzzles.setdefault("tab_radius", 0.14)
+    puzzles.setdefault("quality", 90)
+    puzzles.setdefault("method", 4)
+    puzzles.setdefault("min_psnr", 33.0)
+    puzzles.setdefault("output", "build/puzzles")
+    return puzzles
+
+
+def parse_grid(spec: str | int) -> tuple[int, int]:
+    """"4x5" -> (4, 5) rows x cols; 3 -> (3, 3)."""
+    if isinstance(spec, int):
+        return spec, spec
+    rows, _, cols = str(spec).lower().partition("x")
+    return int(rows), int(cols or rows)
+
+
+def collect_puzzles(cfg: dict, assets_dir: Path, only: str | None) -> list[dict]:
+    """Jigsaw images from the catalog and sliding images from their dirs, with grids."""
+    puzzles = []
+    if only in (None, "jigsaw"):
+        catalog = json.loads((assets_dir / cfg["catalog"]).read_text(encoding="utf-8"))
+        extra = {parse_grid(g) for g in cfg["jigsaw_grids"]}
+        by_image: dict[str, dict] = {}
+        for pack in catalog.get("packs", []):
+            for item in pack.get("puzzles", []):
+                image = item["image"].removeprefix("assets/")
+                entry = by_image.setdefault(image, {"kind": "jigsaw", "id": item["id"],
+                                                    "path": assets_dir / image, "grids": set(extra)})
+                entry["grids"].add((int(item.get("rows", 3)), int(item.get("cols", 3))))
+        puzzles += by_image.values()
+    if only in (None, "sliding"):
+        grids = {parse_grid(g) for g in cfg["sliding_grids"]}
+        for rel in cfg["sliding_paths"]:
+            for p in sorted((assets_dir / rel).rglob("*")):
+                if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS:
+                    puzzles.append({"kind": "sliding", "id": p.stem, "path": p, "grids": set(grids)})
+    for puzzle in puzzles:
+        puzzle["grids"] = sorted(puzzle["grids"])
+    return puzzles
+
+
+def cover_crop(w: int, h: int) -> tuple[int, int, int, int]:
+    """Centred square, as BoxFit.cover shows the image in a square board."""
+    side = min(w, h)
+    return (w - side) // 2, (h - side) // 2, side, side
+
+
+def tab_signs(puzzle_id: str, rows: int, cols: int) -> tuple[np.ndarray, np.ndarray]:
+    """Tab direction of every inner edge: +1 into the right/lower piece, -1 the other way.
+
+    Returns (vertical edges, rows x cols-1), (horizontal edges, rows-1 x cols).
+    """
+    seed = int.from_bytes(hashlib.sha256(f"{puzzle_id}:{rows}x{cols}".encode()).digest()[:8], "big")
+    rng = np.random.default_rng(seed)
+    return (rng.choice([-1, 1], size=(rows, cols - 1)),
+            rng.choice([-1, 1], size=(rows - 1, cols)))
+
+
+def knob_alpha(extent: int, along: int, radius: float) -> np.ndarray:
+    """Coverage (0-255) of a knob entering a piece, `extent` px deep x `along` px wide.
+
+    The knob's edge sits on row 0 and it points towards higher rows;
+    columns are centred on the middle of the edge.
+    """
+    ss = SUPERSAMPLE
+    depth = (np.arange(extent * ss) + 0.5) / ss
+    across = (np.arange(along * ss) + 0.5) / ss - along / 2
+    d, a = np.meshgrid(depth, across, indexing="ij")
+    inside = ((d - KNOB_CENTER * radius) ** 2 + a ** 2 <= radius ** 2) | (
+        (d <= KNOB_CENTER * radius) & (np.abs(a) <= KNOB_NECK * radius))
+    cover = inside.reshape(extent, ss, along, ss).mean(axis=(1, 3))
+    return np.rint(cover * 255).astype(np.uint8)
+
+
+def piece_masks(rows: int, cols: int, xs: list[int], ys: list[int], signs, radius: float):
+    """Alpha mask and box of every piece, in crop coordinates.
+
+    Returns {(row, col): (box, alpha, edges)} with box = (x, y, w, h).
+    """
+    vertical, horizontal = signs
+    reach = math.ceil((KNOB_CENTER + 1) * radius)
+    along = 2 * math.ceil(radius) + 2
+    knob = knob_alpha(reach, along, radius)
+    pieces = {}
+    for r in range(rows):
+        for c in range(cols):
+            edges = [0, 0, 0, 0]  # top, right, bottom, left
+            if r > 0:
+                edges[0] = -int(horizontal[r - 1, c])
+            if c < cols - 1:
+                edges[1] = int(vertical[r, c])
+            if r < rows - 1:
+                edges[2] = int(horizontal[r, c])
+            if c > 0:
+                edges[3] = -int(vertical[r, c - 1])
+            pad = [reach if e == 1 else 0 for e in edges]
+            x0, y0 = xs[c] - pad[3], ys[r] - pad[0]
+            x1, y1 = xs[c + 1] + pad[1], ys[r + 1] + pad[2]
+            alpha = np.zeros((y1 - y0, x1 - x0), dtype=np.int16)
+            cx0, cy0 = xs[c] - x0, ys[r] - y0
+            cw, ch = xs[c + 1] - xs[c], ys[r + 1] - ys[r]
+            alpha[cy0:cy0 + ch, cx0:cx0 + cw] = 255
+
+            # Each knob as (rotated knob, top-left in the box, +1 tab / -1 blank)
+            for side, e in enumerate(edges):
+                if e == 0:
+                    continue
+                k = np.rot90(knob, {0: 2, 1: 1, 2: 0, 3: 3}[side] if e == 1
+                             else {0: 0, 1: 3, 2: 2, 3: 1}[side])
+                kh, kw = k.shape
+                mid_x = cx0 + cw // 2 - kw // 2
+                mid_y = cy0 + ch // 2 - kh // 2
+                tab_origin = {0: (cy0 - kh, mid_x), 1: (mid_y, cx0 + cw),
+                              2: (cy0 + ch, mid_x), 3: (mid_y, cx0 - kw)}
+                blank_origin = {0: (cy0, mid_x), 1: (mid_y, cx0 + cw - kw),
+                                2: (cy0 + ch - kh, mid_x), 3: (mid_y, cx0)}
+                oy, ox = (tab_origin if e == 1 else blank_origin)[side]
+                region = alpha[oy:oy + kh, ox:ox + kw]
+                if e == 1:
+                    region += k
+                else:
+                    region -= k
+            pieces[(r, c)] = ((x0, y0, x1 - x0, y1 - y0), alpha.astype(np.uint8), edges)
+    return pieces
+
+
+def slice_grid(puzzle: dict, rows: int, cols: int, assets_dir: Path, out_root: Path,
+               cfg: dict) -> dict:
+    """Cut one image at one grid size, write its atlas and verify it."""
+    rel = puzzle["path"].relative_to(assets_dir)
+    result: dict = {"path": rel.as_posix(), "grid": f"{rows}x{cols}"}
+    try:
+        pixels = np.asarray(load_pixels(puzzle["path"], "RGB"))
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    x, y, w, h = cover_crop(pixels.shape[1], pixels.shape[0])
+    crop = pixels[y:y + h, x:x + w]
+    xs = [round(i * w / cols) for i in range(cols + 1)]
+    ys = [round(i * h / rows) for i in range(rows + 1)]
+    result["crop"] = [x, y, w, h]
+
+    jigsaw = puzzle["kind"] == "jigsaw"
+    if jigsaw:
+        radius = cfg["tab_radius"] * min(w / cols, h / rows)
+        pieces = piece_masks(rows, cols, xs, ys, tab_signs(puzzle["id"], rows, cols), radius)
+    else:
+        pieces = {(r, c): ((xs[c], ys[r], xs[c + 1] - xs[c], ys[r + 1] - ys[r]), None, [0, 0, 0, 0])
+                  for r in range(rows) for c in range(cols)}
+
+    def align(n: int) -> int:
+        return -(-n // SLOT_ALIGN) * SLOT_ALIGN
+
+    slot_w = align(max(b[2] for b, _, _ in pieces.values()))
+    slot_h = align(max(b[3] for b, _, _ in pieces.values()))
+    channels = 4 if jigsaw else 3
+    atlas = np.zeros((rows * slot_h, cols * slot_w, channels), dtype=np.uint8)
+    entries = []
+    for (r, c), ((bx, by, bw, bh), alpha, edges) in sorted(pieces.items()):
+        ax, ay = c * slot_w, r * slot_h
+        # Fill the rest of the slot by repeating the piece's edges: a hard edge
+        # there would cost bits and blur into the piece under lossy coding
+        atlas[ay:ay + slot_h, ax:ax + slot_w, :3] = np.pad(
+            crop[by:by + bh, bx:bx + bw], ((0, slot_h - bh), (0, slot_w - bw), (0, 0)), mode="edge")
+        if jigsaw:
+            atlas[ay:ay + bh, ax:ax + bw, 3] = alpha
+        entries.append({"id": f"r{r}_c{c}", "row": r, "col": c,
+                        "cell": [xs[c], ys[r], xs[c + 1] - xs[c], ys[r + 1] - ys[r]],
+                        "box": [bx, by, bw, bh], "atlas": [ax, ay], "edges": edges})
+
+    buf = io.BytesIO()
+    Image.fromarray(atlas, "RGBA" if jigsaw else "RGB").save(
+        buf, "WEBP", quality=cfg["quality"], method=cfg["method"], alpha_quality=100)
+    atlas_name = f"{rel.stem}_{rows}x{cols}.webp"
+    out_dir = out_root / rel.parent
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / atlas_name).write_bytes(buf.getvalue())
+
+    # Recompose the crop from the decoded atlas
+    decoded = np.asarray(Image.open(io.BytesIO(buf.getvalue())).convert("RGBA" if jigsaw else "RGB"))
+    rebuilt = np.zeros(crop.shape, dtype=np.float64)
+    coverage = np.zeros(crop.shape[:2], dtype=np.int32)
+    for entry in entries:
+        bx, by, bw, bh = entry["box"]
+        ax, ay = entry["atlas"]
+        patch = decoded[ay:ay + bh, ax:ax + bw]
+        a = patch[..., 3].astype(np.int32) if jigsaw else np.full((bh, bw), 255, np.int32)
+        rebuilt[by:by + bh, bx:bx + bw] += patch[..., :3] * (a[..., None] / 255)
+        coverage[by:by + bh, bx:bx + bw] += a
+    mse = np.mean((rebuilt - crop) ** 2)
+    quality = math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+    result.update({
+        "grid_entry": {"rows": rows, "cols": cols, "atlas": atlas_name,
+                       "atlas_size": [atlas.shape[1], atlas.shape[0]], "pieces": entries},
+        "pieces": len(entries),
+        "atlas_bytes": len(buf.getvalue()),
+        "psnr": round(quality, 2) if math.isfinite(quality) else None,
+    })
+    if not (coverage == 255).all():
+        result["error"] = f"piece alphas do not tile the image ({int((coverage != 255).sum())} px off)"
+    elif quality < cfg["min_psnr"]:
+        result["error"] = f"recomposed PSNR {quality:.1f} dB below {cfg['min_psnr']} dB"
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-cut puzzle pieces into atlases")
+    parser.add_argument("--only", choices=["jigsaw", "sliding"], help="Slice only one kind")
+    parser.add_argument("--out", type=Path, help="Output directory (default: puzzles.output)")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    assets_dir = ASSETS_DIR.resolve()
+    try:
+        cfg = load_puzzles_config(args.config)
+        puzzles = collect_puzzles(cfg, assets_dir, args.only)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    out_root = (args.out or REPO_DIR / cfg["output"]).resolve()
+
+    work = [(p, rows, cols, assets_dir, out_root, cfg) for p in puzzles for rows, cols in p["grids"]]
+    print(f"Slicing {len(puzzles)} puzzle image(s) into {len(work)} atlas(es)\n")
+    start = time.perf_counter()
+    results = []
+
+    def report(r: dict) -> None:
+        results.append(r)
+        prefix = f"  [{len(results)}/{len(work)}] {r['path']} {r['grid']}"
+        if "pieces" not in r:
+            print(f"{prefix}  ERROR: {r['error']}")
+            return
+        quality = "exact" if r["psnr"] is None else f"{r['psnr']:.1f} dB"
+        print(f"{prefix}  {r['pieces']} pieces, {r['atlas_bytes'] / 1024:.0f} KB ({quality})"
+              + (f"  ERROR: {r['error']}" if "error" in r else ""))
+
+    if args.jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for future in as_completed([pool.submit(slice_grid, *w) for w in work]):
+                report(future.result())
+    else:
+        for w in work:
+            report(slice_grid(*w))
+    elapsed = time.perf_counter() - start
+
+    # One piece map per image, grids in order
+    for puzzle in puzzles:
+        rel = puzzle["path"].relative_to(assets_dir)
+        done = sorted((r for r in results if r["path"] == rel.as_posix() and "grid_entry" in r),
+                      key=lambda r: (r["grid_entry"]["rows"], r["grid_entry"]["cols"]))
+        if not done:
+            continue
+        piece_map = {"source": rel.as_posix(), "kind": puzzle["kind"], "crop": done[0]["crop"],
+                     "grids": [r["grid_entry"] for r in done]}
+        (out_root / rel.parent / f"{rel.stem}.json").write_text(
+            json.dumps(piece_map, indent=1) + "\n", encoding="utf-8")
+    for r in results:
+        r.pop("grid_entry", None)
+
+    results.sort(key=lambda r: (r["path"], r["grid"]))
+    failed = [r for r in results if "error" in r]
+    sliced = [r for r in results if "pieces" in r]
+    report_data = {"tool": "slice_puzzles", "images": len(puzzles), "atlases": len(results),
+                   "errors": len(failed), "seconds": round(elapsed, 2),
+                   "settings": {k: cfg[k] for k in ("tab_radius", "quality", "min_psnr")},
+                   "results": results}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report_data, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("PUZZLE SLICING SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Images:           {len(puzzles)}")
+    print(f"Atlases:          {len(sliced)}")
+    print(f"Pieces:           {sum(r['pieces'] for r in sliced)}")
+    print(f"Errors:           {len(failed)}")
+    print(f"Atlas total:      {sum(r['atlas_bytes'] for r in sliced) / 1024:.0f} KB")
+    if sliced:
+        worst = min(sliced, key=lambda r: r["psnr"] if r["psnr"] is not None else math.inf)
+        if worst["psnr"] is not None:
+            print(f"Lowest PSNR:      {worst['path']} {worst['grid']} ({worst['psnr']:.1f} dB)")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"Output:           {out_root}")
+    print(f"Report:           {args.report}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
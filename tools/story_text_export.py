@@ -7,6 +7,9 @@ Usage:
 
 Output:
     tools/story_audio_config.json
+
+Re-exporting keeps the voice_id, model_id and output_format already in the
+config, so a voice set once survives story edits.
 """
 
 import json
@@ -17,6 +20,13 @@ from pathlib import Path
 STORY_DATA = Path(__file__).parent.parent / "lib/features/stories/data/story_data.dart"
 OUTPUT = Path(__file__).parent / "story_audio_config.json"
 
+# Settings written on first export; later exports keep whatever is in the file.
+DEFAULT_SETTINGS = {
+    "voice_id": "REPLACE_WITH_YOUR_ELEVENLABS_VOICE_ID",
+    "model_id": "eleven_multilingual_v2",
+    "output_format": "mp3_44100_64",
+}
+
 
 def extract_stories(dart_source: str) -> dict[str, list[dict]]:
     """Parse story_data.dart and extract country ID + page texts."""
@@ -74,6 +84,22 @@ def extract_stories(dart_source: str) -> dict[str, list[dict]]:
     return stories
 
 
+def build_config(stories: dict[str, list[dict]], previous: dict | None = None) -> dict:
+    """Audio config for `stories`, keeping the settings of a previous export."""
+    previous = previous or {}
+    config = {key: previous.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+    config["stories"] = stories
+    return config
+
+
+def read_previous(path: Path = OUTPUT) -> dict | None:
+    """The config from the last export, or None if missing or unreadable."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
 def main():
     if not STORY_DATA.exists():
         print(f"Error: {STORY_DATA} not found", file=sys.stderr)
@@ -85,20 +111,18 @@ def main():
     if not stories:
         print("Warning: No stories extracted!", file=sys.stderr)
 
-    config = {
-        "voice_id": "REPLACE_WITH_YOUR_ELEVENLABS_VOICE_ID",
-        "model_id": "eleven_multilingual_v2",
-        "output_format": "mp3_44100_64",
-        "stories": stories,
-    }
+    config = build_config(stories, read_previous())
 
     OUTPUT.write_text(json.dumps(config, indent=2, ensure_ascii=False), encoding="utf-8")
     print(f"Exported {sum(len(p) for p in stories.values())} pages from {len(stories)} stories")
     print(f"Config written to: {OUTPUT}")
     print()
     print("Next steps:")
-    print("  1. Replace 'voice_id' with your ElevenLabs voice ID")
-    print("  2. Run: python tools/generate_story_audio.py")
+    if config["voice_id"] == DEFAULT_SETTINGS["voice_id"]:
+        print("  1. Replace 'voice_id' with your ElevenLabs voice ID")
+        print("  2. Run: python tools/generate_story_audio.py")
+    else:
+        print("  Run: python tools/generate_story_audio.py")
 
 
 if __name__ == "__main__":
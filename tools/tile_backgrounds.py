@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Background Tile Pyramid Slicer
+
+Home and world backgrounds are decoded as one image even when the world
+explorer only shows a panned or zoomed part of them. This tool slices each
+large background into a tile pyramid so the app can decode just the tiles
+under the viewport, at the level matching the zoom:
+
+    level 0     full resolution, cut into `tile` x `tile` tiles
+    level 1     half size (LANCZOS from the source), tiled the same way
+    ...         halving until the whole level fits in one tile
+
+Tiles on the right and bottom edges are cropped to the image, not padded.
+Lossy WebP sources get lossy tiles at `quality`; lossless WebP and
+non-WebP sources (such as a PNG saved as .webp) get lossless tiles.
+Tiles are encoded in parallel. Each slice is reassembled from its written
+level-0 tiles and compared with the source (PSNR; lossless must be exact).
+
+Output goes to <output>/<asset dir>/<stem>/: <level>/<col>_<row>.webp plus
+manifest.json:
+
+    {"source": asset path, "size": [w, h], "tile": 512, "format": "webp",
+     "lossless": bool, "levels": [{"level": 0, "scale": 1.0, "size": [w, h],
+                                   "columns": c, "rows": r}, ...]}
+
+Images that already fit in one tile are skipped. Settings come from the
+`tiles:` section of asset_config.yaml.
+
+Usage:
+    python3 tools/tile_backgrounds.py                                   # All backgrounds
+    python3 tools/tile_backgrounds.py assets/backgrounds/world/continents.webp
+    python3 tools/tile_backgrounds.py --tile 256 --jobs 4
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from optimize_assets import IMAGE_EXTENSIONS, webp_encoding
+from pixel_cache import load_image
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "tiles_report.json"
+
+
+def load_tiles_config(config_path: Path) -> dict:
+    """Load the tiles section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    tiles = cfg.get("tiles") or {}
+    tiles.setdefault("paths", ["backgrounds"])
+    tiles.setdefault("tile", 512)
+    tiles.setdefault("quality", 85)
+    tiles.setdefault("method", 4)
+    tiles.setdefault("min_psnr", 38.0)
+    tiles.setdefault("output", "build/tiles")
+    return tiles
+
+
+def collect_images(paths: list[Path]) -> list[Path]:
+    images = set()
+    for path in paths:
+        candidates = [path] if path.is_file() else path.rglob("*")
+        for p in candidates:
+            if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS:
+                images.add(p.resolve())
+    return sorted(images)
+
+
+def pyramid_levels(w: int, h: int, tile: int) -> list[dict]:
+    """Level 0 at full size, halving until one tile holds the whole level."""
+    levels = []
+    scale = 1.0
+    while True:
+        lw, lh = max(1, math.ceil(w * scale)), max(1, math.ceil(h * scale))
+        levels.append({"level": len(levels), "scale": scale, "size": [lw, lh],
+                       "columns": math.ceil(lw / tile), "rows": math.ceil(lh / tile)})
+        if lw <= tile and lh <= tile:
+            return levels
+        scale /= 2
+
+
+def is_lossless(path: Path) -> bool:
+    return path.suffix.lower() != ".webp" or webp_encoding(path) != "lossy"
+
+
+def encode_tile(pixels: np.ndarray, out_path: Path, lossless: bool, quality: int,
+                method: int) -> int:
+    """Encode one tile as WebP; returns its size in bytes."""
+    img = Image.fromarray(pixels)
+    if lossless:
+        img.save(out_path, "WEBP", lossless=True, quality=100, method=method, exact=True)
+    else:
+        img.save(out_path, "WEBP", quality=quality, method=method)
+    return out_path.stat().st_size
+
+
+def _encode_worker(args: tuple) -> int:
+    return encode_tile(*args)
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    """PSNR of what is visible: RGBA is compared premultiplied, so colour
+    under transparent pixels (which lossy WebP discards) doesn't count."""
+    a, b = a.astype(np.float64), b.astype(np.float64)
+    if a.shape[-1] == 4:
+        a[..., :3] *= a[..., 3:] / 255
+        b[..., :3] *= b[..., 3:] / 255
+    mse = np.mean((a - b) ** 2)
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def slice_image(source: Path, assets_dir: Path, out_root: Path, cfg: dict,
+                pool: ProcessPoolExecutor | None) -> dict:
+    """Cut one image into its tile pyramid, write the manifest and check level 0."""
+    rel = source.relative_to(assets_dir)
+    result: dict = {"path": rel.as_posix()}
+    tile = cfg["tile"]
+    try:
+        img = load_image(source)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    mode = "RGBA" if "A" in img.getbands() else "RGB"
+    img = img.convert(mode)
+    w, h = img.size
+    result["size"] = [w, h]
+    if w <= tile and h <= tile:
+        result["skipped"] = f"fits in one {tile}px tile"
+        return result
+
+    lossless = is_lossless(source)
+    out_dir = out_root / rel.parent / rel.stem
+    levels = pyramid_levels(w, h, tile)
+    work = []
+    for level in levels:
+        lw, lh = level["size"]
+        scaled = img if level["level"] == 0 else img.resize((lw, lh), Image.LANCZOS)
+        pixels = np.asarray(scaled)
+        (out_dir / str(level["level"])).mkdir(parents=True, exist_ok=True)
+        for row in range(level["rows"]):
+            for col in range(level["columns"]):
+                crop = np.ascontiguousarray(pixels[row * tile:(row + 1) * tile,
+                                                   col * tile:(col + 1) * tile])
+                work.append((crop, out_dir / str(level["level"]) / f"{col}_{row}.webp",
+                             lossless, cfg["quality"], cfg["method"]))
+    sizes = list(pool.map(_encode_worker, work, chunksize=2)) if pool else [
+        _encode_worker(w_) for w_ in work]
+
+    manifest = {"source": rel.as_posix(), "size": [w, h], "tile": tile, "format": "webp",
+                "lossless": lossless, "levels": levels}
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+    # Reassemble level 0 from the files actually written
+    full = np.asarray(img)
+    rebuilt = np.zeros_like(full)
+    for row in range(levels[0]["rows"]):
+        for col in range(levels[0]["columns"]):
+            with Image.open(out_dir / "0" / f"{col}_{row}.webp") as t:
+                rebuilt[row * tile:(row + 1) * tile, col * tile:(col + 1) * tile] = \
+                    np.asarray(t.convert(mode))
+    quality = psnr(full, rebuilt)
+    result.update({
+        "manifest": (out_dir / "manifest.json").relative_to(out_root).as_posix(),
+        "lossless": lossless,
+        "levels": len(levels),
+        "tiles": len(work),
+        "source_bytes": source.stat().st_size,
+        "tile_bytes": sum(sizes),
+        "level0_bytes": sum(sizes[:levels[0]["columns"] * levels[0]["rows"]]),
+        "psnr": round(quality, 2) if math.isfinite(quality) else None,
+    })
+    if lossless and math.isfinite(quality):
+        result["error"] = "lossless tiles do not reassemble exactly"
+    elif quality < cfg["min_psnr"]:
+        result["error"] = f"level 0 PSNR {quality:.1f} dB below {cfg['min_psnr']} dB"
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slice large backgrounds into tile pyramids")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Images or directories (default: tiles.paths)")
+    parser.add_argument("--tile", type=int, help="Tile size in pixels (default: config)")
+    parser.add_argument("--out", type=Path, help="Output directory (default: tiles.output)")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for tile encoding (default: CPU count)")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    try:
+        cfg = load_tiles_config(args.config)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.tile is not None:
+        cfg["tile"] = args.tile
+    if cfg["tile"] < 16:
+        print("Error: --tile must be at least 16")
+        sys.exit(1)
+
+    assets_dir = ASSETS_DIR.resolve()
+    out_root = (args.out or REPO_DIR / cfg["output"]).resolve()
+    images = collect_images([p.resolve() for p in args.paths]
+                            or [assets_dir / p for p in cfg["paths"]])
+    outside = [p for p in images if assets_dir not in p.parents]
+    if outside:
+        print(f"Error: {outside[0]} is not under {assets_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = []
+    pool = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        for i, image in enumerate(images, 1):
+            r = slice_image(image, assets_dir, out_root, cfg, pool)
+            results.append(r)
+            prefix = f"  [{i}/{len(images)}] {r['path']}"
+            if "skipped" in r:
+                print(f"{prefix}  skipped: {r['skipped']}")
+            elif "tiles" not in r:
+                print(f"{prefix}  ERROR: {r['error']}")
+            else:
+                quality = "exact" if r["psnr"] is None else f"{r['psnr']:.1f} dB"
+                print(f"{prefix}  {r['size'][0]}x{r['size'][1]}: {r['levels']} levels, "
+                      f"{r['tiles']} tiles, {r['source_bytes'] / 1024:.0f} KB -> "
+                      f"{r['tile_bytes'] / 1024:.0f} KB ({quality})"
+                      + (f"  ERROR: {r['error']}" if "error" in r else ""))
+    finally:
+        if pool:
+            pool.shutdown()
+    elapsed = time.perf_counter() - start
+
+    sliced = [r for r in results if "tiles" in r]
+    failed = [r for r in results if "error" in r]
+    report = {"tool": "tile_backgrounds", "images": len(results), "sliced": len(sliced),
+              "errors": len(failed), "seconds": round(elapsed, 2),
+              "settings": {k: cfg[k] for k in ("tile", "quality", "method", "min_psnr")},
+              "results": results}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("TILING SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Images:           {len(results)}")
+    print(f"Sliced:           {len(sliced)}")
+    print(f"Skipped:          {sum(1 for r in results if 'skipped' in r)}")
+    print(f"Errors:           {len(failed)}")
+    if sliced:
+        print(f"Tiles:            {sum(r['tiles'] for r in sliced)} at {cfg['tile']}px")
+        print(f"Source total:     {sum(r['source_bytes'] for r in sliced) / 1024:.0f} KB")
+        print(f"Level 0 total:    {sum(r['level0_bytes'] for r in sliced) / 1024:.0f} KB")
+        print(f"All levels:       {sum(r['tile_bytes'] for r in sliced) / 1024:.0f} KB")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"Output:           {out_root}")
+    print(f"Report:           {args.report}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
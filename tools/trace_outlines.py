@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Coloring Outline Tracer
+
+Converts black/white coloring outlines into SVG path data, so pages that
+only exist as large PNGs can be drawn by a path-based outline renderer
+(path_drawing's parseSvgPathData) and stay crisp at any zoom. NumPy only,
+no potrace or OpenCV.
+
+Each outline is traced as filled shapes, not centrelines, so line weight
+and tapering survive. Per outline:
+
+    1. threshold and follow the pixel-edge boundary of every ink area into
+       closed contours (holes wind the other way; the path is even-odd)
+    2. drop contours enclosing less than `min_area` pixels (specks/holes)
+    3. take the midpoints of the boundary edges (a one-pixel staircase
+       becomes a straight line) and find corners: Douglas-Peucker vertices
+       at `tolerance` that turn by more than `corner_angle` degrees
+    4. between corners, fit least-squares cubic beziers (split until each
+       is within `tolerance` pixels) or straight lines
+
+`tolerance` sets the fidelity: lower keeps more detail and more bytes.
+Every result is rasterised (independently of any SVG library) and compared
+with the thresholded PNG; see scene_svg.raster_diff for the diff, gross and
+IoU scores. Pages whose gross difference exceeds `max_gross` are flagged.
+Settings come from the `tracing:` section of asset_config.yaml.
+
+Usage:
+    python3 tools/trace_outlines.py                               # All outlines
+    python3 tools/trace_outlines.py assets/coloring/uk            # Dirs or files
+    python3 tools/trace_outlines.py --tolerance 0.5               # Higher fidelity
+    python3 tools/trace_outlines.py --out build/traced --jobs 4
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from pixel_cache import load_pixels
+from scene_svg import raster_diff
+from validate_outlines import collect_outlines
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "trace_report.json"
+
+# Boundary directions, y pointing down: east, south, west, north.
+STEPS = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)])
+
+# Points per bezier when rasterising for the diff.
+FLATTEN = 8
+
+
+def load_tracing_config(config_path: Path) -> dict:
+    """Load the tracing section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    tracing = cfg.get("tracing") or {}
+    tracing.setdefault("threshold", 160)
+    tracing.setdefault("min_area", 16)
+    tracing.setdefault("tolerance", 0.75)
+    tracing.setdefault("corner_angle", 45)
+    tracing.setdefault("precision", 1)
+    tracing.setdefault("max_gross", 0.002)
+    tracing.setdefault("output", "build/traced")
+    return tracing
+
+
+# -----------------------------
+# Boundary tracing
+# -----------------------------
+
+def trace_boundaries(ink: np.ndarray) -> list[np.ndarray]:
+    """Closed pixel-edge contours around the ink, as (n, 2) corner arrays.
+
+    Contours keep ink on their right, so outer boundaries and holes wind in
+    opposite directions. Where two ink pixels touch only diagonally the
+    contour passes between them, joining them (8-connectivity).
+    """
+    h, w = ink.shape
+    padded = np.zeros((h + 2, w + 2), dtype=bool)
+    padded[1:-1, 1:-1] = ink
+
+    # Horizontal edges on corner row y: east if the ink is below, else west.
+    above, below = padded[:-1, 1:-1], padded[1:, 1:-1]
+    ys, xs = np.nonzero(above != below)
+    east = below[ys, xs]
+    h_start = np.stack([np.where(east, xs, xs + 1), ys], axis=1)
+    h_dir = np.where(east, 0, 2)
+
+    # Vertical edges on corner column x: south if the ink is left, else north.
+    left, right = padded[1:-1, :-1], padded[1:-1, 1:]
+    ys, xs = np.nonzero(left != right)
+    south = left[ys, xs]
+    v_start = np.stack([xs, np.where(south, ys, ys + 1)], axis=1)
+    v_dir = np.where(south, 1, 3)
+
+    start = np.concatenate([h_start, v_start])
+    direction = np.concatenate([h_dir, v_dir])
+    n = len(start)
+    if n == 0:
+        return []
+    end = start + STEPS[direction]
+
+    # Link each edge to the one leaving its end corner, preferring a left
+    # turn (only ambiguous at diagonal ink), then straight, then right.
+    stride = w + 1
+    keys = (start[:, 1] * stride + start[:, 0]) * 4 + direction
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    corner = (end[:, 1] * stride + end[:, 0]) * 4
+    succ = np.full(n, -1)
+    for turn in (3, 0, 1):
+        want = corner + (direction + turn) % 4
+        pos = np.minimum(np.searchsorted(sorted_keys, want), n - 1)
+        found = (succ < 0) & (sorted_keys[pos] == want)
+        succ[found] = order[pos[found]]
+
+    # Cycle id = smallest edge index in the cycle, by pointer jumping.
+    cycle = np.arange(n)
+    jump = succ.copy()
+    while True:
+        lowered = np.minimum(cycle, cycle[jump])
+        if np.array_equal(lowered, cycle):
+            break
+        cycle, jump = lowered, jump[jump]
+
+    # Position in the cycle: distance to the edge before its first edge.
+    nxt = np.where(cycle[succ] == succ, -1, succ)
+    dist = (nxt >= 0).astype(np.int64)
+    while (nxt >= 0).any():
+        live = nxt >= 0
+        hop = np.where(live, nxt, 0)
+        dist = dist + np.where(live, dist[hop], 0)
+        nxt = np.where(live, nxt[hop], -1)
+    ordered = np.lexsort((-dist, cycle))
+
+    bounds = np.flatnonzero(np.diff(cycle[ordered])) + 1
+    return np.split(start[ordered], bounds)
+
+
+def signed_area(corners: np.ndarray) -> float:
+    """Shoelace area of a closed polygon (positive for ink on the right)."""
+    x, y = corners[:, 0].astype(np.float64), corners[:, 1].astype(np.float64)
+    return float((x * np.roll(y, -1) - np.roll(x, -1) * y).sum()) / 2
+
+
+# -----------------------------
+# Simplification and fitting
+# -----------------------------
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker on a closed polyline; returns the kept indices."""
+    n = len(points)
+    if n <= 4 or tolerance <= 0:
+        return np.arange(n)
+    far = int(np.argmax(((points - points[0]) ** 2).sum(axis=1)))
+    loop = np.concatenate([points, points[:1]])
+    keep = np.zeros(n + 1, dtype=bool)
+    keep[[0, far, n]] = True
+    stack = [(0, far), (far, n)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        pa, pb = loop[a], loop[b]
+        seg = pb - pa
+        rel = loop[a + 1:b] - pa
+        length = math.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(rel[:, 0] * seg[1] - rel[:, 1] * seg[0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack += [(a, mid), (mid, b)]
+    return np.flatnonzero(keep[:n])
+
+
+def _unit(v: np.ndarray) -> np.ndarray:
+    length = math.hypot(*v)
+    return v / length if length else v
+
+
+def _bezier(ctrl: np.ndarray, u: np.ndarray) -> np.ndarray:
+    v = 1 - u
+    return np.stack([v ** 3, 3 * v * v * u, 3 * v * u * u, u ** 3], axis=1) @ ctrl
+
+
+def _fit_cubic(pts: np.ndarray, t1: np.ndarray, t2: np.ndarray, tolerance: float) -> list:
+    """Least-squares cubics through `pts` (Schneider, Graphics Gems I).
+
+    t1 and t2 are unit tangents leaving the first point and entering back
+    from the last. The run is split at its worst point until every piece
+    is within `tolerance`. Returns control arrays of shape (4, 2).
+    """
+    p0, p3 = pts[0], pts[-1]
+    chord = np.hypot(*(p3 - p0))
+    if len(pts) == 2:
+        return [np.array([p0, p0 + t1 * chord / 3, p3 + t2 * chord / 3, p3])]
+
+    steps = np.hypot(*np.diff(pts, axis=0).T)
+    u = np.concatenate([[0], np.cumsum(steps)]) / max(steps.sum(), 1e-9)
+    for _ in range(4):
+        v = 1 - u
+        b0, b1, b2, b3 = v ** 3, 3 * v * v * u, 3 * v * u * u, u ** 3
+        # Normal equations for alpha1, alpha2 (t1, t2 are unit vectors).
+        rest = pts - np.outer(b0 + b1, p0) - np.outer(b2 + b3, p3)
+        c11, c22, c12 = b1 @ b1, b2 @ b2, (b1 @ b2) * (t1 @ t2)
+        x1, x2 = b1 @ (rest @ t1), b2 @ (rest @ t2)
+        det = c11 * c22 - c12 * c12
+        alpha1 = (x1 * c22 - c12 * x2) / det if det else 0
+        alpha2 = (c11 * x2 - c12 * x1) / det if det else 0
+        if alpha1 < chord * 1e-3 or alpha2 < chord * 1e-3:
+            alpha1 = alpha2 = chord / 3
+        ctrl = np.array([p0, p0 + t1 * alpha1, p3 + t2 * alpha2, p3])
+        q = _bezier(ctrl, u) - pts
+        error = (q * q).sum(axis=1)
+        worst = int(np.argmax(error))
+        if error[worst] <= tolerance ** 2:
+            return [ctrl]
+        if error[worst] > 4 * tolerance ** 2:
+            break
+        # Close enough to improve: one Newton step per point towards its
+        # nearest parameter on the curve, then refit.
+        d1 = 3 * np.diff(ctrl, axis=0)
+        d2 = 2 * np.diff(d1, axis=0)
+        q1 = np.outer(v * v, d1[0]) + np.outer(2 * v * u, d1[1]) + np.outer(u * u, d1[2])
+        q2 = np.outer(v, d2[0]) + np.outer(u, d2[1])
+        denom = (q1 * q1).sum(axis=1) + (q * q2).sum(axis=1)
+        step = (q * q1).sum(axis=1) / np.where(denom == 0, 1, denom)
+        u = np.maximum.accumulate(np.clip(u - step, 0, 1))
+
+    worst = min(max(worst, 1), len(pts) - 2)
+    centre = _unit(pts[worst - 1] - pts[worst + 1])
+    return (_fit_cubic(pts[:worst + 1], t1, centre, tolerance)
+            + _fit_cubic(pts[worst:], -centre, t2, tolerance))
+
+
+def fit_contour(points: np.ndarray, tolerance: float, corner_angle: float) -> np.ndarray:
+    """Closed chain of cubics within `tolerance` of `points`, shape (n, 3, 2).
+
+    Segment i runs from the previous segment's end through controls [i, 0]
+    and [i, 1] to [i, 2]; straight runs have their controls on the end
+    points. Corners are the Douglas-Peucker vertices turning by more than
+    `corner_angle` degrees; the curve is smooth everywhere else.
+    """
+    n = len(points)
+    vertices = simplify(points, tolerance)
+    if n < 8 or len(vertices) < 3:
+        ends = points[vertices]
+        starts = np.roll(ends, 1, axis=0)
+        return np.stack([starts, ends, ends], axis=1)
+
+    v = points[vertices]
+    d_in, d_out = v - np.roll(v, 1, axis=0), np.roll(v, -1, axis=0) - v
+    cos_turn = (d_in * d_out).sum(axis=1) / np.maximum(
+        np.hypot(*d_in.T) * np.hypot(*d_out.T), 1e-9)
+    corner = cos_turn < math.cos(math.radians(corner_angle))
+    corner_at = set(vertices[corner].tolist())
+    breaks = vertices[corner]
+    if len(breaks) < 2:
+        # Also break the loop on its far side, smoothly.
+        first = int(np.argmax(corner))
+        breaks = np.sort(vertices[[first, (first + len(vertices) // 2) % len(vertices)]])
+
+    def tangent(i: int, forward: bool, run: np.ndarray) -> np.ndarray:
+        if i % n not in corner_at:
+            t = _unit(loop[i % n + n + 1] - loop[i % n + n - 1])
+            return t if forward else -t
+        if forward:
+            return _unit(run[min(3, len(run) - 1)] - run[0])
+        return _unit(run[max(len(run) - 4, 0)] - run[-1])
+
+    loop = np.concatenate([points, points, points])
+    segments = []
+    for i, a in enumerate(breaks):
+        b = breaks[(i + 1) % len(breaks)] + (n if i == len(breaks) - 1 else 0)
+        run = loop[a:b + 1]
+        chord = run[-1] - run[0]
+        length = math.hypot(*chord)
+        offsets = np.abs((run[:, 0] - run[0, 0]) * chord[1] - (run[:, 1] - run[0, 1]) * chord[0])
+        if length == 0 or offsets.max() <= tolerance * length:
+            segments.append(np.array([run[0], run[0], run[-1], run[-1]]))
+            continue
+        t1, t2 = tangent(a, True, run), tangent(b, False, run)
+        segments += _fit_cubic(run, t1, t2, tolerance)
+    return np.array([s[1:] for s in segments])
+
+
+def trace(gray: np.ndarray, cfg: dict) -> list[np.ndarray]:
+    """Bezier contours for one outline, as fit_contour() arrays."""
+    ink = gray < cfg["threshold"]
+    contours = []
+    for corners in trace_boundaries(ink):
+        if abs(signed_area(corners)) < cfg["min_area"]:
+            continue
+        points = (corners + np.roll(corners, -1, axis=0)) / 2
+        contours.append(fit_contour(points, cfg["tolerance"], cfg["corner_angle"]))
+    return contours
+
+
+# -----------------------------
+# SVG output and rasterising
+# -----------------------------
+
+def quantize(contours: list[np.ndarray], precision: int) -> list[np.ndarray]:
+    """Round every coordinate to the grid the SVG is written on."""
+    scale = 10 ** precision
+    return [np.round(c * scale) / scale for c in contours]
+
+
+def _fmt(units: np.ndarray, precision: int) -> str:
+    scale = 10 ** precision
+    text = " ".join(f"{v / scale:.{precision}f}".rstrip("0").rstrip(".") for v in units.ravel())
+    return text.replace(" -", "-")
+
+
+def path_data(contours: list[np.ndarray], precision: int) -> str:
+    """Relative SVG path data for quantized contours.
+
+    Offsets are taken between integer grid units, so rounding never drifts.
+    """
+    scale = 10 ** precision
+    parts = []
+    for c in contours:
+        units = np.round(c * scale).astype(np.int64)
+        ends = units[:, 2]
+        starts = np.roll(ends, 1, axis=0)
+        rel = units - starts[:, None, :]
+        parts.append(f"M{_fmt(starts[0], precision)}")
+        straight = (rel[:, 0] == 0).all(axis=1) & (rel[:, 1] == rel[:, 2]).all(axis=1)
+        for i, seg in enumerate(rel):
+            if straight[i]:
+                parts.append(f"l{_fmt(seg[2], precision)}")
+            else:
+                parts.append(f"c{_fmt(seg, precision)}")
+        parts.append("z")
+    return "".join(parts)
+
+
+def to_svg(contours: list[np.ndarray], width: int, height: int, precision: int) -> str:
+    """Standalone SVG document with all contours in one even-odd path."""
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="{width}" height="{height}">'
+            f'<path fill-rule="evenodd" d="{path_data(contours, precision)}"/></svg>\n')
+
+
+def rasterize(contours: list[np.ndarray], width: int, height: int) -> np.ndarray:
+    """Even-odd fill of the contours, sampled at pixel centres."""
+    canvas = np.zeros((height, width), dtype=bool)
+    if not contours:
+        return canvas
+    segments = np.concatenate(contours)
+    p0 = np.roll(segments[:, 2], 1, axis=0)
+    counts = np.array([len(c) for c in contours])
+    firsts = np.cumsum(counts) - counts
+    p0[firsts] = segments[firsts + counts - 1, 2]
+
+    t = np.linspace(0, 1, FLATTEN, endpoint=False)[None, :, None]
+    c1, c2, p3 = segments[:, 0:1], segments[:, 1:2], segments[:, 2:3]
+    a = p0[:, None]
+    points = ((1 - t) ** 3 * a + 3 * (1 - t) ** 2 * t * c1
+              + 3 * (1 - t) * t ** 2 * c2 + t ** 3 * p3).reshape(-1, 2)
+    starts = np.repeat(firsts * FLATTEN, counts * FLATTEN)
+    ends = np.repeat((firsts + counts) * FLATTEN, counts * FLATTEN)
+    index = np.arange(len(points)) + 1
+    index = np.where(index == ends, starts, index)
+
+    x0, y0 = points[:, 0], points[:, 1]
+    x1, y1 = points[index, 0], points[index, 1]
+    r0 = np.clip(np.ceil(np.minimum(y0, y1) - 0.5), 0, height).astype(np.int64)
+    r1 = np.clip(np.ceil(np.maximum(y0, y1) - 0.5), 0, height).astype(np.int64)
+    rows_per = np.maximum(r1 - r0, 0)
+    edge = np.repeat(np.arange(len(points)), rows_per)
+    rows = np.repeat(r0, rows_per) + (np.arange(rows_per.sum())
+                                      - np.repeat(np.cumsum(rows_per) - rows_per, rows_per))
+    yc = rows + 0.5
+    xe = x0[edge] + (yc - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+    cols = np.clip(np.floor(xe - 0.5).astype(np.int64) + 1, 0, width)
+    toggles = np.bincount(rows * (width + 1) + cols, minlength=height * (width + 1))
+    canvas[:] = (np.cumsum(toggles.reshape(height, width + 1), axis=1) & 1)[:, :width] == 1
+    return canvas
+
+
+def trace_outline(outline: Path, assets_dir: Path, out_dir: Path, cfg: dict) -> dict:
+    """Trace one outline and write its SVG. Returns size and diff stats."""
+    rel_path = outline.relative_to(assets_dir).as_posix()
+    result: dict = {"path": rel_path}
+    try:
+        gray = np.asarray(load_pixels(outline, "L"))
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+    h, w = gray.shape
+
+    contours = quantize(trace(gray, cfg), cfg["precision"])
+    svg = to_svg(contours, w, h, cfg["precision"])
+    out_path = out_dir / Path(rel_path).with_suffix(".svg")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(svg, encoding="utf-8")
+
+    data = svg.encode("utf-8")
+    result.update({
+        "svg": out_path.relative_to(REPO_DIR).as_posix() if REPO_DIR in out_path.parents
+        else str(out_path),
+        "size": [w, h],
+        "contours": len(contours),
+        "segments": int(sum(len(c) for c in contours)),
+        "png_bytes": outline.stat().st_size,
+        "svg_bytes": len(data),
+        "svgz_bytes": len(gzip.compress(data, 9, mtime=0)),
+        **raster_diff(gray < cfg["threshold"], rasterize(contours, w, h)),
+    })
+    result["flagged"] = result["gross"] > cfg["max_gross"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace coloring outlines into SVG paths")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Outline files or directories (default: assets/coloring)")
+    parser.add_argument("--out", type=Path, help="Output directory (default: tracing.output)")
+    parser.add_argument("--tolerance", type=float,
+                        help="Max deviation in pixels before simplification (default: config)")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    try:
+        cfg = load_tracing_config(args.config)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.tolerance is not None:
+        cfg["tolerance"] = args.tolerance
+    out_dir = (args.out or REPO_DIR / cfg["output"]).resolve()
+
+    assets_dir = ASSETS_DIR.resolve()
+    outlines = collect_outlines([p.resolve() for p in args.paths] or [assets_dir / "coloring"])
+    outside = [p for p in outlines if assets_dir not in p.parents]
+    if outside:
+        print(f"Error: {outside[0]} is not under {assets_dir}")
+        sys.exit(1)
+
+    print(f"Tracing {len(outlines)} outline(s) at tolerance {cfg['tolerance']:g}px\n")
+    start = time.perf_counter()
+    results = []
+
+    def report(r: dict) -> None:
+        results.append(r)
+        prefix = f"  [{len(results)}/{len(outlines)}] {r['path']}"
+        if "error" in r:
+            print(f"{prefix}  ERROR: {r['error']}")
+            return
+        print(f"{prefix}  {r['png_bytes'] / 1024:.0f} KB -> {r['svg_bytes'] / 1024:.0f} KB "
+              f"({r['svgz_bytes'] / 1024:.0f} KB gz), {r['contours']} contours, "
+              f"diff {r['diff']:.1%}, IoU {r['iou']:.3f}"
+              + (f"  (check: {r['gross']:.2%} off by more than a pixel)" if r["flagged"] else ""))
+
+    work = [(p, assets_dir, out_dir, cfg) for p in outlines]
+    if args.jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for future in as_completed([pool.submit(trace_outline, *w) for w in work]):
+                report(future.result())
+    else:
+        for w in work:
+            report(trace_outline(*w))
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["path"])
+    traced = [r for r in results if "error" not in r]
+    failed = [r for r in results if "error" in r]
+    flagged = [r for r in traced if r["flagged"]]
+    png_total = sum(r["png_bytes"] for r in traced)
+    svg_total = sum(r["svg_bytes"] for r in traced)
+    svgz_total = sum(r["svgz_bytes"] for r in traced)
+
+    report_data = {"tool": "trace_outlines", "files": len(results), "flagged": len(flagged),
+                   "errors": len(failed), "seconds": round(elapsed, 2),
+                   "settings": {k: cfg[k] for k in ("threshold", "min_area", "tolerance",
+                                                    "corner_angle", "precision")},
+                   "results": results}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report_data, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("TRACING SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Outlines:         {len(results)}")
+    print(f"Traced:           {len(traced)}")
+    print(f"Errors:           {len(failed)}")
+    print(f"PNG total:        {png_total / 1024 / 1024:.2f} MB")
+    if png_total:
+        print(f"SVG total:        {svg_total / 1024 / 1024:.2f} MB "
+              f"({svg_total / png_total:.0%} of PNG, {svgz_total / 1024 / 1024:.2f} MB gzipped)")
+    if traced:
+        worst = max(traced, key=lambda r: r["diff"])
+        print(f"Mean IoU:         {sum(r['iou'] for r in traced) / len(traced):.3f}")
+        print(f"Worst diff:       {worst['path']} ({worst['diff']:.1%}, IoU {worst['iou']:.3f})")
+    print(f"To check:         {len(flagged)}")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"Output:           {out_dir}")
+    print(f"Report:           {args.report}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
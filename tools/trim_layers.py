@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Layer Trimmer
+
+Fashion and character layers are exported on large, mostly transparent
+canvases so they line up when stacked. This tool crops each configured
+layer to its alpha bounding box (plus a margin) in place and records where
+the crop sat on the original canvas, so the app can still position layers
+exactly while decoding only the visible pixels.
+
+Sources, margin and the manifest path come from the `trim:` section of
+asset_config.yaml. Each manifest entry (assets/trim_manifest.json) holds:
+
+    canvas   [width, height] of the original export canvas
+    offset   [x, y] of the trimmed image's top-left corner on that canvas
+    size     [width, height] of the trimmed image
+
+Re-running is safe: a layer already in the manifest is trimmed relative to
+its recorded canvas, so offsets always refer to the original export. A layer
+that fails keeps its previous manifest entry; if a layer with no entry yet
+fails, nothing is trimmed and the manifest is left as it was. Images
+without transparency are left alone. Lossless WebP layers (and PNGs carrying
+a .webp name) are re-saved losslessly; lossy WebP layers are re-encoded at
+the quality of their format_rules entry, and only when the crop changes.
+
+Usage:
+    python3 tools/trim_layers.py              # Trim layers, update manifest
+    python3 tools/trim_layers.py --dry-run    # Report only
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from optimize_assets import IMAGE_EXTENSIONS, load_config, match_rule, webp_encoding
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+
+
+def load_trim_config(config_path: Path) -> dict:
+    """Load the trim section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    trim = cfg.get("trim") or {}
+    if not trim.get("sources"):
+        raise ValueError(f"No trim.sources configured in {config_path}")
+    trim.setdefault("manifest", "trim_manifest.json")
+    trim.setdefault("margin", 2)
+    trim.setdefault("alpha_threshold", 0)
+    trim.setdefault("min_savings", 0.05)
+    trim.setdefault("exclude", [])
+    return trim
+
+
+def _matches_any(rel_path: str, patterns: list[str]) -> bool:
+    return any(fnmatch.fnmatch(rel_path, pat) for pat in patterns)
+
+
+def collect_sources(assets_dir: Path, cfg: dict) -> list[str]:
+    """Return asset-relative paths (forward slashes) of layers to trim."""
+    sources = []
+    for root, _, filenames in os.walk(assets_dir):
+        for fname in sorted(filenames):
+            if Path(fname).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            rel = (Path(root) / fname).relative_to(assets_dir).as_posix()
+            if _matches_any(rel, cfg["exclude"]):
+                continue
+            if _matches_any(rel, cfg["sources"]):
+                sources.append(rel)
+    return sorted(sources)
+
+
+def alpha_bbox(
+    alpha: np.ndarray, threshold: int, margin: int,
+) -> tuple[int, int, int, int] | None:
+    """(left, top, right, bottom) of alpha > threshold grown by margin, or None if empty."""
+    visible = alpha > threshold
+    rows = np.flatnonzero(visible.any(axis=1))
+    cols = np.flatnonzero(visible.any(axis=0))
+    if not len(rows):
+        return None
+    h, w = alpha.shape
+    return (max(0, int(cols[0]) - margin), max(0, int(rows[0]) - margin),
+            min(w, int(cols[-1]) + 1 + margin), min(h, int(rows[-1]) + 1 + margin))
+
+
+def save_layer(img: Image.Image, path: Path, quality: int) -> None:
+    """Write `img` over `path` atomically in the file's own format.
+
+    WebP layers keep their source encoding: lossless sources (and non-WebP
+    files named .webp) are re-saved losslessly, lossy ones at `quality`.
+    """
+    lossless = (path.suffix.lower() == ".webp"
+                and webp_encoding(path) != "lossy")
+    with tempfile.NamedTemporaryFile(suffix=path.suffix, dir=path.parent,
+                                     delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+    try:
+        if lossless:
+            img.save(tmp_path, "WEBP", lossless=True, exact=True, method=6)
+        elif path.suffix.lower() == ".webp":
+            img.save(tmp_path, "WEBP", quality=quality, alpha_quality=100, method=6)
+        else:
+            img.save(tmp_path, "PNG", optimize=True)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def trim_layer(
+    assets_dir: Path, rel_path: str, cfg: dict, format_rules: list[dict],
+    previous: dict | None, dry_run: bool = False,
+) -> dict:
+    """Trim one layer. Returns stats dict with the manifest entry under "entry"."""
+    path = assets_dir / rel_path
+    stats = {"path": rel_path, "action": "skip", "pixels_before": 0, "pixels_after": 0}
+
+    with Image.open(path) as img:
+        img.load()
+        width, height = img.size
+        stats["pixels_before"] = stats["pixels_after"] = width * height
+
+        # A layer trimmed on an earlier run keeps its original canvas.
+        if previous and previous["size"] == [width, height]:
+            canvas, base = previous["canvas"], previous["offset"]
+        else:
+            canvas, base = [width, height], [0, 0]
+        stats["entry"] = {"canvas": canvas, "offset": base, "size": [width, height]}
+
+        if "A" not in img.getbands() and "transparency" not in img.info:
+            stats["action"] = "no_alpha"
+            return stats
+        rgba = img.convert("RGBA")
+
+    bbox = alpha_bbox(np.asarray(rgba)[..., 3], cfg["alpha_threshold"], cfg["margin"])
+    if bbox is None:
+        stats["action"] = "empty"
+        return stats
+
+    left, top, right, bottom = bbox
+    new_w, new_h = right - left, bottom - top
+    # A crop that keeps the whole canvas must not re-encode (lossy) layers.
+    if (new_w, new_h) == (width, height) or \
+            new_w * new_h > width * height * (1 - cfg["min_savings"]):
+        stats["action"] = "already_tight"
+        return stats
+
+    stats["entry"] = {"canvas": canvas, "offset": [base[0] + left, base[1] + top],
+                      "size": [new_w, new_h]}
+    stats["pixels_after"] = new_w * new_h
+    if dry_run:
+        stats["action"] = "would_trim"
+        return stats
+
+    rule = (match_rule(rel_path.lower(), format_rules)
+            or match_rule(rel_path, format_rules) or {})
+    save_layer(rgba.crop(bbox), path, rule.get("quality", 85))
+    stats["action"] = "trimmed"
+    return stats
+
+
+def load_manifest(path: Path) -> dict:
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8")).get("layers", {})
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim transparent padding from layered art")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would change without modifying files")
+    parser.add_argument("--config", type=str, default=str(CONFIG_PATH),
+                        help="Path to config YAML")
+    args = parser.parse_args()
+
+    try:
+        cfg = load_trim_config(Path(args.config))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    format_rules = load_config(Path(args.config))
+
+    manifest_path = ASSETS_DIR / cfg["manifest"]
+    previous = load_manifest(manifest_path)
+    sources = collect_sources(ASSETS_DIR, cfg)
+    if args.dry_run:
+        print("DRY RUN — no files will be modified\n")
+
+    if not args.dry_run:
+        # A layer that fails with no manifest entry to fall back on would be
+        # dropped from the rewritten manifest, so check them all before
+        # cropping anything.
+        failed = []
+        for rel in sources:
+            key = f"assets/{rel}"
+            if key in previous:
+                continue
+            try:
+                trim_layer(ASSETS_DIR, rel, cfg, format_rules, None, dry_run=True)
+            except Exception as e:
+                failed.append(f"{rel} — {e}")
+        if failed:
+            for line in failed:
+                print(f"ERROR: {line}")
+            print(f"\n{len(failed)} new layer(s) failed; nothing trimmed, "
+                  f"manifest left unchanged.", file=sys.stderr)
+            sys.exit(1)
+
+    layers = {}
+    counts: dict[str, int] = {}
+    pixels_before = pixels_after = 0
+    for i, rel in enumerate(sources, 1):
+        key = f"assets/{rel}"
+        try:
+            result = trim_layer(ASSETS_DIR, rel, cfg, format_rules,
+                                previous.get(key), dry_run=args.dry_run)
+        except Exception as e:
+            counts["error"] = counts.get("error", 0) + 1
+            print(f"[{i}/{len(sources)}] ERROR: {rel} — {e}")
+            # Keep the canvas/offset of a layer trimmed on an earlier run.
+            if key in previous:
+                layers[key] = previous[key]
+            continue
+        action = result["action"]
+        counts[action] = counts.get(action, 0) + 1
+        pixels_before += result["pixels_before"]
+        pixels_after += result["pixels_after"]
+        layers[key] = result["entry"]
+        if action in ("trimmed", "would_trim"):
+            entry = result["entry"]
+            print(f"[{i}/{len(sources)}] {action}: {rel} "
+                  f"{entry['canvas'][0]}x{entry['canvas'][1]} -> "
+                  f"{entry['size'][0]}x{entry['size'][1]} at {tuple(entry['offset'])}")
+
+    if not args.dry_run:
+        manifest = {"margin": cfg["margin"], "layers": layers}
+        manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        print(f"\nManifest written to: {manifest_path.relative_to(REPO_DIR)}")
+
+    print(f"\n{'='*60}")
+    print("TRIM SUMMARY")
+    print(f"{'='*60}")
+    print(f"Layers:           {len(sources)}")
+    print(f"Trimmed:          {counts.get('trimmed', 0) + counts.get('would_trim', 0)}")
+    print(f"Already tight:    {counts.get('already_tight', 0)}")
+    print(f"No alpha:         {counts.get('no_alpha', 0)}")
+    print(f"Errors:           {counts.get('error', 0)}")
+    if pixels_before:
+        print(f"Decoded pixels:   {pixels_before:,} -> {pixels_after:,} "
+              f"(-{(1 - pixels_after / pixels_before) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Planet Wonders — Coloring Outline Validator
+
+Checks coloring outlines and their region masks with NumPy only (no OpenCV),
+fast enough to run on every commit. Per outline:
+
+    size        dimensions match the rule's `size`, if it sets one
+    bw          pixel values are strictly 0/255
+    exterior    white area connected to the canvas edge -- unfillable in the
+                generated mask -- stays under `max_exterior`; a larger value
+                usually means a gap in an enclosing line
+    regions     enclosed regions (as generate_masks.py would find them) fit
+                in a uint8 mask (<= 255)
+    mask        the mask at <country>/masks/<stem>_mask.png, if any, has the
+                outline's aspect ratio and, sampled at the mask's resolution,
+                is 0 under every outline pixel
+
+Failing bw, exterior and regions checks are errors under a `strict: true`
+rule (generator output) and warnings otherwise (anti-aliased artist
+outlines). Size, decode and mask problems are always errors.
+
+Regions are labelled with the same threshold, 3x3 dilation, 8-connectivity
+and minimum region size as generate_masks.py. Rules and limits come from the
+`validation:` section of asset_config.yaml (first matching rule wins).
+
+Usage:
+    python3 tools/validate_outlines.py                         # All outlines
+    python3 tools/validate_outlines.py assets/coloring/ghana   # Dirs or files
+    python3 tools/validate_outlines.py --report outlines.json
+    python3 tools/validate_outlines.py --verbose               # List warnings too
+    python3 tools/validate_outlines.py --strict                # Warnings fail too
+
+Requirements:
+    pip install Pillow numpy pyyaml
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from optimize_assets import match_rule
+from pixel_cache import load_pixels
+
+REPO_DIR = Path(__file__).parent.parent
+ASSETS_DIR = REPO_DIR / "assets"
+CONFIG_PATH = Path(__file__).parent / "asset_config.yaml"
+REPORT_PATH = REPO_DIR / ".asset_cache" / "outline_report.json"
+
+
+def load_validation_config(config_path: Path) -> dict:
+    """Load the validation section from YAML config."""
+    with open(config_path) as f:
+        cfg = yaml.safe_load(f)
+    validation = cfg.get("validation") or {}
+    if not validation.get("rules"):
+        raise ValueError(f"No validation.rules configured in {config_path}")
+    validation.setdefault("line_threshold", 200)
+    validation.setdefault("dilate", 1)
+    validation.setdefault("min_region", 50)
+    validation.setdefault("max_regions", 255)
+    validation.setdefault("max_exterior", 0.25)
+    validation.setdefault("max_mask_disagreement", 0.001)
+    return validation
+
+
+def collect_outlines(paths: list[Path]) -> list[Path]:
+    """Outline PNGs in the given files/dirs, skipping masks/ directories."""
+    outlines = set()
+    for path in paths:
+        candidates = [path] if path.is_file() else path.rglob("*")
+        for p in candidates:
+            if p.is_file() and p.suffix.lower() == ".png" and "masks" not in p.parts:
+                outlines.add(p.resolve())
+    return sorted(outlines)
+
+
+def find_mask(outline: Path) -> Path | None:
+    """<dir>/masks/<stem>_mask.png in the outline's directory or any parent under coloring/."""
+    name = f"{outline.stem}_mask.png"
+    for parent in outline.parents:
+        candidate = parent / "masks" / name
+        if candidate.exists():
+            return candidate
+        if parent.name == "coloring" or parent == ASSETS_DIR:
+            break
+    return None
+
+
+def dilate(mask: np.ndarray, iterations: int) -> np.ndarray:
+    """Binary dilation with a 3x3 square, like cv2.dilate(mask, ones((3, 3)))."""
+    for _ in range(iterations):
+        padded = np.pad(mask, 1)
+        h, w = mask.shape
+        grown = np.zeros_like(mask)
+        for dy in range(3):
+            for dx in range(3):
+                grown |= padded[dy:dy + h, dx:dx + w]
+        mask = grown
+    return mask
+
+
+def label_runs(fg: np.ndarray, diagonal: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """8-connected (4-connected unless `diagonal`) components of `fg`, over horizontal runs.
+
+    Returns (rows, starts, ends, labels) per run, with ends exclusive and
+    labels compacted to 0..n-1.
+    """
+    h, w = fg.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = fg
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    n = len(starts)
+    if n == 0:
+        return rows, starts, ends, np.zeros(0, dtype=np.intp)
+
+    # Runs a (row r) and b (row r + 1) touch diagonally or directly when
+    # start_b <= end_a and start_a <= end_b (ends exclusive); they share an
+    # edge when start_b < end_a and start_a < end_b.
+    stride = w + 2
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    above = rows - 1
+    lo = np.searchsorted(end_keys, above * stride + starts, side="left" if diagonal else "right")
+    hi = np.searchsorted(start_keys, above * stride + ends + diagonal, side="left")
+    counts = np.maximum(hi - lo, 0)
+    b = np.repeat(np.arange(n), counts)
+    a = np.repeat(lo, counts) + (np.arange(counts.sum())
+                                 - np.repeat(np.cumsum(counts) - counts, counts))
+
+    # Union-find in bulk: hook the larger root of every unjoined edge onto
+    # the smaller one, then compress every path to its root; repeat.
+    labels = np.arange(n)
+    while True:
+        ra, rb = labels[a], labels[b]
+        apart = ra != rb
+        if not apart.any():
+            break
+        np.minimum.at(labels, np.maximum(ra, rb)[apart], np.minimum(ra, rb)[apart])
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    _, labels = np.unique(labels, return_inverse=True)
+    return rows, starts, ends, labels
+
+
+def region_stats(gray: np.ndarray, cfg: dict) -> dict:
+    """Exterior fraction and enclosed region count, as generate_masks.py sees them."""
+    h, w = gray.shape
+    lines = dilate(gray <= cfg["line_threshold"], cfg["dilate"])
+    rows, starts, ends, labels = label_runs(~lines)
+    if not len(labels):
+        return {"exterior": 0.0, "regions": 0, "tiny_regions": 0}
+    areas = np.bincount(labels, weights=ends - starts).astype(np.int64)
+    touches = (rows == 0) | (rows == h - 1) | (starts == 0) | (ends == w)
+    exterior = np.zeros(len(areas), dtype=bool)
+    exterior[labels[touches]] = True
+    enclosed = areas[~exterior]
+    return {
+        "exterior": round(float(areas[exterior].sum()) / (h * w), 4),
+        "regions": int((enclosed >= cfg["min_region"]).sum()),
+        "tiny_regions": int((enclosed < cfg["min_region"]).sum()),
+    }
+
+
+def validate_outline(outline: Path, assets_dir: Path, cfg: dict) -> dict:
+    """Run every check on one outline. Returns a result dict with `issues`."""
+    rel_path = outline.relative_to(assets_dir).as_posix()
+    rule = match_rule(rel_path, cfg["rules"]) or {}
+    result: dict = {"path": rel_path, "issues": []}
+
+    def issue(severity: str, check: str, message: str) -> None:
+        result["issues"].append({"severity": severity, "check": check, "message": message})
+
+    try:
+        gray = np.asarray(load_pixels(outline, "L"))
+    except (OSError, ValueError) as e:
+        issue("error", "decode", str(e))
+        return result
+    h, w = gray.shape
+    result["size"] = [w, h]
+
+    severity = "error" if rule.get("strict") else "warning"
+    expected = rule.get("size")
+    if expected and [w, h] != list(expected):
+        issue("error", "size", f"size is {w}x{h}, expected {expected[0]}x{expected[1]}")
+
+    hist = np.bincount(gray.ravel(), minlength=256)
+    grey = int(hist[1:255].sum())
+    result["grey_pixels"] = grey
+    if grey:
+        levels = np.flatnonzero(hist[1:255]) + 1
+        issue(severity, "bw",
+              f"{grey} pixels ({grey / gray.size:.2%}) outside 0/255, "
+              f"{len(levels)} levels e.g. {levels[:5].tolist()}")
+
+    stats = region_stats(gray, cfg)
+    result.update(stats)
+    max_exterior = rule.get("max_exterior", cfg["max_exterior"])
+    if stats["exterior"] > max_exterior:
+        issue(severity, "exterior",
+              f"{stats['exterior']:.1%} of the canvas is open to the edge "
+              f"(limit {max_exterior:.0%}); check for gaps in enclosing lines")
+    if stats["regions"] > cfg["max_regions"]:
+        issue(severity, "regions",
+              f"{stats['regions']} enclosed regions, mask holds at most {cfg['max_regions']}")
+
+    mask_path = find_mask(outline)
+    if mask_path is None:
+        result["mask"] = None
+        return result
+    result["mask"] = mask_path.relative_to(assets_dir).as_posix()
+    try:
+        mask = np.asarray(load_pixels(mask_path, "L"))
+    except (OSError, ValueError) as e:
+        issue("error", "mask", f"cannot decode mask: {e}")
+        return result
+    mh, mw = mask.shape
+    if mw * h != mh * w:
+        issue("error", "mask", f"mask is {mw}x{mh}, outline is {w}x{h} (aspect differs)")
+        return result
+    # The app scales masks to the outline's rect; compare at mask resolution.
+    ys = np.arange(mh) * h // mh
+    xs = np.arange(mw) * w // mw
+    line_pixels = gray[np.ix_(ys, xs)] <= cfg["line_threshold"]
+    painted = int((mask[line_pixels] != 0).sum())
+    disagreement = painted / max(int(line_pixels.sum()), 1)
+    result["mask_regions"] = int(np.count_nonzero(np.bincount(mask.ravel(), minlength=256)[1:]))
+    result["mask_disagreement"] = round(disagreement, 6)
+    if disagreement > cfg["max_mask_disagreement"]:
+        issue("error", "mask",
+              f"{painted} outline pixels ({disagreement:.2%}) fall inside mask regions; "
+              f"mask is stale, regenerate with generate_masks.py")
+    return result
+
+
+def _validate_worker(args: tuple) -> dict:
+    return validate_outline(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate coloring outlines and masks")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Outline files or directories (default: assets/coloring)")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help=f"JSON report path (default: {REPORT_PATH.relative_to(REPO_DIR)})")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings too")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List warnings too")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    try:
+        cfg = load_validation_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    assets_dir = ASSETS_DIR.resolve()
+    outlines = collect_outlines([p.resolve() for p in args.paths] or [assets_dir / "coloring"])
+    outside = [p for p in outlines if assets_dir not in p.parents]
+    if outside:
+        print(f"Error: {outside[0]} is not under {assets_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    work = [(p, assets_dir, cfg) for p in outlines]
+    if args.jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_validate_worker, work, chunksize=4))
+    else:
+        results = [_validate_worker(w) for w in work]
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for r in results for i in r["issues"] if i["severity"] == "error")
+    warnings = sum(1 for r in results for i in r["issues"] if i["severity"] == "warning")
+    for r in results:
+        for i in r["issues"]:
+            if i["severity"] == "warning" and not (args.verbose or args.strict):
+                continue
+            print(f"  {i['severity'].upper():7s} {r['path']}: [{i['check']}] {i['message']}")
+
+    report = {"tool": "validate_outlines", "files": len(results), "errors": errors,
+              "warnings": warnings, "seconds": round(elapsed, 2), "results": results}
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    print(f"\n{'=' * 60}")
+    print("OUTLINE VALIDATION SUMMARY")
+    print(f"{'=' * 60}")
+    print(f"Outlines:         {len(results)}")
+    print(f"With masks:       {sum(1 for r in results if r.get('mask'))}")
+    print(f"Errors:           {errors}")
+    print(f"Warnings:         {warnings}")
+    print(f"Time:             {elapsed:.2f}s")
+    print(f"Report:           {args.report}")
+
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()